@@ -0,0 +1,336 @@
+#################################################
+#          Blackjack History Analytics          #
+#################################################
+#
+# Reports on hand history logs written by history.py:
+#
+#  - how often each win condition came up
+#  - the EV of each starting hand against each upcard
+#  - how splits and double downs paid off
+#  - the dealer's final totals, and how often they bust
+#  - the worst drawdown of each table's bankroll
+#
+# A log is read through mmap in fixed size chunks,
+# each viewed as a NumPy record array without being
+# copied, so memory use does not grow with the size
+# of the log. Reports from separate logs can be
+# merged, so logs can be read in parallel:
+#
+#      python cli.py analyze LOG [LOG ...]
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import handbatch
+from history import CARD_SLOTS, MOVE_SLOTS, RECORD, HistoryReader
+from ledger import formatCents
+from outcome import OUTCOMES
+from roundstate import DOUBLE, MOVE_CODES
+from rules import Rules
+
+# The layout of a RECORD, as a NumPy dtype.
+DTYPE = np.dtype([
+    ("table", "<u4"),
+    ("round", "<u4"),
+    ("bet", "<i8"),
+    ("outcome", "u1"),
+    ("dealer", "u1"),
+    ("hand1", "u1"),
+    ("hand2", "u1"),
+    ("moves", "u1"),
+    ("cards", "u1", (CARD_SLOTS,)),
+    ("codes", "u1", (MOVE_SLOTS,)),
+    ("natural", "u1"),
+    ("pad", "V2"),
+])
+assert DTYPE.itemsize == RECORD.size
+
+# Index (0-9) of the point value of every card
+# integer: Aces first, ten point cards last.
+RANKS = np.minimum(np.arange(52) // 4, 9)
+
+# Credits per unit of bet, in quarters, indexed by
+# [the record's credit for a natural, outcome index].
+# A row is filled in from Rules.credits the first time
+# its credit for a natural is seen.
+QUARTERS = np.zeros((256, len(OUTCOMES)), dtype=np.int64)
+KNOWN = np.zeros(256, dtype=bool)
+
+# The kinds of rounds compared for profitability.
+KINDS = ["split", "double", "other"]
+SPLIT_KIND = 0
+DOUBLE_KIND = 1
+OTHER_KIND = 2
+
+RANK_NAMES = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "T"]
+
+# Dealer totals are counted from 0 to 21, with every
+# bust counted together at BUST.
+BUST = 22
+
+#
+# Abstraction - What has been learned from some rounds of hand
+#               history. Every count is a plain total, so two
+#               reports are merged by adding them up.
+#
+#               Drawdowns are kept per table as a summary of its
+#               running profit, starting from zero: where the
+#               profit ended, its highest and lowest points, and
+#               the furthest it fell from a high point. Two such
+#               summaries played one after the other combine into
+#               one, so a table's rounds may be split across
+#               chunks, or across logs given in order.
+#
+# Rep Invariants:
+#  wins has one count per outcome index
+#  hands, handBets and handNets are indexed by
+#       [lower starting card rank, higher starting card rank, upcard rank]
+#  kinds, kindBets and kindNets are indexed by the KINDS
+#  dealerTotals is indexed by the dealer's final total, up to BUST
+#  tables maps a table id to [net, peak, trough, drawdown],
+#       with peak >= max(net, 0), trough <= min(net, 0), and drawdown >= 0
+
+class Report():
+    __slots__ = ("wins", "hands", "handBets", "handNets", "kinds", "kindBets", "kindNets", "dealerTotals",
+                 "tables")
+
+    # Report data type constructor, for a report on no rounds.
+    def __init__(self):
+        self.wins = np.zeros(len(OUTCOMES), dtype=np.int64)
+        self.hands = np.zeros((10, 10, 10), dtype=np.int64)
+        self.handBets = np.zeros((10, 10, 10), dtype=np.int64)
+        self.handNets = np.zeros((10, 10, 10), dtype=np.int64)
+        self.kinds = np.zeros(len(KINDS), dtype=np.int64)
+        self.kindBets = np.zeros(len(KINDS), dtype=np.int64)
+        self.kindNets = np.zeros(len(KINDS), dtype=np.int64)
+        self.dealerTotals = np.zeros(BUST + 1, dtype=np.int64)
+        self.tables = {}
+
+    # RETURNS : the number of rounds reported on.
+    def rounds(self):
+        return int(self.wins.sum())
+
+    # Adds a chunk of records to the report.
+    #
+    # PARAM chunk : A NumPy array of DTYPE records, holding
+    #               each table's rounds in the order played.
+    def add(self, chunk):
+        count = len(chunk)
+        if(count == 0):
+            return
+        outcome = chunk["outcome"]
+        bet = chunk["bet"]
+        natural = chunk["natural"]
+        for quarters in np.unique(natural):
+            if(not(KNOWN[quarters])):
+                QUARTERS[quarters] = Rules(blackjackPays=quarters / 4).credits()
+                KNOWN[quarters] = True
+        net = ((bet * QUARTERS[natural, outcome]) >> 2) - bet
+        self.wins += np.bincount(outcome, minlength=len(OUTCOMES))
+
+        # The player's first two cards. A split hand's second
+        # card was moved to the start of the second hand.
+        rows = np.arange(count)
+        cards = chunk["cards"]
+        dealer = chunk["dealer"].astype(np.intp)
+        split = chunk["hand2"] > 0
+        first = RANKS[cards[rows, dealer]]
+        second = RANKS[cards[rows, np.where(split, dealer + chunk["hand1"], dealer + 1)]]
+        upcard = RANKS[cards[:, 1]]
+        index = (np.minimum(first, second) * 10 + np.maximum(first, second)) * 10 + upcard
+        self.hands += np.bincount(index, minlength=1000).reshape(10, 10, 10)
+        self.handBets += np.bincount(index, bet, minlength=1000).astype(np.int64).reshape(10, 10, 10)
+        self.handNets += np.bincount(index, net, minlength=1000).astype(np.int64).reshape(10, 10, 10)
+
+        doubled = (chunk["moves"] > 0) & (chunk["codes"][:, 0] == MOVE_CODES[DOUBLE])
+        kind = np.where(split, SPLIT_KIND, np.where(doubled, DOUBLE_KIND, OTHER_KIND))
+        self.kinds += np.bincount(kind, minlength=len(KINDS))
+        self.kindBets += np.bincount(kind, bet, minlength=len(KINDS)).astype(np.int64)
+        self.kindNets += np.bincount(kind, net, minlength=len(KINDS)).astype(np.int64)
+
+        # The dealer's cards lead each record, so they are scored
+        # as one batch once the slots past them are padded out.
+        slots = np.arange(int(dealer.max()))
+        dealerCards = np.where(slots < dealer[:, None], cards[:, :len(slots)].astype(np.int16), -1)
+        totals = handbatch.evaluateHands(dealerCards)
+        self.dealerTotals += np.bincount(np.minimum(totals, BUST), minlength=BUST + 1)
+
+        self.addDrawdowns(chunk["table"], net)
+
+    # Adds the running profit of each table over a chunk
+    # to the drawdown summaries.
+    #
+    # PARAM table : The table id of each round.
+    # PARAM net : The cents won or lost in each round.
+    def addDrawdowns(self, table, net):
+        order = np.argsort(table, kind="stable")
+        table = table[order]
+        net = net[order]
+        starts = np.flatnonzero(np.r_[True, table[1:] != table[:-1]])
+        group = np.cumsum(np.r_[False, table[1:] != table[:-1]])
+
+        # Running profit within each table, starting from zero.
+        running = np.cumsum(net)
+        before = np.r_[0, running[:-1]][starts]
+        running = running - before[group]
+
+        # Running high point within each table. Each table is
+        # lifted clear of the one before it, so one running
+        # maximum over the whole chunk never crosses tables.
+        lift = int(running.max()) - int(running.min()) + 1
+        lifted = running + group * lift
+        peaks = np.maximum(np.maximum.accumulate(lifted) - group * lift, 0)
+
+        nets = running[np.r_[starts[1:], len(running)] - 1]
+        highs = np.maximum.reduceat(peaks, starts)
+        lows = np.minimum(np.minimum.reduceat(running, starts), 0)
+        falls = np.maximum.reduceat(peaks - running, starts)
+        for i in range(len(starts)):
+            self.addTable(int(table[starts[i]]), [int(nets[i]), int(highs[i]), int(lows[i]), int(falls[i])])
+
+    # Adds a summary of rounds played after those already
+    # reported to a table's drawdown summary.
+    #
+    # PARAM tableId : The id of the table.
+    # PARAM after : A summary [net, peak, trough, drawdown].
+    def addTable(self, tableId, after):
+        before = self.tables.get(tableId)
+        if(before is None):
+            self.tables[tableId] = list(after)
+            return
+        net, peak, trough, drawdown = before
+        self.tables[tableId] = [
+            net + after[0],
+            max(peak, net + after[1]),
+            min(trough, net + after[2]),
+            max(drawdown, after[3], peak - (net + after[2])),
+        ]
+
+    # Adds another report into this one. Tables found in
+    # both are taken to have played the other report's
+    # rounds after this one's.
+    #
+    # PARAM other : The Report to add.
+    #
+    # RETURNS : This report, for convenience.
+    def merge(self, other):
+        self.wins += other.wins
+        self.hands += other.hands
+        self.handBets += other.handBets
+        self.handNets += other.handNets
+        self.kinds += other.kinds
+        self.kindBets += other.kindBets
+        self.kindNets += other.kindNets
+        self.dealerTotals += other.dealerTotals
+        for tableId in other.tables:
+            self.addTable(tableId, other.tables[tableId])
+        return self
+
+    # Gets the EV of every starting hand against every upcard.
+    #
+    # RETURNS : A 10x10x10 float array of the net won per
+    #           unit bet, indexed as hands, or NaN where no
+    #           round was played.
+    def handEV(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.handBets > 0, self.handNets / self.handBets, np.nan)
+
+    # Gets the worst drawdown of any table.
+    #
+    # RETURNS : A tuple of (table id, drawdown in cents), or
+    #           None when no rounds were reported on.
+    def worstDrawdown(self):
+        worst = None
+        for tableId in self.tables:
+            drawdown = self.tables[tableId][3]
+            if(worst is None or drawdown > worst[1]):
+                worst = (tableId, drawdown)
+        return worst
+
+    # Describes the report in text.
+    #
+    # RETURNS : A list of lines.
+    def summary(self):
+        rounds = self.rounds()
+        lines = ["Rounds: " + str(rounds), "", "Win conditions:"]
+        for outcome in OUTCOMES:
+            count = int(self.wins[outcome.index])
+            if(count > 0):
+                lines.append("{:>6} : {:>10} {:>8.3%}".format(outcome.code, count, count / rounds))
+
+        lines += ["", "Splits and double downs:"]
+        for i in range(len(KINDS)):
+            if(self.kinds[i] > 0):
+                lines.append("{:>8} : {:>10} rounds, net {:>12}, EV {:+.4f} per unit bet".format(
+                    KINDS[i], int(self.kinds[i]), formatCents(int(self.kindNets[i])),
+                    self.kindNets[i] / self.kindBets[i]))
+
+        lines += ["", "EV per unit bet by starting hand (rows) and upcard (columns):"]
+        lines.append("       " + "".join("{:>7}".format(name) for name in RANK_NAMES[1:] + RANK_NAMES[:1]))
+        ev = self.handEV()
+        for low in range(10):
+            for high in range(low, 10):
+                if(self.hands[low, high].sum() == 0):
+                    continue
+                row = "{:<7}".format(RANK_NAMES[low] + "," + RANK_NAMES[high])
+                for up in list(range(1, 10)) + [0]:
+                    if(np.isnan(ev[low, high, up])):
+                        row += "{:>7}".format("-")
+                    else:
+                        row += "{:>+7.2f}".format(ev[low, high, up])
+                lines.append(row)
+
+        lines += ["", "Dealer final totals:"]
+        for total in range(BUST):
+            count = int(self.dealerTotals[total])
+            if(count > 0):
+                lines.append("{:>6} : {:>10} {:>8.3%}".format(total, count, count / rounds))
+        lines.append("{:>6} : {:>10} {:>8.3%}".format("bust", int(self.dealerTotals[BUST]),
+                                                     self.dealerTotals[BUST] / rounds))
+
+        worst = self.worstDrawdown()
+        if(worst is not None):
+            drawdowns = [self.tables[tableId][3] for tableId in self.tables]
+            lines += ["", "Bankroll drawdown over " + str(len(self.tables)) + " tables:"]
+            lines.append("   worst : " + formatCents(worst[1]) + " at table " + str(worst[0]))
+            lines.append("    mean : " + formatCents(int(round(sum(drawdowns) / len(drawdowns)))))
+        return lines
+
+# Reports on one hand history log.
+#
+# PARAM path : The path of the log.
+# PARAM chunkSize : The number of records read at a time.
+#
+# RETURNS : A Report.
+def analyzeFile(path, chunkSize=65536):
+    report = Report()
+    with HistoryReader(path) as reader:
+        for start in range(0, len(reader), chunkSize):
+            count = min(chunkSize, len(reader) - start)
+            report.add(np.frombuffer(reader.view, DTYPE, count, start * RECORD.size))
+    return report
+
+# Reports on several hand history logs, reading them
+# in separate processes and merging the reports in the
+# order the logs were given.
+#
+# PARAM paths : A list of paths of logs.
+# PARAM workers : The number of processes to use. Defaults
+#                 to one per core.
+# PARAM chunkSize : The number of records read at a time.
+#
+# RETURNS : A Report.
+def analyzeFiles(paths, workers=None, chunkSize=65536):
+    if(workers is None):
+        workers = os.cpu_count() or 1
+    report = Report()
+    if(workers <= 1 or len(paths) <= 1):
+        for path in paths:
+            report.merge(analyzeFile(path, chunkSize))
+        return report
+    with ProcessPoolExecutor(workers) as pool:
+        for part in pool.map(analyzeFile, paths, [chunkSize] * len(paths)):
+            report.merge(part)
+    return report
@@ -0,0 +1,206 @@
+#################################################
+#          Blackjack Bankroll Simulation        #
+#################################################
+#
+# Plays out many sessions of blackjack.playBlackjack
+# at once, one NumPy array entry per wallet, to find
+# the risk of going broke. Every wallet bets, plays
+# and is paid each round in lockstep until it is
+# broke, reaches its goal, or runs out of rounds.
+#
+# Rounds are drawn from the odds of each win state,
+# measured beforehand by simulating the player's
+# decision policy, with and without the money to
+# double down. A draw is looked up in a table of
+# credits rather than searched for, and paid by
+# the payout table of the rules played, in cents,
+# just as the Ledger pays. This treats every round as independent
+# of the last, ignoring what the shoe has dealt.
+#
+# A bet sizing policy here is any function of the form:
+#
+#      betting(wallets)
+#
+# taking an array of wallets in cents and returning
+# an array of bets in cents.
+
+import numpy as np
+
+import simulation
+from outcome import OUTCOMES
+from rules import HOUSE
+
+# The number of equally likely draws the odds of a round
+# are spread over. Each win state's odds are kept to
+# within 1 / RESOLUTION.
+RESOLUTION = 1 << 16
+
+# Measures how often each win state comes up for a
+# decision policy.
+#
+# PARAM policy : The decision policy, as in simulation.py.
+# PARAM rounds : The number of rounds simulated for each
+#                of the two sets of odds.
+# PARAM seed : The seed of the simulations.
+# PARAM decks : The number of decks in the shoe.
+# PARAM penetration : The fraction of the shoe dealt
+#                     before it is reshuffled.
+# PARAM rules : The Rules played by.
+#
+# RETURNS : A 2 x len(OUTCOMES) array of probabilities
+#           indexed by Outcome.index: the first row for
+#           rounds the player cannot double down in, the
+#           second for rounds they can.
+def outcomeOdds(policy=simulation.basicPolicy, rounds=200000, seed=0, decks=1, penetration=0.75, rules=HOUSE):
+    odds = np.zeros((2, len(OUTCOMES)))
+    for canDouble in (False, True):
+        counts = simulation.simulate(rounds, policy, seed, canDouble, decks, penetration, rules)
+        for outcome in OUTCOMES:
+            odds[int(canDouble), outcome.index] = counts[outcome.code] / rounds
+    return odds
+
+# Spreads odds over RESOLUTION equally likely draws.
+#
+# PARAM odds : An array of probabilities indexed by
+#              Outcome.index.
+# PARAM rules : The Rules whose payouts are credited.
+#
+# RETURNS : An int16 array of the credit of each draw, in
+#           quarters of the bet, as in Rules.credits.
+def creditTable(odds, rules=HOUSE):
+    cumulative = np.cumsum(odds)
+    cumulative[-1] = 1.0
+    middles = (np.arange(RESOLUTION) + 0.5) / RESOLUTION
+    index = np.minimum(np.searchsorted(cumulative, middles, side="right"), len(odds) - 1)
+    return np.array(rules.credits(), dtype=np.int16)[index]
+
+# Builds a policy that always bets the same amount,
+# or everything that is left when the wallet holds
+# less than that.
+#
+# PARAM amount : The bet, in cents.
+#
+# RETURNS : A bet sizing policy.
+def flatBetting(amount):
+    return lambda wallets: np.minimum(wallets, amount)
+
+# Builds a policy that bets a share of the wallet,
+# never less than a minimum bet.
+#
+# PARAM fraction : The share of the wallet bet.
+# PARAM minimum : The smallest bet, in cents.
+#
+# RETURNS : A bet sizing policy.
+def fractionBetting(fraction, minimum=1):
+    return lambda wallets: np.minimum(wallets, np.maximum((wallets * fraction).astype(np.int64), minimum))
+
+#
+# Abstraction - How a set of simulated sessions ended.
+#
+# Rep Invariants:
+#  len(finals) == len(lengths) == len(ruined)
+#  ruined[i] iff finals[i] <= 0
+#  1 <= lengths[i] <= maxRounds
+
+class Sessions():
+    __slots__ = ("start", "maxRounds", "finals", "lengths", "ruined")
+
+    # Sessions data type constructor.
+    #
+    # PARAM start : the wallet every session began with, in cents.
+    # PARAM maxRounds : the most rounds a session could last.
+    # PARAM finals : an array of the final wallets, in cents.
+    # PARAM lengths : an array of the rounds each session lasted.
+    def __init__(self, start, maxRounds, finals, lengths):
+        self.start = start
+        self.maxRounds = maxRounds
+        self.finals = finals
+        self.lengths = lengths
+        self.ruined = finals <= 0
+
+    # RETURNS : the share of sessions that went broke.
+    def riskOfRuin(self):
+        return float(self.ruined.mean())
+
+    # RETURNS : the median number of rounds a session lasted.
+    def medianLength(self):
+        return float(np.median(self.lengths))
+
+    # Gets points of the distribution of final wallets.
+    #
+    # PARAM percents : A list of percentiles, 0 to 100.
+    #
+    # RETURNS : An array of the final wallets, in cents,
+    #           at each percentile.
+    def percentiles(self, percents=(1, 5, 25, 50, 75, 95, 99)):
+        return np.percentile(self.finals, percents)
+
+    # Describes the sessions in text.
+    #
+    # RETURNS : A list of lines.
+    def summary(self):
+        lines = [
+            "Sessions: " + str(len(self.finals)),
+            "Risk of ruin within {} rounds: {:.4%}".format(self.maxRounds, self.riskOfRuin()),
+            "Median session length: {:.0f} rounds".format(self.medianLength()),
+            "Mean final wallet: ${:.2f}".format(self.finals.mean() / 100),
+            "Final wallets:",
+        ]
+        percents = (1, 5, 25, 50, 75, 95, 99)
+        for percent, value in zip(percents, self.percentiles(percents)):
+            lines.append("  {:>3}% : ${:.2f}".format(percent, value / 100))
+        return lines
+
+# Plays out many sessions at once.
+#
+# PARAM sessions : The number of sessions.
+# PARAM start : The wallet each session begins with, in cents.
+# PARAM betting : The bet sizing policy. Defaults to a
+#                 flat $1.00 bet.
+# PARAM maxRounds : The most rounds a session lasts.
+# PARAM goal : An optional wallet, in cents, at which a
+#              session stops.
+# PARAM odds : Odds from outcomeOdds, measured under the
+#              same rules. Measured for simulation.basicPolicy
+#              when not given.
+# PARAM seed : An optional seed, for reproducible runs.
+# PARAM rules : The Rules played by.
+#
+# RETURNS : The Sessions.
+def simulateSessions(sessions, start=500, betting=None, maxRounds=1000, goal=None, odds=None, seed=None,
+                     rules=HOUSE):
+    if(betting is None):
+        betting = flatBetting(100)
+    if(odds is None):
+        odds = outcomeOdds(decks=rules.decks, rules=rules)
+    rng = np.random.default_rng(seed)
+
+    # Each round is drawn as a whole number below 2 * RESOLUTION.
+    # The lower half of the table pays out rounds the player
+    # cannot double down in, the upper half those they can.
+    table = np.concatenate([creditTable(odds[0], rules), creditTable(odds[1], rules)])
+
+    finals = np.full(sessions, start, dtype=np.int64)
+    lengths = np.full(sessions, maxRounds, dtype=np.int32)
+    active = np.arange(sessions)
+    wallets = finals.copy()
+    for played in range(1, maxRounds + 1):
+        bets = np.clip(betting(wallets), 1, wallets)
+        wallets -= bets
+        draws = rng.integers(0, RESOLUTION, len(wallets), dtype=np.int32)
+        draws[wallets >= bets] += RESOLUTION
+        wallets += (bets * table[draws]) >> 2
+
+        done = wallets <= 0
+        if(goal is not None):
+            done |= wallets >= goal
+        if(done.any()):
+            finals[active[done]] = wallets[done]
+            lengths[active[done]] = played
+            keep = ~done
+            active = active[keep]
+            wallets = wallets[keep]
+            if(len(active) == 0):
+                break
+    finals[active] = wallets
+    return Sessions(start, maxRounds, finals, lengths)
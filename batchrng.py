@@ -0,0 +1,123 @@
+#################################################
+#          Batched Random Number Source         #
+#################################################
+#
+# A random number generator that can stand in for
+# the random module wherever a Shoe, dealCard or the
+# simulation asks for one, drawing from a NumPy
+# Generator in large batches rather than one Python
+# call per number. Numbers are handed out of buffers
+# that are refilled all at once when they run dry:
+#
+#  - shuffles come from a batch of permutations, one
+#    row per shuffle, made by a single vectorized
+#    Generator.permuted call covering many shoes
+#  - random() and randint() come from a batch of
+#    uniform floats
+#
+# so the cost of the generator itself is spread over
+# thousands of shuffles or draws. The bit generator
+# is PCG64 or Philox, chosen by name, and a seed
+# always gives the same stream of shuffles and draws.
+#
+# Integers are made by scaling a uniform float, which
+# leaves a bias of well under one part in 2 ** 40 for
+# the small ranges used here.
+
+import numpy as np
+
+# The bit generators that can be chosen, by name.
+BIT_GENERATORS = {"pcg64" : np.random.PCG64, "philox" : np.random.Philox}
+
+#
+# Abstraction - A source of shuffles and uniform draws, served
+#               from buffers refilled by a NumPy Generator.
+#
+# Rep Invariants:
+#  0 <= position <= len(floats)
+#  batches maps a list length n to [rows, next], where rows is
+#       a list of permutations of range(n) and 0 <= next <= len(rows)
+
+class BatchRandom():
+    __slots__ = ("generator", "size", "floats", "position", "batches")
+
+    # BatchRandom data type constructor.
+    #
+    # PARAM seed : an optional seed, for a reproducible stream.
+    # PARAM bitGenerator : the name of the bit generator, one
+    #                      of BIT_GENERATORS.
+    # PARAM size : about how many numbers each refill makes.
+    def __init__(self, seed=None, bitGenerator="pcg64", size=65536):
+        if(bitGenerator not in BIT_GENERATORS):
+            raise ValueError("unknown bit generator: " + str(bitGenerator))
+        self.generator = np.random.Generator(BIT_GENERATORS[bitGenerator](seed))
+        self.size = size
+        self.floats = []
+        self.position = 0
+        self.batches = {}
+
+    # Makes many permutations at once, in one call.
+    #
+    # PARAM n : the length of each permutation.
+    # PARAM count : the number of permutations.
+    #
+    # RETURNS : a count x n array, each row a permutation
+    #           of range(n).
+    def permutations(self, n, count):
+        rows = np.tile(np.arange(n, dtype=np.intp), (count, 1))
+        return self.generator.permuted(rows, axis=1, out=rows)
+
+    # Shuffles many shoes at once, in one call.
+    #
+    # PARAM decks : the number of decks in each shoe.
+    # PARAM count : the number of shoes.
+    #
+    # RETURNS : a count x (52 * decks) uint8 array, each row
+    #           the card integers of a shuffled shoe.
+    def shoes(self, decks, count):
+        rows = np.tile((np.arange(52 * decks) % 52).astype(np.uint8), (count, 1))
+        return self.generator.permuted(rows, axis=1, out=rows)
+
+    # Shuffles a list in place, as random.shuffle does.
+    #
+    # PARAM x : the list to shuffle.
+    def shuffle(self, x):
+        n = len(x)
+        batch = self.batches.get(n)
+        if(batch is None or batch[1] == len(batch[0])):
+            batch = self.batches[n] = [self.permutations(n, max(1, self.size // max(n, 1))).tolist(), 0]
+        order = batch[0][batch[1]]
+        batch[1] += 1
+        x[:] = list(map(x.__getitem__, order))
+
+    # RETURNS : a float uniformly drawn from [0, 1).
+    def random(self):
+        if(self.position == len(self.floats)):
+            self.floats = self.generator.random(self.size).tolist()
+            self.position = 0
+        value = self.floats[self.position]
+        self.position += 1
+        return value
+
+    # Draws an integer, as random.randrange does.
+    #
+    # PARAM start : the lowest value, or the end of the range
+    #               when stop is not given.
+    # PARAM stop : one past the highest value.
+    #
+    # RETURNS : an integer uniformly drawn from the range.
+    def randrange(self, start, stop=None):
+        if(stop is None):
+            start, stop = 0, start
+        if(stop <= start):
+            raise ValueError("empty range for randrange")
+        return start + int(self.random() * (stop - start))
+
+    # Draws an integer, as random.randint does.
+    #
+    # PARAM a : the lowest value.
+    # PARAM b : the highest value.
+    #
+    # RETURNS : an integer uniformly drawn from a to b.
+    def randint(self, a, b):
+        return self.randrange(a, b + 1)
@@ -0,0 +1,349 @@
+#################################################
+#             Blackjack Benchmarks              #
+#################################################
+#
+# Times the hot paths of the game:
+#
+#  - evaluateHand on typical and worst case hands
+#  - scoring a batch of hands with handbatch.py, next
+#    to scoring the same hands one HandState at a time
+#  - dealCard as dealtCards grows, next to Shoe.deal
+#  - shuffling a shoe with the random module, next to
+#    the batched NumPy generators of batchrng.py
+#  - whole scripted rounds of playRound, covering
+#    the stand, double down and split paths
+#  - settleBet, and Ledger.settleMany on a batch of rounds
+#  - packing a table into a snapshot and back
+#  - a decision policy written as branches, next to
+#    the same policy compiled into a table
+#  - headless simulation throughput
+#
+# Results are written as JSON. Given a baseline file
+# from an earlier run, any benchmark that has slowed
+# down by more than the threshold is flagged as a
+# regression:
+#
+#      python bench.py --output baseline.json
+#      python bench.py --compare baseline.json
+
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+
+import blackjack
+import simulation
+import strategy
+from hand import HandState
+from ledger import Ledger
+from outcome import OUTCOMES
+from shoe import Shoe
+from snapshot import restore, snapshot
+from table import Table
+
+# The batched generators and batch hand scoring need
+# NumPy, and are left out of the suite without it.
+try:
+    import batchrng
+    import handbatch
+except ImportError:
+    batchrng = None
+    handbatch = None
+
+# Builds a shoe that deals the given cards first,
+# followed by the rest of a deck.
+#
+# PARAM cards : The card integers to deal first.
+#
+# RETURNS : A Shoe, and a function that rewinds it
+#           to deal the same cards again.
+def riggedShoe(cards):
+    shoe = Shoe(1, 1.0, random.Random(0))
+    rest = [card for card in range(52) if card not in cards]
+    shoe.cards = list(cards) + rest
+
+    def rewind():
+        shoe.position = 0
+        shoe.roundStart = 0
+
+    return shoe, rewind
+
+# Plays scripted input into the interactive game
+# while throwing away everything it prints.
+#
+# PARAM answers : The answers given to input(), in order.
+# PARAM play : A function playing the game.
+#
+# RETURNS : Whatever play returns.
+def scripted(answers, play):
+    replies = iter(answers)
+    original = builtins.input
+    builtins.input = lambda prompt="": next(replies)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return play()
+    finally:
+        builtins.input = original
+
+# Builds a benchmark of one scripted round of playRound.
+#
+# PARAM cards : The cards dealt, in order.
+# PARAM answers : The player's answers, in order.
+#
+# RETURNS : A function playing the round once.
+def roundBench(cards, answers):
+    shoe, rewind = riggedShoe(cards)
+
+    def run():
+        rewind()
+        scripted(answers, lambda: blackjack.playRound(True, shoe))
+
+    return run
+
+# Builds a benchmark of settling every win state.
+#
+# RETURNS : A function settling one bet of each win state.
+def settleBench():
+    ledger = Ledger(1000)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for outcome in OUTCOMES:
+                blackjack.settleBet(ledger, 500, outcome)
+
+    return run
+
+# Builds a benchmark of settling a batch of rounds
+# in one call.
+#
+# PARAM rounds : The number of rounds in the batch.
+#
+# RETURNS : A function settling the whole batch.
+def settleManyBench(rounds):
+    rng = random.Random(0)
+    pairs = [(rng.randint(1, 100) * 25, rng.choice(OUTCOMES)) for i in range(rounds)]
+    ledger = Ledger()
+    return lambda: ledger.settleMany(pairs)
+
+# Builds a benchmark of drawing one card with dealCard
+# once some cards have already been dealt.
+#
+# PARAM dealt : The number of cards already dealt.
+#
+# RETURNS : A function drawing one card.
+def dealCardBench(dealt):
+    dealtCards = list(range(dealt))
+    return lambda: blackjack.dealCard(dealtCards)
+
+# Builds a benchmark of dealing one card from a shoe,
+# shuffled again each time it runs out.
+#
+# PARAM decks : The number of decks in the shoe.
+#
+# RETURNS : A function dealing one card.
+def shoeBench(decks):
+    shoe = Shoe(decks, 1.0, random.Random(0))
+
+    def deal():
+        if(shoe.position == len(shoe.cards)):
+            shoe.shuffle()
+        return shoe.deal()
+
+    return deal
+
+# Builds a benchmark of shuffling a shoe.
+#
+# PARAM decks : The number of decks in the shoe.
+# PARAM rng : The random number generator shuffled with.
+#
+# RETURNS : A function shuffling the shoe once.
+def shuffleBench(decks, rng):
+    shoe = Shoe(decks, 1.0, rng)
+    return shoe.shuffle
+
+# Builds a benchmark of packing a table with a round
+# in play into a snapshot and restoring it.
+#
+# RETURNS : A function making one round trip.
+def snapshotBench():
+    table = Table(500, 1, 0.75, random.Random(0))
+    table.start(100)
+    return lambda: restore(snapshot(table))
+
+# Deals hands of two to six cards for the hand
+# scoring benchmarks.
+#
+# PARAM count : The number of hands.
+#
+# RETURNS : A list of lists of card integers.
+def randomHands(count):
+    rng = random.Random(0)
+    return [[rng.randrange(52) for i in range(rng.randint(2, 6))] for hand in range(count)]
+
+# Builds a benchmark scoring every hand in a list one
+# HandState at a time.
+#
+# PARAM hands : A list of lists of card integers.
+#
+# RETURNS : A function scoring every hand once.
+def handStateBench(hands):
+    def run():
+        return [HandState(hand).total() for hand in hands]
+    return run
+
+# Builds a benchmark scoring every hand in a list as a
+# single batch, padding included.
+#
+# PARAM hands : A list of lists of card integers.
+#
+# RETURNS : A function scoring every hand once.
+def evaluateHandsBench(hands):
+    return lambda: handbatch.evaluateHands(handbatch.padHands(hands))
+
+# Builds a benchmark asking a policy about a spread
+# of states.
+#
+# PARAM policy : The decision policy.
+#
+# RETURNS : A function asking about every state once.
+def policyBench(policy):
+    states = [(total, False, upcard, True, False) for total in range(4, 22) for upcard in range(1, 11)]
+    def run():
+        for state in states:
+            policy(*state)
+    return run
+
+# Lists every benchmark in the suite.
+#
+# RETURNS : A dictionary mapping benchmark names to
+#           functions performing one operation.
+def suite():
+    typical = [40, 24]
+    worst = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    benches = {
+        "evaluateHand/typical" : lambda: blackjack.evaluateHand(typical),
+        "evaluateHand/worst" : lambda: blackjack.evaluateHand(worst),
+    }
+    hands = randomHands(10000)
+    benches["HandState.total/10000"] = handStateBench(hands)
+    if(handbatch is not None):
+        benches["handbatch.evaluateHands/10000"] = evaluateHandsBench(hands)
+        padded = handbatch.padHands(hands)
+        benches["handbatch.evaluateHands/padded/10000"] = lambda: handbatch.evaluateHands(padded)
+    for dealt in (0, 13, 26, 39, 50):
+        benches["dealCard/dealt=" + str(dealt)] = dealCardBench(dealt)
+    for decks in (1, 6):
+        benches["Shoe.deal/decks=" + str(decks)] = shoeBench(decks)
+        benches["Shoe.shuffle/mt/decks=" + str(decks)] = shuffleBench(decks, random.Random(0))
+        if(batchrng is not None):
+            benches["Shoe.shuffle/pcg64/decks=" + str(decks)] = shuffleBench(decks, batchrng.BatchRandom(0))
+    # 5+6 against 10+7: hit a 3, stand; the dealer draws a 4.
+    benches["playRound/stand"] = roundBench([16, 36, 20, 24, 8, 12], ["h", "s"])
+    # 6+5 against 10+8: double down onto a Jack.
+    benches["playRound/double"] = roundBench([20, 36, 16, 28, 40], ["d"])
+    # 8+8 against 10+7: split to 8+J and 8+3, hit the
+    # second hand to 21, and the dealer draws a 2.
+    benches["playRound/split"] = roundBench([28, 36, 29, 24, 40, 8, 44, 4], ["sp", "s", "h", "s"])
+    benches["settleBet/all"] = settleBench()
+    benches["Ledger.settleMany/10000"] = settleManyBench(10000)
+    benches["snapshot/round-trip"] = snapshotBench()
+    benches["policy/basic/180"] = policyBench(simulation.basicPolicy)
+    benches["policy/compiled/180"] = policyBench(strategy.compilePolicy(simulation.basicPolicy))
+    benches["simulate/1000"] = lambda: simulation.simulate(1000, seed=0)
+    if(batchrng is not None):
+        benches["simulate/pcg64/1000"] = lambda: simulation.simulate(1000, seed=0, generator="pcg64")
+    return benches
+
+# Times every benchmark in the suite.
+#
+# PARAM repeat : The number of timing runs per benchmark.
+#                The fastest run is kept.
+# PARAM only : An optional substring; only benchmarks whose
+#              names contain it are run.
+#
+# RETURNS : A dictionary mapping benchmark names to
+#           dictionaries of the seconds taken per operation
+#           and the number of operations per timing run.
+def runSuite(repeat=5, only=None):
+    random.seed(0)
+    results = {}
+    for name, bench in suite().items():
+        if(only is not None and only not in name):
+            continue
+        timer = timeit.Timer(bench)
+        number = timer.autorange()[0]
+        best = min(timer.repeat(repeat, number))
+        results[name] = {"seconds" : best / number, "number" : number}
+    return results
+
+# Compares results against a baseline.
+#
+# PARAM results : Results from runSuite.
+# PARAM baseline : Results from an earlier runSuite.
+# PARAM threshold : How much slower, as a fraction, a
+#                   benchmark may get before it counts
+#                   as a regression.
+#
+# RETURNS : A list of (name, ratio) for every regression,
+#           where ratio is the new time over the old.
+def compare(results, baseline, threshold):
+    regressions = []
+    for name in results:
+        if(name not in baseline):
+            continue
+        ratio = results[name]["seconds"] / baseline[name]["seconds"]
+        if(ratio > 1.0 + threshold):
+            regressions.append((name, ratio))
+    return regressions
+
+# Runs the suite from the command line.
+#
+# PARAM argv : The arguments, not including the program name.
+#
+# RETURNS : 1 if any regression was found, else 0.
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench", description="Benchmark the game's hot paths.")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, as a fraction")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark")
+    parser.add_argument("--only", help="only run benchmarks whose names contain this")
+    args = parser.parse_args(argv)
+
+    results = runSuite(args.repeat, args.only)
+    baseline = {}
+    if(args.compare):
+        with open(args.compare) as file:
+            baseline = json.load(file)["results"]
+
+    for name in results:
+        line = "{:<28} {:>12.3f} us".format(name, results[name]["seconds"] * 1e6)
+        if(name in baseline):
+            line += "   x{:.2f}".format(results[name]["seconds"] / baseline[name]["seconds"])
+        print(line)
+
+    if(args.output):
+        report = {
+            "python" : platform.python_version(),
+            "platform" : platform.platform(),
+            "time" : time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results" : results,
+        }
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, ratio in regressions:
+        print("REGRESSION: " + name + " is {:.0%} slower".format(ratio - 1.0))
+    if(regressions):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
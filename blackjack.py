@@ -35,9 +35,19 @@
 #  6.0  : Won on double down, original bet pays back 3:1.
 #  6.5  : Lost on double down, original bet is lost twice over.
 #  6.75 : Pushed on double down. Bet is returned.
+#  7.0  : Surrendered. Half the bet is returned.
 
 import random
 
+from card import CARDS
+from console import CONSOLE
+from hand import HandState
+from ledger import Ledger, formatCents, toCents
+from outcome import OUTCOMES
+from roundstate import DOUBLE, HIT, SPLIT, STAND, SURRENDER, RoundState, TableRound
+from rules import HOUSE
+from shoe import Shoe
+
 # Evaluates the point value of a hand of cards.
 # All face cards are valued at 10 points,
 # All numerical points are face value,
@@ -45,24 +55,12 @@ import random
 # at 11 points until the hand's total surpasses
 # 21 points, in which case it is valued at 1 point.
 #
-# PARAM hand : A list of integers (valued between 1 and 52, inclusive)
+# PARAM hand : A list of integers (valued between 0 and 51, inclusive)
 #              representing cards.
 #              Each card integer must follow header conventions.
 # RETURNS : An integer representing the value of the given hand.
 def evaluateHand(hand):
-    sum = 0
-    for i in hand:
-        if(int(i/4) + 1 <= 10):
-            sum += int(i / 4) + 1
-        else:
-            sum += 10
-
-    if(sum <= 11):
-        for i in hand:
-            if(int(i/4) + 1 == 1):
-                sum += 10
-                break
-    return sum
+    return HandState(hand).total()
 
 # Gets a readout representing a card in the format:
 # [Value of Suit] (ex. [King of Hearts])
@@ -73,32 +71,7 @@ def evaluateHand(hand):
 #
 # RETURNS : A string representing the given card.
 def printCard(card):
-    value = int(card / 4) + 1
-    suit = card % 4
-    rString = ""
-    if(value == 1):
-        rString += "Ace"
-    elif(value == 11):
-        rString += "Jack"
-    elif(value == 12):
-        rString += "Queen"
-    elif(value == 13):
-        rString += "King"
-    else:
-        rString += str(value)
-
-    rString += " of "
-
-    if(suit == 0):
-        rString += "Hearts"
-    elif(suit == 1):
-        rString += "Diamonds"
-    elif(suit == 2):
-        rString += "Clubs"
-    elif(suit == 3):
-        rString += "Spades"
-
-    return rString
+    return CARDS[card].name
 
 # Gets a readout representing the cards
 # in the given hand.
@@ -173,7 +146,9 @@ def printDealerHand(hand, blank):
 # Gets a new random card, will not deal
 # the same card twice. Dealt card
 # must be added to dealtCards after
-# the fact to avoid redealing.
+# the fact to avoid redealing. Rounds
+# are dealt from a Shoe instead, which
+# does not slow down as cards go out.
 #
 # PARAM dealtCards : A list of card integers
 #                    previously dealt out using
@@ -181,23 +156,82 @@ def printDealerHand(hand, blank):
 #                    These cards will not be dealt
 #                    again. Integers must follow
 #                    header conventions.
+# PARAM rng : The random number generator drawn
+#             from. Defaults to the random module.
 #
 # RETURNS : an integer representing a card
 #           following header conventions.
 #           This integer is not contained in
 #           dealtCards.
-def dealCard(dealtCards):
-    card = random.randint(1, 52)
-    sentinel = True
-    while(sentinel):
-        sentinel = False
-        for i in dealtCards:
-            if(i == card):
-                sentinel = True
-                break
-        card = random.randint(1, 52)
+def dealCard(dealtCards, rng=random):
+    card = rng.randint(0, 51)
+    while(card in dealtCards):
+        card = rng.randint(0, 51)
     return card
 
+# Announces each card the dealer drew once the
+# player was done, one hit at a time.
+#
+# PARAM dealerHand : A HandState holding the
+#                    dealer's finished hand.
+# PARAM console : The Console printed to.
+def printDealerDraws(dealerHand, console=CONSOLE):
+    for i in range(3, dealerHand.count + 1):
+        console.print("Dealer hits.")
+        if(i == dealerHand.count and dealerHand.isBust()):
+            console.print(printDealerHand(dealerHand.cards, False))
+            console.print("Dealer busts!")
+        else:
+            console.print(printDealerHand(dealerHand.cards[:i], True))
+
+# Amount credited back to the wallet per unit of bet
+# for each win condition, after the bet has already
+# been taken out of the wallet.
+PAYOUTS = {outcome.code : outcome.quarters / 4 for outcome in OUTCOMES}
+
+# What is announced for each win condition, and the
+# amount shown with it in quarters of the bet.
+MESSAGES = {
+    0.0  : ("You lost. The dealer keeps your bet. ", 0),
+    1.0  : ("You pushed. Your bet is returned. ", 0),
+    1.5  : ("You got blackjack! Your bet is payed 3:2 and you win ${amount}", 6),
+    2.0  : ("You win! Your bet is payed 2:1 and you win ${amount}", 8),
+    3.0  : ("One hand pushed and the other won. Your bet payed 3:2 and you win ${amount}", 6),
+    3.25 : ("One hand pushed and the other lost. Half your bet is returned - ${amount}", 2),
+    3.5  : ("Both hands pushed. Your bet is returned - ${amount}", 4),
+    3.75 : ("One hand won and the other lost. Your original bet is returned - ${amount}", 4),
+    3.8  : ("Both hands lost. The dealer keeps your bet. ", 0),
+    3.9  : ("Both hands won! Your bet is payed 2:1 and you win ${amount}", 8),
+    4.0  : ("Both hands got blackjack, so your bet is payed 3:2 and you win ${amount}", 6),
+    4.5  : ("One hand got blackjack and the other lost, so your bet is payed 3:4, returning you ${amount}", 3),
+    4.75 : ("One hand got blackjack and the other pushed, so your bet is payed 5:4, and you win ${amount}", 5),
+    5.0  : ("One hand got blackjack and the other won, so your bet is payed 7:4 and you win ${amount}", 7),
+    6.0  : ("You won on a double down. Your doubled ${bet} bet pays back ${amount}", 16),
+    6.5  : ("You lost on a double down. Your doubled ${bet} bet is lost.", 0),
+    6.75 : ("You pushed on a double down. Your doubled bet was returned.", 0),
+    7.0  : ("You surrendered. Half your bet is returned - ${amount}", 2),
+}
+
+# What each action is called when asking for it.
+ACTION_NAMES = {
+    HIT : "(h)it",
+    STAND : "(s)tand",
+    DOUBLE : "(d)ouble down",
+    SPLIT : "(sp)lit",
+    SURRENDER : "(su)rrender",
+}
+
+# Gets the question asking for any of the given
+# actions. Only rounds offering surrender ask this
+# way; the others keep the questions they always had.
+#
+# PARAM actions : A list of two or more action strings.
+#
+# RETURNS : The question to ask.
+def actionPrompt(actions):
+    names = [ACTION_NAMES[action] for action in actions]
+    return "Do you want to " + ", ".join(names[:-1]) + ", or " + names[-1] + "? "
+
 # Plays a round of Blackjack. Deals the cards,
 # handles the moves, and determines whether the
 # player won or lost, and by how much their bet
@@ -206,266 +240,253 @@ def dealCard(dealtCards):
 # PARAM canDouble : Whether the player has
 #                   sufficient money available
 #                   to double down on their bet.
+# PARAM shoe : The Shoe to deal from. When not
+#              given, the round is dealt from
+#              a freshly shuffled shoe.
+# PARAM rules : The Rules played by.
+# PARAM console : The Console asked for moves and
+#                 printed to. Defaults to the terminal.
+# PARAM rng : The random number generator shuffling
+#             the fresh shoe, when no shoe is given.
 #
-# RETURNS : A float representing the win state
-#           of the game. The conventions for this
-#           are outlined in the header.
-def playRound(canDouble):
-    playerHand = []
-    splitHand = []
-    dealerHand = []
-    dealtCards = []
-
-    for i in range(2):
-        card = dealCard(dealtCards)
-        playerHand.append(card)
-        dealtCards.append(card)
-        card = dealCard(dealtCards)
-        dealerHand.append(card)
-        dealtCards.append(card)
-
-    print(printDealerHand(dealerHand, True))
-    print(printPlayerHand(playerHand))
-    print("Your current total is " + str(evaluateHand(playerHand)))
-
-    win = 0.0
-
-    if(evaluateHand(playerHand) == 21):
-        print("Blackjack!")
-        win = 1.5
+# The rules themselves live in roundstate.py; this
+# only asks for the moves and reports on them.
+#
+# RETURNS : The Outcome of the round, holding the
+#           win state as outlined in the header along
+#           with the result of each hand.
+def playRound(canDouble, shoe=None, rules=HOUSE, console=CONSOLE, rng=None):
+    if(shoe is None):
+        shoe = Shoe(rules.decks, rng=rng)
+    state = RoundState(shoe, canDouble, rules)
+    playerHand = state.hands[0]
+    dealerHand = state.dealer
+
+    console.print(printDealerHand(dealerHand.cards, True))
+    console.print(printPlayerHand(playerHand.cards))
+    console.print("Your current total is " + str(playerHand.total()))
+
+    if(state.isDone()):
+        console.print("Blackjack!")
+        return state.outcome
+
+    actions = state.actions()
+    if(SURRENDER in actions):
+        inString = console.input(actionPrompt(actions))
+    elif(DOUBLE in actions):
+        if(SPLIT in actions):
+            inString = console.input("Do you want to (h)it', (s)tand, (d)ouble down, or (sp)lit? ")
+        else:
+            inString = console.input("Do you want to (h)it, (s)tand, or (d)ouble down? ")
     else:
-        inString = ""
-        if(canDouble):
-            if(int(playerHand[0] / 4) == int(playerHand[1] / 4)):
-                inString = input("Do you want to (h)it', (s)tand, (d)ouble down, or (sp)lit? ")
-            else:
-                inString = input("Do you want to (h)it, (s)tand, or (d)ouble down? ")
+        if(SPLIT in actions):
+            inString = console.input("Do you want to (h)it', (s)tand, or (sp)lit? ")
         else:
-            if(int(playerHand[0] / 4) == int(playerHand[1] / 4)):
-                inString = input("Do you want to (h)it', (s)tand, or (sp)lit? ")
-            else:
-                inString = input("Do you want to (h)it or (s)tand? ")
-        print()
-        inString = inString.lower()
-
-        if(inString == "sp"):#----------------------Beginning of split hand------------------------------------------------------
-            store = playerHand[1]
-            splitHand.append(store)
-            card = dealCard(dealtCards)
-            dealtCards.append(card)
-            playerHand[1] = card
-            card = dealCard(dealtCards)
-            dealtCards.append(card)
-            splitHand.append(card)
-            win = 3.80
-            playerBlackjack = False
-            splitBlackjack = False
-
-            print(printSplitHand(playerHand, splitHand))
-            if(evaluateHand(playerHand) == 21):
-                print("Hand 1 has blackjack!")
-                playerBlackjack = True
-            else:
-                inString = input("Hand 1: Do you want to (h)it or (s)tand? ")
-                print()
-                while(inString != 's'):
-                    card = dealCard(dealtCards)
-                    playerHand.append(card)
-                    dealtCards.append(card)
-                    print(printPlayerHand(playerHand))
-                    print("Your new total is " + str(evaluateHand(playerHand)))
-                    if(evaluateHand(playerHand) > 21):
-                        print("Bust!")
-                        break
-                    inString = input("Hand 1: Do you want to (h)it or (s)tand? ")
-                    print()
-                    inString = inString.lower()
-
-            print(printSplitHand(playerHand, splitHand))
-            if(evaluateHand(splitHand) == 21):
-                print("Hand 2 has blackjack!")
-                splitBlackjack = True
-            else:
-                inString = input("Hand 2: Do you want to (h)it or (s)tand? ")
-                print()
-                while(inString != 's'):
-                    card = dealCard(dealtCards)
-                    splitHand.append(card)
-                    dealtCards.append(card)
-                    print(printPlayerHand(splitHand))
-                    print("Your new total is " + str(evaluateHand(splitHand)))
-                    if(evaluateHand(playerHand) > 21):
-                        print("Bust!")
-                        break
-                    inString = input("Hand 2: Do you want to (h)it or (s)tand? ")
-                    print()
-                    inString = inString.lower()
-
-            print()
-            if(not(playerBlackjack) or not(splitBlackjack)):
-                while(evaluateHand(dealerHand) < 18):
-                    card = dealCard(dealtCards)
-                    dealerHand.append(card)
-                    dealtCards.append(card)
-                    print("Dealer hits.")
-                    if(evaluateHand(dealerHand) > 21):
-                        print(printDealerHand(dealerHand, False))
-                        print("Dealer busts!")
-                    else:
-                        print(printDealerHand(dealerHand, True))
-
-            if(not(playerBlackjack) and not(splitBlackjack)):
-                if(evaluateHand(dealerHand) <= 21):
-                    if(evaluateHand(playerHand) <= 21 and evaluateHand(splitHand) <= 21):
-                        if(evaluateHand(playerHand) == evaluateHand(dealerHand) and evaluateHand(splitHand) == evaluateHand(dealerHand)):
-                            win = 3.50
-                        elif((evaluateHand(playerHand) == evaluateHand(dealerHand) and evaluateHand(splitHand) < evaluateHand(dealerHand)) or (evaluateHand(splitHand) == evaluateHand(dealerHand) and evaluateHand(playerHand) < evaluateHand(dealerHand))):
-                            win = 3.25
-                        elif((evaluateHand(playerHand) == evaluateHand(dealerHand) and evaluateHand(splitHand) > evaluateHand(dealerHand)) or (evaluateHand(splitHand) == evaluateHand(dealerHand) and evaluateHand(playerHand) > evaluateHand(dealerHand))):
-                            win = 3.0
-                        elif((evaluateHand(playerHand) > evaluateHand(dealerHand) and evaluateHand(splitHand) < evaluateHand(dealerHand)) or (evaluateHand(splitHand) > evaluateHand(dealerHand) and evaluateHand(playerHand) < evaluateHand(dealerHand))):
-                            win = 3.75
-                        elif(evaluateHand(playerHand) < evaluateHand(dealerHand) and evaluateHand(splitHand) < evaluateHand(dealerHand)):
-                            win = 3.80
-                        elif(evaluateHand(playerHand) > evaluateHand(dealerHand) and evaluateHand(splitHand) > evaluateHand(dealerHand)):
-                            win = 3.90
-                    elif(evaluateHand(playerHand) <= 21 or evaluateHand(splitHand) <= 21):
-                        if(evaluateHand(playerHand) <= 21):
-                            if(evaluateHand(splitHand) > evaluateHand(dealerHand)):
-                                win = 3.75
-                            elif(evaluateHand(splitHand) == evaluateHand(dealerHand)):
-                                win = 3.25
-                        else:
-                            if(evaluateHand(playerHand) > evaluateHand(dealerHand)):
-                                win = 3.75
-                            elif(evaluateHand(playerHand) == evaluateHand(dealerHand)):
-                                win = 3.25
-                else:
-                    if(evaluateHand(playerHand) <= 21 and evaluateHand(splitHand) <= 21):
-                        win = 3.9
-                    elif(evaluateHand(playerHand) <= 21 or evaluateHand(splitHand) <= 21):
-                        win = 3.75
-            else:
-                if(playerBlackjack and splitBlackjack):
-                    win = 4.0
-                elif(playerBlackjack):
-                    if(evaluateHand(dealerHand) > 21):
-                        win = 5.0
-                    elif(evaluateHand(splitHand) <= 21):
-                        if(evaluateHand(splitHand) > evaluateHand(dealerHand)):
-                            win = 5.0
-                        elif(evaluateHand(splitHand) == evaluateHand(dealerHand)):
-                            win = 4.75
-                        else:
-                            win = 4.5
-                    else:
-                        win = 4.5
-                elif(splitBlackjack):
-                    if(evaluateHand(dealerHand) > 21):
-                        win = 5.0
-                    elif(evaluateHand(playerHand) <= 21):
-                        if(evaluateHand(playerHand) > evaluateHand(dealerHand)):
-                            win = 5.0
-                        elif(evaluateHand(playerHand) == evaluateHand(dealerHand)):
-                            win = 4.75
-                        else:
-                            win = 4.5
-                    else:
-                        win = 4.5
-            print()
-
-            if(evaluateHand(playerHand) <= 21):
-                print(printPlayerHand(playerHand) + " scoring " + str(evaluateHand(playerHand)))
-            else:
-                print(printPlayerHand(playerHand) + " busts.")
+            inString = console.input("Do you want to (h)it or (s)tand? ")
+    console.print()
+    action = readAction(state, inString)
 
-            if(evaluateHand(splitHand) <= 21):
-                print(printPlayerHand(splitHand) + " scoring " + str(evaluateHand(splitHand)))
-            else:
-                print(printPlayerHand(splitHand) + " busts.")
+    if(action == SURRENDER):
+        state.act(SURRENDER)
+        console.print("You surrender.")
+        console.print(printDealerHand(dealerHand.cards, False) + " scoring " + str(dealerHand.total()))
+        return state.outcome
 
-            if(evaluateHand(dealerHand) <= 21):
-                print(printDealerHand(dealerHand, False) + " scoring " + str(evaluateHand(dealerHand)))
-            else:
-                print(printDealerHand(dealerHand) + " busts.")
-        else: #---------------Beginning of single hand ------------------------------------------------------------------------------------------------------
-            if(inString != "d"):
-                while(inString != "s"):
-                    card = dealCard(dealtCards)
-                    playerHand.append(card)
-                    dealtCards.append(card)
-                    print(printPlayerHand(playerHand))
-                    print("Your new total is " + str(evaluateHand(playerHand)))
-                    if(evaluateHand(playerHand) > 21):
-                        print("Bust!")
-                        break
-                    inString = input("Do you want to (h)it or (s)tand? ")
-                    print()
-                    inString = inString.lower()
-                print()
-
-                while(evaluateHand(dealerHand) < 18):
-                    card = dealCard(dealtCards)
-                    dealerHand.append(card)
-                    dealtCards.append(card)
-                    print("Dealer hits.")
-                    if(evaluateHand(dealerHand) > 21):
-                        print(printDealerHand(dealerHand, False))
-                        print("Dealer busts!")
-                    else:
-                        print(printDealerHand(dealerHand, True))
-
-                if(evaluateHand(dealerHand) <= 21):
-                    if(evaluateHand(playerHand) <= 21 and evaluateHand(playerHand) >= evaluateHand(dealerHand)):
-                        win = 2.0
-                    elif(evaluateHand(playerHand) <= 21 and evaluateHand(playerHand) == evaluateHand(dealerHand)):
-                        win = 1.0
-                else:
-                    if(evaluateHand(playerHand) <= 21):
-                        win = 2.0
-                    else:
-                        win = 0.0
-                print()
-            else:
-                win = 6.5
-                card = dealCard(dealtCards)
-                playerHand.append(card)
-                dealtCards.append(card)
-                print(printPlayerHand(playerHand))
-                print("Your new total is " + str(evaluateHand(playerHand)) + "\n")
-
-                while(evaluateHand(dealerHand) < 18):
-                    card = dealCard(dealtCards)
-                    dealerHand.append(card)
-                    dealtCards.append(card)
-                    print("Dealer hits.")
-                    if(evaluateHand(dealerHand) > 21):
-                        print(printDealerHand(dealerHand, False))
-                        print("Dealer busts!")
-                    else:
-                        print(printDealerHand(dealerHand, True))
-
-                if(evaluateHand(dealerHand) <= 21):
-                    if(evaluateHand(playerHand) <= 21 and evaluateHand(playerHand) >= evaluateHand(dealerHand)):
-                        win = 6.0
-                    elif(evaluateHand(playerHand) <= 21 and evaluateHand(playerHand) == evaluateHand(dealerHand)):
-                        win = 6.75
-                else:
-                    if(evaluateHand(playerHand) <= 21):
-                        win = 6.0
-                    else:
-                        win = 6.5
-                print()
-
-            if(evaluateHand(playerHand) <= 21):
-                print(printPlayerHand(playerHand) + " scoring " + str(evaluateHand(playerHand)))
+    if(action == SPLIT):#----------------------Beginning of split hand------------------------------------------------------
+        state.act(SPLIT)
+        playerHand, splitHand = state.hands
+
+        console.print(printSplitHand(playerHand.cards, splitHand.cards))
+        playSplitHand(state, 0, console)
+        console.print(printSplitHand(playerHand.cards, splitHand.cards))
+        playSplitHand(state, 1, console)
+
+        console.print()
+        printDealerDraws(dealerHand, console)
+        console.print()
+
+        for hand in state.hands:
+            if(hand.isBust()):
+                console.print(printPlayerHand(hand.cards) + " busts.")
             else:
-                print(printPlayerHand(playerHand) + " busts.")
-            if(evaluateHand(dealerHand) <= 21):
-                print(printDealerHand(dealerHand, False) + " scoring " + str(evaluateHand(dealerHand)))
+                console.print(printPlayerHand(hand.cards) + " scoring " + str(hand.total()))
+    else: #---------------Beginning of single hand ------------------------------------------------------------------------------------------------------
+        if(action != DOUBLE):
+            while(action != STAND):
+                state.act(HIT)
+                console.print(printPlayerHand(playerHand.cards))
+                console.print("Your new total is " + str(playerHand.total()))
+                if(playerHand.isBust()):
+                    console.print("Bust!")
+                    break
+                inString = console.input("Do you want to (h)it or (s)tand? ")
+                console.print()
+                action = readAction(state, inString)
+            if(not(state.isDone())):
+                state.act(STAND)
+            console.print()
+        else:
+            state.act(DOUBLE)
+            console.print(printPlayerHand(playerHand.cards))
+            console.print("Your new total is " + str(playerHand.total()) + "\n")
+
+        printDealerDraws(dealerHand, console)
+        console.print()
+
+        if(not(playerHand.isBust())):
+            console.print(printPlayerHand(playerHand.cards) + " scoring " + str(playerHand.total()))
+        else:
+            console.print(printPlayerHand(playerHand.cards) + " busts.")
+
+    if(not(dealerHand.isBust())):
+        console.print(printDealerHand(dealerHand.cards, False) + " scoring " + str(dealerHand.total()))
+    else:
+        console.print(printDealerHand(dealerHand.cards, False) + " busts.")
+    return state.outcome
+
+# Gets the action the player asked for. Anything
+# that is not a move they may make now is a hit.
+#
+# PARAM state : The RoundState being played.
+# PARAM inString : What the player typed.
+#
+# RETURNS : One of the actions the round allows.
+def readAction(state, inString):
+    action = inString.lower()
+    if(action in state.actions()):
+        return action
+    return HIT
+
+# Plays one of a pair of split hands at the console.
+#
+# PARAM state : The RoundState being played, with
+#               the hand at index next in play.
+# PARAM index : The index of the hand, 0 or 1.
+# PARAM console : The Console asked for moves.
+def playSplitHand(state, index, console=CONSOLE):
+    hand = state.hands[index]
+    label = "Hand " + str(index + 1)
+    if(state.blackjacks[index]):
+        console.print(label + " has blackjack!")
+        return
+    inString = console.input(label + ": Do you want to (h)it or (s)tand? ")
+    console.print()
+    while(readAction(state, inString) != STAND):
+        state.act(HIT)
+        console.print(printPlayerHand(hand.cards))
+        console.print("Your new total is " + str(hand.total()))
+        if(hand.isBust()):
+            console.print("Bust!")
+            return
+        inString = console.input(label + ": Do you want to (h)it or (s)tand? ")
+        console.print()
+    state.act(STAND)
+
+# Plays a round at a table of several seats. Each
+# seat is dealt in and plays in turn, and the dealer
+# then draws once for the whole table.
+#
+# PARAM canDoubles : A list with an entry for each seat,
+#                    reading TRUE iff that seat has
+#                    sufficient money available to
+#                    double down on their bet.
+# PARAM shoe : The Shoe to deal from. When not
+#              given, the round is dealt from
+#              a freshly shuffled shoe.
+# PARAM rules : The Rules played by.
+# PARAM console : The Console asked for moves and
+#                 printed to. Defaults to the terminal.
+# PARAM rng : The random number generator shuffling
+#             the fresh shoe, when no shoe is given.
+#
+# RETURNS : A list of the Outcome of each seat.
+def playTableRound(canDoubles, shoe=None, rules=HOUSE, console=CONSOLE, rng=None):
+    if(shoe is None):
+        shoe = Shoe(rules.decks, rng=rng)
+    table = TableRound(shoe, canDoubles, rules)
+    dealerHand = table.dealer
+
+    console.print(printDealerHand(dealerHand.cards, True))
+    for i in range(len(table.seats)):
+        seat = table.seats[i]
+        label = "Seat " + str(i + 1)
+        console.print()
+        console.print(label + " - " + printPlayerHand(seat.hands[0].cards))
+        console.print("Your current total is " + str(seat.hands[0].total()))
+        if(seat.isDone()):
+            console.print("Blackjack!")
+        else:
+            playTableSeat(table, i, label, console)
+
+    console.print()
+    printDealerDraws(dealerHand, console)
+    console.print()
+    for i in range(len(table.seats)):
+        seat = table.seats[i]
+        label = "Seat " + str(i + 1) + " - "
+        if(seat.outcome.code == 7.0):
+            console.print(label + "surrendered.")
+            continue
+        for hand in seat.hands:
+            if(hand.isBust()):
+                console.print(label + printPlayerHand(hand.cards) + " busts.")
             else:
-                print(printDealerHand(dealerHand, False) + " busts.")
-    return win
+                console.print(label + printPlayerHand(hand.cards) + " scoring " + str(hand.total()))
+    if(not(dealerHand.isBust())):
+        console.print(printDealerHand(dealerHand.cards, False) + " scoring " + str(dealerHand.total()))
+    else:
+        console.print(printDealerHand(dealerHand.cards, False) + " busts.")
+    return table.outcomes()
+
+# Plays one seat of a table round at the console,
+# until the seat is finished.
+#
+# PARAM table : The TableRound being played, with the
+#               seat at index in play.
+# PARAM index : The index of the seat.
+# PARAM label : What the seat is called.
+# PARAM console : The Console asked for moves.
+def playTableSeat(table, index, label, console=CONSOLE):
+    seat = table.seats[index]
+    while(not(table.isDone()) and table.current == index):
+        hand = seat.hand()
+        prefix = label + ": "
+        if(len(seat.hands) == 2):
+            prefix = label + ", hand " + str(seat.current + 1) + ": "
+        inString = console.input(prefix + actionPrompt(seat.actions()))
+        console.print()
+        action = readAction(seat, inString)
+        table.act(action)
+        if(action == SURRENDER):
+            console.print(label + " surrenders.")
+        elif(action == SPLIT):
+            console.print(printSplitHand(seat.hands[0].cards, seat.hands[1].cards))
+            for i in range(2):
+                if(seat.blackjacks[i]):
+                    console.print("Hand " + str(i + 1) + " has blackjack!")
+        elif(action != STAND):
+            console.print(printPlayerHand(hand.cards))
+            console.print("Your new total is " + str(hand.total()))
+            if(hand.isBust()):
+                console.print("Bust!")
+
+# Pays out a finished round, announcing the result.
+# What a natural pays follows the ledger's credits,
+# which the rules may change.
+#
+# PARAM ledger : The player's Ledger, with the bet
+#                already staked.
+# PARAM bet : The amount bet on the round, in cents.
+# PARAM outcome : The Outcome of the round.
+# PARAM console : The Console printed to.
+#
+# RETURNS : The amount credited back, in cents.
+def settleBet(ledger, bet, outcome, console=CONSOLE):
+    message, shown = MESSAGES[outcome.code]
+    if(outcome.blackjack):
+        shown = ledger.credits[outcome.index]
+    console.print(message.format(bet=formatCents(bet), amount=formatCents((bet * shown) >> 2)))
+    return ledger.settle(bet, outcome)
 
 # Plays a game of Blackjack. This handles the metagame,
 # i.e. the betting, the wallet, and the returns. Only
@@ -473,79 +494,109 @@ def playRound(canDouble):
 #
 # PARAM wallet : A number representing the amount
 #                of money you begin the game with.
+# PARAM decks : The number of decks in the shoe,
+#               which is kept between rounds and
+#               reshuffled once the cut card comes out.
+#               Defaults to the decks of the rules.
+# PARAM rules : The Rules played by.
+# PARAM console : The Console asked for bets and moves
+#                 and printed to. Defaults to the terminal.
+# PARAM rng : The random number generator shuffling the
+#             shoe. Defaults to the random module.
+# PARAM record : An optional list, to which a tuple of the
+#                bet, the Outcome and the balance left, in
+#                cents, is added as each round is settled.
+# PARAM shoe : An optional Shoe to deal from, in place of
+#              one made from decks and rng.
 #
-def playBlackjack(wallet):
+def playBlackjack(wallet, decks=None, rules=HOUSE, console=CONSOLE, rng=None, record=None, shoe=None):
+    if(decks is None):
+        decks = rules.decks
+    if(shoe is None):
+        shoe = Shoe(decks, rng=rng)
+    ledger = Ledger(toCents(wallet), rules.credits())
     playAgain = True
-    while(playAgain and wallet > 0):
-        print("You have $" + "{:.2f}".format(wallet))
-        bet = float(input("Place your bet. $"))
-        while(bet > wallet):
-            bet = float(input("You don't have enough money for that bet. \nWhat's your bet? $"))
-        win = 0.0
-        wallet -= bet
-        if(wallet >= bet):
-            win = playRound(True)
+    while(playAgain and ledger.balance > 0):
+        if(shoe.needsShuffle()):
+            console.print("The shoe is shuffled.")
+            shoe.shuffle()
+        console.print("You have $" + formatCents(ledger.balance))
+        bet = toCents(float(console.input("Place your bet. $")))
+        while(bet > ledger.balance):
+            bet = toCents(float(console.input("You don't have enough money for that bet. \nWhat's your bet? $")))
+        ledger.stake(bet)
+        if(ledger.balance >= bet):
+            outcome = playRound(True, shoe, rules, console)
         else:
-            win = playRound(False)
-        print()
-        if(win == 2.0):
-            print("You win! Your bet is payed 2:1 and you win $" + "{:.2f}".format(bet * 2))
-            wallet += 2 * bet
-        elif(win == 1.5):
-            print("You got blackjack! Your bet is payed 3:2 and you win $" + "{:.2f}".format(bet * 1.5))
-            wallet += 1.5 * bet
-        elif(win == 1.0):
-            print("You pushed. Your bet is returned. ")
-            wallet += bet
-        elif(win == 0.0):
-            print("You lost. The dealer keeps your bet. ")
-        elif(win == 3.0):
-            print("One hand pushed and the other won. Your bet payed 3:2 and you win $" + "{:.2f}".format(bet * 1.5))
-            wallet += 1.5 * bet
-        elif(win == 3.25):
-            print("One hand pushed and the other lost. Half your bet is returned - $" + "{:.2f}".format(bet * .5))
-            wallet += .5 * bet
-        elif(win == 3.5):
-            print("Both hands pushed. Your bet is returned - $" + "{:.2f}".format(bet))
-            wallet += bet
-        elif(win == 3.75):
-            print("One hand won and the other lost. Your original bet is returned - $" + "{:.2f}".format(bet))
-            wallet += bet
-        elif(win == 3.8):
-            print("Both hands lost. The dealer keeps your bet. ")
-        elif(win == 3.9):
-            print("Both hands won! Your bet is payed 2:1 and you win $" + "{:.2f}".format(bet * 2))
-            wallet += bet*2
-        elif(win == 4.0):
-            print("Both hands got blackjack, so your bet is payed 3:2 and you win $" + "{:.2f}".format(bet * 1.5))
-            wallet += 1.5 * bet
-        elif(win == 4.5):
-            print("One hand got blackjack and the other lost, so your bet is payed 3:4, returning you $" + "{:.2f}".format(bet * .75))
-            wallet += .75 * bet
-        elif(win == 4.75):
-            print("One hand got blackjack and the other pushed, so your bet is payed 5:4, and you win $" + "{:.2f}".format(bet * 1.25))
-            wallet += 1.25 * bet
-        elif(win == 5.0):
-            print("One hand got blackjack and the other won, so your bet is payed 7:4 and you win $" + "{:.2f}".format(bet * 1.75))
-            wallet += 1.75 * bet
-        elif(win == 6.0):
-            print("You won on a double down. Your doubled $" + "{:.2f}".format(bet) + " bet pays back $" + "{:.2f}".format(bet * 4))
-            wallet += 3 * bet
-        elif(win == 6.5):
-            print("You lost on a double down. Your doubled $" + "{:.2f}".format(bet) + " bet is lost.")
-            wallet -= bet
-        elif(win == 6.75):
-            print("You pushed on a double down. Your doubled bet was returned.")
-        if(wallet > 0):
-            cont = input("Do you want to play again? (Y/N) ").lower()
+            outcome = playRound(False, shoe, rules, console)
+        console.print()
+        settleBet(ledger, bet, outcome, console)
+        if(record is not None):
+            record.append((bet, outcome, ledger.balance))
+        if(ledger.balance > 0):
+            cont = console.input("Do you want to play again? (Y/N) ").lower()
             if(cont == "n"):
                 playAgain = False
         else:
-            print("You're broke. Sorry.")
+            console.print("You're broke. Sorry.")
             playAgain = False
-        print()
-        print("------------------------------")
-        print()
+        console.print()
+        console.print("------------------------------")
+        console.print()
+
+# Plays a game of Blackjack at a table of several
+# seats sharing one shoe and one dealer. Each seat
+# bets from their own wallet, and leaves the table
+# once broke or once they don't want to play again.
+#
+# PARAM wallets : A list of the amount of money each
+#                 seat begins the game with.
+# PARAM decks : The number of decks in the shoe.
+#               Defaults to the decks of the rules.
+# PARAM rules : The Rules played by.
+# PARAM console : The Console asked for bets and moves
+#                 and printed to. Defaults to the terminal.
+# PARAM rng : The random number generator shuffling the
+#             shoe. Defaults to the random module.
+#
+def playTable(wallets, decks=None, rules=HOUSE, console=CONSOLE, rng=None):
+    if(decks is None):
+        decks = rules.decks
+    shoe = Shoe(decks, rng=rng)
+    ledgers = [Ledger(toCents(wallet), rules.credits()) for wallet in wallets]
+    seats = [i for i in range(len(ledgers)) if ledgers[i].balance > 0]
+    while(seats):
+        if(shoe.needsShuffle()):
+            console.print("The shoe is shuffled.")
+            shoe.shuffle()
+        bets = []
+        for i in seats:
+            ledger = ledgers[i]
+            console.print("Seat " + str(i + 1) + " has $" + formatCents(ledger.balance))
+            bet = toCents(float(console.input("Seat " + str(i + 1) + ", place your bet. $")))
+            while(bet > ledger.balance):
+                bet = toCents(float(console.input("You don't have enough money for that bet. \nWhat's your bet? $")))
+            ledger.stake(bet)
+            bets.append(bet)
+        console.print()
+        outcomes = playTableRound([ledgers[seats[j]].balance >= bets[j] for j in range(len(seats))], shoe, rules, console)
+        console.print()
+        for j in range(len(seats)):
+            console.print("Seat " + str(seats[j] + 1) + ": ", end="")
+            settleBet(ledgers[seats[j]], bets[j], outcomes[j], console)
+        staying = []
+        for i in seats:
+            if(ledgers[i].balance > 0):
+                cont = console.input("Seat " + str(i + 1) + ", do you want to play again? (Y/N) ").lower()
+                if(cont != "n"):
+                    staying.append(i)
+            else:
+                console.print("Seat " + str(i + 1) + " is broke. Sorry.")
+        seats = staying
+        console.print()
+        console.print("------------------------------")
+        console.print()
 
-playBlackjack(5.00)
-input()
+if __name__ == "__main__":
+    playBlackjack(5.00)
+    input()
@@ -1,47 +1,44 @@
-# 
+#
 # Abstraction - A playing card, with value 1-13 (A,2->10,J,Q,K)
-#               and suit (Hearts, Spades, Clubs, Diamonds).
+#               and suit (Hearts, Diamonds, Clubs, Spades).
+#               There are exactly 52 cards, each shared by
+#               everything that holds it, and each is matched
+#               to the card integers used by blackjack.py:
+#               number = 4*(value - 1) + suit.
 #
 # Rep Invariants:
 #  1 <= value <= 13
-#  1 <= suit <= 4
+#  0 <= suit <= 3
+#  number == 4*(value - 1) + suit
+#
+# Cards are shared, so they must never be modified.
+
+VALUE_NAMES = ["Ace", "2", "3", "4", "5", "6", "7", "8", "9", "10", "Jack", "Queen", "King"]
+SUIT_NAMES = ["Hearts", "Diamonds", "Clubs", "Spades"]
 
 class Card():
-    value = 0
-    suit = 0
-
-    # Checks the rep invariant of the data type.
-    # When the given variables are not within
-    # the given ranges, they are cropped back
-    # to the edges of the range (i.e. -1 becomes
-    # 1 in a range of 1 <= var <= 10).
-    def checkRep(self):
-        if(self.value > 13):
-            self.value = 13
-        elif(self.value < 1):
-            self.value = 1
-        if(self.suit > 4):
-            self.suit = 4
-        if(self.suit < 1):
-            self.suit = 1
-
-    # Card data type constructor.
+    __slots__ = ("value", "suit", "number", "points", "name", "longName", "shortName")
+
+    # Looks up a card. Values and suits outside of their
+    # ranges are cropped back to the edges of the range
+    # (i.e. 14 becomes 13 in a range of 1 <= value <= 13).
     #
     # PARAM value : the value of the card. 1 <= value <= 13 when
-    #               suit is defined. 1 <= value <= 52 iff
-    #               suit is None. In this case, self.suit
-    #               is defined by value % + 1, and
-    #               self.value is defined by (value/4)+1.
+    #               suit is defined. 0 <= value <= 51 iff
+    #               suit is None, in which case value is a
+    #               card integer following the blackjack
+    #               header conventions.
     #
     # PARAM suit : the suit of the card.
-    #              1 <= suit <= 4.
-    def __init__(self, value, suit):
+    #              0 <= suit <= 3.
+    #
+    # RETURNS : the shared instance of that card.
+    def __new__(cls, value, suit=None):
         if(suit is None):
-            self.value = int(value / 4) + 1
-            self.suit = value % 4 + 1
-        else:
-            self.value = value
-            self.suit = suit
+            return CARDS[min(max(value, 0), 51)]
+        value = min(max(value, 1), 13)
+        suit = min(max(suit, 0), 3)
+        return CARDS[(value - 1) * 4 + suit]
 
     # Getter for card value.
     #
@@ -59,24 +56,23 @@ class Card():
     # this cards suit and value.
     #
     # RETURNS : a combined value of suit and number,
-    #           1 <= num <= 52
+    #           0 <= num <= 51, following the blackjack
+    #           header conventions.
     def getCardNum(self):
-        return (self.value - 1) * 4 + (self.suit - 1)
+        return self.number
+
+    # Getter for the number of points this card scores
+    # in Blackjack, counting an Ace as 1.
+    #
+    # RETURNS : the point value of this card, 1 <= points <= 10.
+    def getPoints(self):
+        return self.points
 
     # Gets this card's value in string format.
     #
     # RETURNS : A string representation of this card's value.
     def valueString(self):
-        if(self.value == 1):
-            return "Ace"
-        elif(self.value == 11):
-            return "Jack"
-        elif(self.value == 12):
-            return "Queen"
-        elif(self.value == 13):
-            return "King"
-        else:
-            return str(self.value)
+        return VALUE_NAMES[self.value - 1]
 
     # Gets this card's value in a shortened format,
     # at most two characters long.
@@ -93,14 +89,7 @@ class Card():
     #
     # RETURNS : A string representation of this card's suit.
     def suitString(self):
-        if(self.suit == 1):
-            return "Hearts"
-        elif(self.suit == 2):
-            return "Diamonds"
-        elif(self.suit == 3):
-            return "Clubs"
-        elif(self.suit == 4):
-            return "Spades"
+        return SUIT_NAMES[self.suit]
 
     # Gets this card's suit in a shortened, one character long
     # format.
@@ -114,14 +103,14 @@ class Card():
     # RETURNS : This card represented as a string in the
     #           format [VALUE of SUIT].
     def toString(self):
-        return "[" + str(self.valueString()) + " of " + str(self.suitString()) + "]";
+        return self.longName
 
     # Gets a shortened string representation of this card.
     #
     # RETURNS : This card represented as a string in the
     #           format [VV of S].
     def shortString(self):
-        return "[" + str(self.valueShort()) + "-" + str(self.suitShort()) + "]";
+        return self.shortName
 
     # Checks whether this and another card are, effectively, equal.
     #
@@ -130,7 +119,40 @@ class Card():
     # RETURNS : true iff this card shares a value and suit with otherCard,
     #            and othercard is an instance of card.
     def equals(self, otherCard):
-        try:
-            return otherCard.getValue() == self.value and otherCard.getSuit() == self.suit
-        except TypeError:
-            return false
+        return self == otherCard
+
+    def __eq__(self, other):
+        if(isinstance(other, Card)):
+            return self.number == other.number
+        return NotImplemented
+
+    def __hash__(self):
+        return self.number
+
+    # Cards are rebuilt from their number when unpickled or
+    # copied, so the shared instance is always used.
+    def __reduce__(self):
+        return (Card, (self.number,))
+
+    def __repr__(self):
+        return "Card(" + str(self.value) + ", " + str(self.suit) + ")"
+
+# Builds one of the 52 shared cards.
+#
+# PARAM number : the card integer, following the
+#                blackjack header conventions.
+#
+# RETURNS : the new card.
+def makeCard(number):
+    card = object.__new__(Card)
+    card.value = number // 4 + 1
+    card.suit = number % 4
+    card.number = number
+    card.points = min(card.value, 10)
+    card.name = card.valueString() + " of " + card.suitString()
+    card.longName = "[" + card.name + "]"
+    card.shortName = "[" + card.valueShort() + "-" + card.suitShort() + "]"
+    return card
+
+# Every card, indexed by its card integer.
+CARDS = tuple(makeCard(number) for number in range(52))
@@ -0,0 +1,398 @@
+#################################################
+#            Blackjack Command Line             #
+#################################################
+#
+# Entry point for the game and its tools:
+#
+#      python cli.py play [--wallet 5.00] [--decks 1]
+#      python cli.py simulate [--rounds N] [--seed S] ...
+#      python cli.py bench [--output F] [--compare F] ...
+#      python cli.py serve [--host H] [--port P] ...
+#      python cli.py analyze LOG [LOG ...]
+#      python cli.py bankroll [--sessions N] [--wallet 5.00] ...
+#      python cli.py rules [--stand-on 17] [--hit-soft] ...
+#      python cli.py replay CORPUS [--record N] ...
+#      python cli.py loadgen [--players N] [--spawn] ...
+#
+# play, simulate, serve, bankroll, rules, replay and loadgen take the
+# options of addRuleArguments to change the rules played by. loadgen
+# passes them on to the server it spawns.
+#
+# Modules are only imported by the command that needs
+# them, so playing never pays for loading the
+# simulation or NumPy based modules.
+
+import argparse
+import sys
+import time
+
+# Adds the options choosing the rules played by. The
+# number of decks is taken from --decks.
+#
+# PARAM parser : An argparse.ArgumentParser.
+def addRuleArguments(parser):
+    parser.add_argument("--stand-on", type=int, default=18, help="lowest total the dealer stands on")
+    parser.add_argument("--hit-soft", action="store_true", help="the dealer hits a soft --stand-on total")
+    parser.add_argument("--no-split", action="store_true", help="pairs may not be split")
+    parser.add_argument("--surrender", action="store_true", help="the player may surrender their first move")
+    parser.add_argument("--blackjack-pays", type=float, default=1.5, help="credit per unit bet for a natural")
+
+# Reads a number of seats at a table, for argparse.
+#
+# PARAM text : The number given on the command line.
+#
+# RETURNS : The number of seats, from 1 to
+#           roundstate.MAX_SEATS.
+def seatCount(text):
+    from roundstate import MAX_SEATS
+    try:
+        seats = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid seat count: " + repr(text))
+    if(seats < 1 or seats > MAX_SEATS):
+        raise argparse.ArgumentTypeError("a table seats from 1 to " + str(MAX_SEATS) + " players")
+    return seats
+
+# Gets the rules chosen on the command line.
+#
+# PARAM args : The parsed command line arguments.
+#
+# RETURNS : A Rules object.
+def getRules(args):
+    from rules import Rules
+    try:
+        return Rules(args.stand_on, args.hit_soft, args.decks, maxSplits=0 if args.no_split else 1,
+                     surrender=args.surrender, blackjackPays=args.blackjack_pays)
+    except ValueError as error:
+        sys.exit("blackjack: " + str(error))
+
+# Plays the interactive game.
+#
+# PARAM args : The parsed command line arguments.
+def runPlay(args):
+    import blackjack
+    if(args.seats > 1):
+        blackjack.playTable([args.wallet] * args.seats, rules=getRules(args))
+    else:
+        blackjack.playBlackjack(args.wallet, rules=getRules(args))
+
+# Gets a decision policy by name.
+#
+# PARAM name : The name of the policy. "solved" compiles
+#              the strategy solved for the rules.
+# PARAM rules : The Rules played by. Defaults to the
+#               house rules.
+# PARAM chart : An optional path of a CSV chart, compiled
+#               in place of the named policy.
+#
+# RETURNS : The policy function.
+def getPolicy(name, rules=None, chart=None):
+    import simulation
+    if(chart is not None):
+        import strategy
+        return strategy.readChart(chart)
+    if(name == "solved"):
+        import strategy
+        import tablecache
+        from rules import HOUSE
+        return strategy.compileTables(tablecache.tablesFor(rules or HOUSE))
+    if(name == "dealer"):
+        return simulation.mimicDealerPolicy
+    return simulation.basicPolicy
+
+# Runs a headless simulation and prints its tallies.
+#
+# PARAM args : The parsed command line arguments.
+def runSimulate(args):
+    import blackjack
+    import counting
+    import parallel
+    import simulation
+
+    rules = getRules(args)
+    policy = getPolicy(args.policy, rules, args.chart)
+    if(args.count is not None and args.seats != 1):
+        sys.exit("blackjack: card counting is simulated at a single seat")
+    start = time.perf_counter()
+    stats = None
+    if(args.count is None):
+        stats = parallel.runStreaming(args.rounds, args.width, args.confidence, policy, args.seed, args.workers,
+                                      canDouble=True, decks=args.decks, penetration=args.penetration, rules=rules,
+                                      generator=args.rng, seats=args.seats)
+        counts = stats.counts
+        wagered = stats.rounds
+        net = stats.net()
+    else:
+        counts, wagered, net = simulation.simulateCounting(args.rounds, policy,
+                                                           counting.rampBetting, counting.SYSTEMS[args.count],
+                                                           args.seed, True, args.decks, args.penetration, rules,
+                                                           args.rng)
+    elapsed = time.perf_counter() - start
+
+    for win in blackjack.PAYOUTS:
+        if(counts.get(win, 0) > 0):
+            print("{:>5} : {}".format(win, counts[win]))
+    if(args.count is not None):
+        print("Units wagered: {}".format(wagered))
+    print("Net units: {:.2f}".format(net))
+    print("Player edge: {:.4%}".format(net / wagered))
+    if(stats is not None):
+        low, high = stats.houseEdge(args.confidence)
+        print("House edge {:.0%} interval: {:.4%} to {:.4%}".format(args.confidence, low, high))
+    if(stats is None):
+        print("{} rounds in {:.2f}s".format(args.rounds, elapsed))
+    elif(args.seats == 1):
+        print("{} rounds in {:.2f}s".format(stats.rounds, elapsed))
+    else:
+        print("{} rounds of {} hands in {:.2f}s".format(stats.rounds // args.seats, args.seats, elapsed))
+
+# Runs the benchmark suite, passing the remaining
+# arguments on to it.
+#
+# PARAM args : The parsed command line arguments.
+def runBench(args):
+    import bench
+    sys.exit(bench.main(args.rest))
+
+# Hosts the game server until interrupted.
+#
+# PARAM args : The parsed command line arguments.
+def runServe(args):
+    import asyncio
+    import server
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.wallet, args.decks, args.idle, args.history,
+                                 getRules(args)))
+    except KeyboardInterrupt:
+        pass
+
+# Reports on hand history logs.
+#
+# PARAM args : The parsed command line arguments.
+def runAnalyze(args):
+    import analytics
+    report = analytics.analyzeFiles(args.logs, args.workers, args.chunk)
+    print("\n".join(report.summary()))
+
+# Plays out many sessions at once and reports the
+# risk of going broke.
+#
+# PARAM args : The parsed command line arguments.
+def runBankroll(args):
+    import bankroll
+    from ledger import toCents
+
+    rules = getRules(args)
+    start = time.perf_counter()
+    policy = getPolicy(args.policy, rules, args.chart)
+    odds = bankroll.outcomeOdds(policy, args.odds_rounds, args.seed, args.decks, rules=rules)
+    goal = None
+    if(args.goal is not None):
+        goal = toCents(args.goal)
+    sessions = bankroll.simulateSessions(args.sessions, toCents(args.wallet), bankroll.flatBetting(toCents(args.bet)),
+                                         args.rounds, goal, odds, args.seed, rules)
+    elapsed = time.perf_counter() - start
+    print("\n".join(sessions.summary()))
+    print("{} sessions in {:.2f}s".format(args.sessions, elapsed))
+
+# Loads the tables worked out for a rule set, solving
+# and saving them first if they have never been saved.
+#
+# PARAM args : The parsed command line arguments.
+def runRules(args):
+    import tablecache
+
+    rules = getRules(args)
+    path = tablecache.tablePath(rules, args.cache)
+    start = time.perf_counter()
+    tables = tablecache.loadTables(rules, path)
+    if(tables is None):
+        tables = tablecache.tablesFor(rules, args.cache)
+        done = "Solved and saved"
+    else:
+        done = "Loaded"
+    elapsed = time.perf_counter() - start
+    print("\n".join(rules.summary()))
+    print("Rule set " + rules.key() + " in " + path)
+    print("{} in {:.1f}ms".format(done, elapsed * 1000))
+    if(args.chart):
+        print()
+        print("\n".join(tables.summary()))
+    if(args.export is not None):
+        import strategy
+        strategy.writeChart(tables.chart(), args.export)
+        print("Chart written to " + args.export)
+
+# Records a corpus of console sessions if asked to,
+# then checks every session of it still plays back
+# the same.
+#
+# PARAM args : The parsed command line arguments.
+def runReplay(args):
+    import replay
+
+    if(args.record is not None):
+        rules = getRules(args)
+        start = time.perf_counter()
+        replay.writeCorpus(args.corpus, (replay.recordSession(args.seed + i, args.wallet, rules, args.rounds)
+                                         for i in range(args.record)))
+        print("{} sessions recorded in {:.2f}s".format(args.record, time.perf_counter() - start))
+    start = time.perf_counter()
+    checked, failures, tally = replay.checkCorpus(args.corpus, args.workers)
+    elapsed = time.perf_counter() - start
+    for seed, problems in failures:
+        print("Session " + str(seed) + ": " + "; ".join(problems))
+    print("{} of {} sessions matched in {:.2f}s".format(checked - len(failures), checked, elapsed))
+    print("Against the baseline game:")
+    print("  {:>6} matched throughout".format(tally.get(replay.MATCHED, 0)))
+    for name in replay.BASELINE_CHANGES:
+        if(name in tally):
+            print("  {:>6} parted by {} ({})".format(tally[name], name, replay.BASELINE_CHANGES[name]))
+    if(replay.SKIPPED in tally):
+        print("  {:>6} not compared, not played by the house rules".format(tally[replay.SKIPPED]))
+    if(failures):
+        sys.exit(1)
+
+# Runs bot players against the game server and
+# reports throughput and latency.
+#
+# PARAM args : The parsed command line arguments.
+def runLoadgen(args):
+    import asyncio
+    import loadgen
+
+    rules = getRules(args)
+    policy = loadgen.RANDOM
+    if(args.strategy != loadgen.RANDOM):
+        policy = getPolicy(args.strategy, rules)
+    server = None
+    if(args.spawn):
+        server = loadgen.spawnServer(args.host, args.port, args.wallet, rules)
+    try:
+        report = asyncio.run(loadgen.generateLoad(args.players, args.host, args.port, policy, args.duration,
+                                                  args.think, args.bet, args.rounds, args.seed))
+    finally:
+        if(server is not None):
+            server.terminate()
+            server.wait()
+    print("\n".join(report.summary(args.bars)))
+
+# Builds the command line parser.
+#
+# RETURNS : An argparse.ArgumentParser.
+def buildParser():
+    parser = argparse.ArgumentParser(prog="blackjack", description="Blackjack and its tools.")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    play = commands.add_parser("play", help="play an interactive game")
+    play.add_argument("--wallet", type=float, default=5.00, help="money to start with")
+    play.add_argument("--decks", type=int, default=1, help="decks in the shoe")
+    play.add_argument("--seats", type=seatCount, default=1, help="seats at the table, each with its own wallet")
+    addRuleArguments(play)
+    play.set_defaults(run=runPlay)
+
+    simulate = commands.add_parser("simulate", help="simulate rounds without a player")
+    simulate.add_argument("--rounds", type=int, default=1000000, help="rounds to play")
+    simulate.add_argument("--seed", type=int, default=0, help="seed for the run")
+    simulate.add_argument("--workers", type=int, default=None, help="processes to use")
+    simulate.add_argument("--decks", type=int, default=1, help="decks in the shoe")
+    simulate.add_argument("--penetration", type=float, default=0.75, help="share of the shoe dealt")
+    simulate.add_argument("--seats", type=seatCount, default=1, help="seats at the table, all played by the policy")
+    simulate.add_argument("--width", type=float, default=None,
+                          help="stop early once the house edge interval is this narrow, in units per round")
+    simulate.add_argument("--confidence", type=float, default=0.95, help="confidence of the house edge interval")
+    simulate.add_argument("--rng", choices=["mt", "pcg64", "philox"], default="mt",
+                          help="random number generator to shuffle with (pcg64 and philox need NumPy)")
+    simulate.add_argument("--policy", choices=["basic", "dealer", "solved"], default="basic", help="decision policy")
+    simulate.add_argument("--chart", default=None, help="CSV strategy chart to play (see strategy.py)")
+    simulate.add_argument("--count", choices=["hilo", "ko", "omega2"], default=None,
+                          help="count cards and spread bets by the count (runs in one process)")
+    addRuleArguments(simulate)
+    simulate.set_defaults(run=runSimulate)
+
+    bench = commands.add_parser("bench", help="run the benchmark suite (see bench.py --help)", add_help=False)
+    bench.set_defaults(run=runBench)
+
+    serve = commands.add_parser("serve", help="host tables for players over TCP (see server.py)")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve.add_argument("--port", type=int, default=8021, help="port to listen on")
+    serve.add_argument("--wallet", type=float, default=5.00, help="money each player starts with")
+    serve.add_argument("--decks", type=int, default=1, help="decks in each table's shoe")
+    serve.add_argument("--idle", type=float, default=30.0, help="seconds before an idle table is packed away")
+    serve.add_argument("--history", default=None, help="hand history log to add every round to")
+    addRuleArguments(serve)
+    serve.set_defaults(run=runServe)
+
+    analyze = commands.add_parser("analyze", help="report on hand history logs (see analytics.py)")
+    analyze.add_argument("logs", nargs="+", help="logs to read, oldest first")
+    analyze.add_argument("--workers", type=int, default=None, help="processes to use")
+    analyze.add_argument("--chunk", type=int, default=65536, help="records read at a time")
+    analyze.set_defaults(run=runAnalyze)
+
+    bankroll = commands.add_parser("bankroll", help="estimate the risk of ruin (see bankroll.py)")
+    bankroll.add_argument("--sessions", type=int, default=1000000, help="sessions to play out")
+    bankroll.add_argument("--wallet", type=float, default=5.00, help="money each session starts with")
+    bankroll.add_argument("--bet", type=float, default=1.00, help="flat bet")
+    bankroll.add_argument("--rounds", type=int, default=1000, help="most rounds in a session")
+    bankroll.add_argument("--goal", type=float, default=None, help="wallet at which a session stops")
+    bankroll.add_argument("--seed", type=int, default=0, help="seed for the run")
+    bankroll.add_argument("--decks", type=int, default=1, help="decks in the shoe")
+    bankroll.add_argument("--policy", choices=["basic", "dealer", "solved"], default="basic", help="decision policy")
+    bankroll.add_argument("--chart", default=None, help="CSV strategy chart to play (see strategy.py)")
+    bankroll.add_argument("--odds-rounds", type=int, default=200000, help="rounds simulated to measure the odds")
+    addRuleArguments(bankroll)
+    bankroll.set_defaults(run=runBankroll)
+
+    rules = commands.add_parser("rules", help="solve or load the tables for a rule set (see tablecache.py)")
+    rules.add_argument("--decks", type=int, default=1, help="decks in the shoe")
+    addRuleArguments(rules)
+    rules.add_argument("--cache", default=None, help="directory the tables are kept in")
+    rules.add_argument("--chart", action="store_true", help="print the best move for every hand")
+    rules.add_argument("--export", default=None, help="write the best moves to a CSV chart (see strategy.py)")
+    rules.set_defaults(run=runRules)
+
+    replay = commands.add_parser("replay", help="check recorded console sessions still play the same (see replay.py)")
+    replay.add_argument("corpus", help="JSON lines corpus of sessions")
+    replay.add_argument("--record", type=int, default=None, help="first record this many bot sessions into the corpus")
+    replay.add_argument("--seed", type=int, default=0, help="seed of the first recorded session")
+    replay.add_argument("--wallet", type=float, default=5.00, help="money each recorded session starts with")
+    replay.add_argument("--rounds", type=int, default=50, help="most rounds in a recorded session")
+    replay.add_argument("--decks", type=int, default=1, help="decks in the shoe of recorded sessions")
+    replay.add_argument("--workers", type=int, default=None, help="processes to use")
+    addRuleArguments(replay)
+    replay.set_defaults(run=runReplay)
+
+    loadgen = commands.add_parser("loadgen", help="measure the server under many bot players (see loadgen.py)")
+    loadgen.add_argument("--players", type=int, default=1000, help="bot players connected at once")
+    loadgen.add_argument("--duration", type=float, default=10.0, help="seconds to run for")
+    loadgen.add_argument("--think", type=float, default=0.05, help="mean seconds a bot waits before each message")
+    loadgen.add_argument("--strategy", choices=["basic", "dealer", "solved", "random"], default="basic",
+                         help="how the bots play")
+    loadgen.add_argument("--bet", type=float, default=1.00, help="bet placed each round")
+    loadgen.add_argument("--rounds", type=int, default=20, help="most rounds in a bot's session")
+    loadgen.add_argument("--seed", type=int, default=None, help="seed for the bots' choices")
+    loadgen.add_argument("--host", default="127.0.0.1", help="address of the server")
+    loadgen.add_argument("--port", type=int, default=8021, help="port of the server")
+    loadgen.add_argument("--spawn", action="store_true", help="start a server for the length of the run")
+    loadgen.add_argument("--wallet", type=float, default=5.00, help="money each player starts with, with --spawn")
+    loadgen.add_argument("--decks", type=int, default=1, help="decks in each table's shoe, with --spawn")
+    addRuleArguments(loadgen)
+    loadgen.add_argument("--bars", action="store_true", help="draw the latency histogram of each kind of message")
+    loadgen.set_defaults(run=runLoadgen)
+    return parser
+
+# Runs the command line.
+#
+# PARAM argv : The arguments, not including the program name.
+def main(argv=None):
+    parser = buildParser()
+    args, rest = parser.parse_known_args(argv)
+    if(args.command == "bench"):
+        args.rest = rest
+    elif(rest):
+        parser.error("unrecognized arguments: " + " ".join(rest))
+    args.run(args)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+#
+# Abstraction - Where the console game asks its questions and
+#               prints its output. The game never calls input()
+#               or print() itself, but those of a console, so
+#               it can be driven by a script and its output kept.
+#
+#               A Console is the terminal: it looks up the
+#               built in input() and print() each time it is
+#               used, so anything patching them still works.
+#               A ScriptedConsole answers from a list and keeps
+#               a transcript of everything shown, with each
+#               answer written after its question as it would
+#               have been typed.
+#
+# Rep Invariants:
+#  0 <= position <= len(answers)
+#  output is None iff the transcript is not kept
+
+import builtins
+
+class Console():
+    __slots__ = ()
+
+    # Asks a question.
+    #
+    # PARAM prompt : the question.
+    #
+    # RETURNS : the answer typed.
+    def input(self, prompt=""):
+        return builtins.input(prompt)
+
+    # Prints a line, as the built in print() does.
+    def print(self, *values, sep=" ", end="\n"):
+        builtins.print(*values, sep=sep, end=end)
+
+class ScriptedConsole():
+    __slots__ = ("answers", "position", "output")
+
+    # ScriptedConsole data type constructor.
+    #
+    # PARAM answers : a list of answers, in the order the
+    #                 questions are asked.
+    # PARAM keep : whether to keep a transcript.
+    def __init__(self, answers, keep=True):
+        self.answers = answers
+        self.position = 0
+        self.output = None
+        if(keep):
+            self.output = []
+
+    # Asks a question, answering from the script.
+    #
+    # PARAM prompt : the question.
+    #
+    # RETURNS : the next answer.
+    #
+    # Raises EOFError once every answer has been given,
+    # just as input() does at the end of its input.
+    def input(self, prompt=""):
+        if(self.position == len(self.answers)):
+            raise EOFError("the script has run out of answers")
+        answer = self.answers[self.position]
+        self.position += 1
+        if(self.output is not None):
+            self.output.append(prompt + answer + "\n")
+        return answer
+
+    # Prints a line into the transcript.
+    def print(self, *values, sep=" ", end="\n"):
+        if(self.output is not None):
+            self.output.append(sep.join(str(value) for value in values) + end)
+
+    # RETURNS : everything shown so far, as one string.
+    def transcript(self):
+        return "".join(self.output or ())
+
+# The terminal, used unless another console is given.
+CONSOLE = Console()
@@ -0,0 +1,133 @@
+#################################################
+#            Blackjack Card Counting            #
+#################################################
+#
+# Keeps a running count of the cards that have left
+# the shoe, for sizing bets. A counting system is a
+# tag table: a tuple giving the count added by every
+# card integer, following the blackjack header
+# conventions. The count is updated one card at a
+# time as each is dealt, and reset when the shoe is
+# shuffled, so it is never recounted from scratch.
+#
+# A bet sizing policy is any function of the form:
+#
+#      betting(trueCount)
+#
+# returning the number of units to bet on the next
+# round.
+
+from shoe import Shoe
+
+# Builds a tag table from the tag of each point value.
+#
+# PARAM byPoints : A list of ten tags, Aces first, then
+#                  2 through 9, then all ten point cards.
+#
+# RETURNS : A tuple of the tag of every card integer.
+def tagTable(byPoints):
+    return tuple(byPoints[min(card // 4, 9)] for card in range(52))
+
+HI_LO = tagTable([-1, 1, 1, 1, 1, 1, 0, 0, 0, -1])
+KO = tagTable([-1, 1, 1, 1, 1, 1, 1, 0, 0, -1])
+OMEGA_II = tagTable([0, 1, 1, 2, 2, 2, 1, 0, -1, -2])
+
+SYSTEMS = {"hilo" : HI_LO, "ko" : KO, "omega2" : OMEGA_II}
+
+#
+# Abstraction - A running count of the cards seen since the
+#               shoe was last shuffled.
+#
+# Rep Invariants:
+#  len(tags) == 52
+#  running == the sum of the tags of the cards seen
+#  0 <= seen <= cards
+
+class Counter():
+    __slots__ = ("tags", "cards", "running", "seen")
+
+    # Counter data type constructor.
+    #
+    # PARAM decks : the number of decks in the shoe counted.
+    # PARAM tags : the tag table of the counting system.
+    def __init__(self, decks=1, tags=HI_LO):
+        self.tags = tags
+        self.cards = 52 * decks
+        self.running = 0
+        self.seen = 0
+
+    # Counts a card that has left the shoe.
+    #
+    # PARAM card : the card integer.
+    def see(self, card):
+        self.running += self.tags[card]
+        self.seen += 1
+
+    # Starts the count over, for a freshly shuffled shoe.
+    def reset(self):
+        self.running = 0
+        self.seen = 0
+
+    # RETURNS : the number of decks' worth of cards
+    #           left unseen.
+    def decksLeft(self):
+        return (self.cards - self.seen) / 52
+
+    # Gets the count per deck left unseen.
+    #
+    # RETURNS : the true count, or the running count
+    #           when the whole shoe has been seen.
+    def trueCount(self):
+        if(self.seen >= self.cards):
+            return float(self.running)
+        return self.running * 52 / (self.cards - self.seen)
+
+#
+# Abstraction - A Shoe that counts every card it deals.
+#
+# Rep Invariants:
+#  counter.seen == position
+
+class CountingShoe(Shoe):
+    __slots__ = ("counter",)
+
+    # CountingShoe data type constructor.
+    #
+    # PARAM decks : the number of 52 card decks in the shoe.
+    # PARAM penetration : the fraction of the shoe dealt
+    #                     before the cut card is reached.
+    # PARAM rng : the random number generator used to
+    #             shuffle. Defaults to the random module.
+    # PARAM tags : the tag table of the counting system.
+    def __init__(self, decks=1, penetration=0.75, rng=None, tags=HI_LO):
+        self.counter = Counter(decks, tags)
+        Shoe.__init__(self, decks, penetration, rng)
+
+    def shuffle(self):
+        Shoe.shuffle(self)
+        self.counter.reset()
+
+    def reshuffleDiscards(self):
+        counter = self.counter
+        for card in self.cards[:self.roundStart]:
+            counter.running -= counter.tags[card]
+        counter.seen -= self.roundStart
+        Shoe.reshuffleDiscards(self)
+
+    def deal(self):
+        card = Shoe.deal(self)
+        counter = self.counter
+        counter.running += counter.tags[card]
+        counter.seen += 1
+        return card
+
+# Bets one unit until the true count reaches 2, then
+# one unit per point of true count, up to eight units.
+def rampBetting(trueCount):
+    if(trueCount < 2):
+        return 1
+    return min(int(trueCount), 8)
+
+# Always bets one unit.
+def flatBetting(trueCount):
+    return 1
@@ -0,0 +1,320 @@
+#################################################
+#          Dealer Outcome Distribution          #
+#################################################
+#
+# Works out the chance of each final total the
+# dealer can finish on (18 through 21, or a bust)
+# for a given upcard and the cards left in the shoe,
+# drawing without replacement until reaching 18 as
+# in blackjack.playRound. Other rules (see rules.py)
+# finish on the total the dealer stands on through
+# 21, or a bust, and keep a cache of their own.
+#
+# The shoe is described by a composition: ten counts
+# holding how many cards of each point value (Ace
+# first, then 2 through 10) are left, not counting
+# the dealer's upcard. Every way the dealer can draw
+# is listed once per upcard, so the odds for any
+# composition come from a single matrix product, and
+# many compositions can be solved in one call.
+#
+# Results are kept in a bounded least recently used
+# cache, keyed by the upcard and the composition
+# packed into a single integer. Repeated questions
+# about the same shoe are answered from the cache.
+
+from collections import OrderedDict
+
+import numpy as np
+
+from rules import HOUSE
+
+# Bits given to each card count in a packed composition.
+FIELD = 8
+
+# Builds the composition of a full shoe.
+#
+# PARAM decks : The number of decks in the shoe.
+#
+# RETURNS : A tuple of ten card counts.
+def fullComposition(decks=1):
+    return (4 * decks,) * 9 + (16 * decks,)
+
+# Packs a composition into a single integer, usable
+# as a compact dictionary key.
+#
+# PARAM composition : A sequence of ten card counts.
+#
+# RETURNS : The packed composition.
+def packComposition(composition):
+    key = 0
+    for i in range(10):
+        key |= composition[i] << (FIELD * i)
+    return key
+
+# Gets the point value of a hand.
+#
+# PARAM hard : The hand's total, counting aces as 1.
+# PARAM aces : True iff the hand holds an ace.
+#
+# RETURNS : The point value of the hand.
+def handTotal(hard, aces):
+    if(aces and hard <= 11):
+        return hard + 10
+    return hard
+
+# Most cards the dealer can draw, plus one.
+DEPTH = 14
+
+# Offsets used when building falling counts.
+STEPS = np.arange(DEPTH - 1, dtype=np.float64)
+
+# Stand-in for the log of zero.
+EMPTY = -1e4
+
+# Number of compositions solved together by oddsMany.
+BATCH = 512
+
+# Lists every way the dealer can draw to a finished hand
+# from the given upcard. Draws holding the same cards in
+# a different order are grouped together, since they are
+# equally likely from any composition.
+#
+# PARAM upcard : The point value of the dealer's upcard.
+# PARAM rules : The Rules deciding when the dealer stands.
+#
+# RETURNS : A tuple of arrays (picks, lengths, finals, orders).
+#           Row DEPTH * r + k of picks has a 1 in the column of
+#           every group drawing k cards of point value r + 1.
+#           For each group, lengths holds the number of cards
+#           drawn and orders the log of the number of orders
+#           they can come in. Row i of finals has a 1 in column
+#           t - rules.standOn for groups finishing on t, or in
+#           the last column for groups that bust.
+def dealerDraws(upcard, rules=HOUSE):
+    hits = rules.drawTable
+    bust = 22 - rules.standOn
+    groups = {}
+    stack = [(upcard, upcard == 1, (0,) * 10)]
+    while(stack):
+        hard, aces, drawn = stack.pop()
+        for point in range(1, 11):
+            newHard = hard + point
+            newAces = aces or point == 1
+            newDrawn = drawn[:point - 1] + (drawn[point - 1] + 1,) + drawn[point:]
+            total = handTotal(newHard, newAces)
+            if(total > 21):
+                key = (newDrawn, bust)
+            elif(not(hits[(newHard << 1) | newAces])):
+                key = (newDrawn, total - rules.standOn)
+            else:
+                stack.append((newHard, newAces, newDrawn))
+                continue
+            groups[key] = groups.get(key, 0) + 1
+
+    size = len(groups)
+    drawn = np.array([key[0] for key in groups], dtype=np.int64)
+    picks = np.zeros((10 * DEPTH, size))
+    picks[DEPTH * np.arange(10) + drawn, np.arange(size)[:, None]] = 1.0
+    finals = np.zeros((size, bust + 1))
+    finals[np.arange(size), [key[1] for key in groups]] = 1.0
+    orders = np.log(np.array(list(groups.values()), dtype=np.float64))
+    return picks, drawn.sum(axis=1), finals, orders
+
+# Gets the distribution of the dealer's final total when
+# drawing without replacement from several compositions.
+# The chance of each group of draws is worked out in log
+# space, so the whole table is a single matrix product.
+#
+# PARAM draws : The dealer draw table for the upcard.
+# PARAM counts : A 2-D array with one composition per row.
+#
+# RETURNS : A 2-D array holding, for each composition, the
+#           probabilities that the dealer finishes on each
+#           total from the one they stand on through 21, or
+#           busts, as laid out in the draw table's finals.
+def dealerOdds(draws, counts):
+    picks, lengths, finals, orders = draws
+    counts = np.asarray(counts, dtype=np.float64)
+    size = len(counts)
+    # falling[i, r, k] is the log of the number of ways to draw
+    # k cards of point value r + 1 in order from composition i,
+    # and shrinking[i, k] that of drawing any k cards in order.
+    # Running out of a card is marked with a huge negative
+    # rather than -inf, so that it can be multiplied by zero.
+    ways = counts[:, :, None] - STEPS
+    falling = np.zeros((size, 10, DEPTH))
+    falling[:, :, 1:] = np.cumsum(np.where(ways > 0.0, np.log(np.maximum(ways, 1.0)), EMPTY), axis=2)
+    left = counts.sum(axis=1)[:, None] - STEPS
+    shrinking = np.zeros((size, DEPTH))
+    shrinking[:, 1:] = np.cumsum(np.log(np.maximum(left, 1.0)), axis=1)
+    chances = np.exp(falling.reshape(size, -1) @ picks + orders - shrinking[:, lengths])
+    return chances @ finals
+
+# Dealer draw tables for each upcard, Ace first.
+DEALER_DRAWS = [dealerDraws(upcard) for upcard in range(1, 11)]
+
+# Dealer draw tables already built, keyed by when the
+# dealer stands.
+DRAWS = {(HOUSE.standOn, HOUSE.hitSoft) : DEALER_DRAWS}
+
+# Gets the dealer draw tables for each upcard under a
+# set of rules, building them the first time.
+#
+# PARAM rules : The Rules deciding when the dealer stands.
+#
+# RETURNS : A list of draw tables, Ace first.
+def drawTables(rules):
+    key = (rules.standOn, rules.hitSoft)
+    draws = DRAWS.get(key)
+    if(draws is None):
+        draws = DRAWS[key] = [dealerDraws(upcard, rules) for upcard in range(1, 11)]
+    return draws
+
+
+# Packs an upcard and a composition into a single cache key.
+#
+# PARAM upcard : The point value of the dealer's upcard.
+# PARAM composition : A sequence of ten card counts.
+#
+# RETURNS : The cache key.
+def oddsKey(upcard, composition):
+    return (packComposition(composition) << 4) | upcard
+
+#
+# Abstraction - A least recently used cache of dealer odds,
+#               keyed by oddsKey, for the dealer drawing by one
+#               set of rules. Tracks how many lookups were
+#               answered from the cache.
+#
+# Rep Invariants:
+#  maxsize is None or len(entries) <= maxsize
+#  draws == drawTables(rules)
+
+class DealerCache():
+
+    # DealerCache constructor.
+    #
+    # PARAM maxsize : the most entries kept before the least
+    #                 recently used is dropped. None keeps
+    #                 every entry.
+    # PARAM rules : the Rules deciding when the dealer stands.
+    def __init__(self, maxsize=65536, rules=HOUSE):
+        self.maxsize = maxsize
+        self.rules = rules
+        self.draws = drawTables(rules)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # Looks up the odds stored under a key.
+    #
+    # PARAM key : the cache key, from oddsKey.
+    #
+    # RETURNS : the stored odds, or None when missing.
+    def get(self, key):
+        odds = self.entries.get(key)
+        if(odds is None):
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return odds
+
+    # Stores odds under a key, dropping the least
+    # recently used entry if the cache is full.
+    #
+    # PARAM key : the cache key, from oddsKey.
+    # PARAM odds : the odds to store.
+    def put(self, key, odds):
+        self.entries[key] = odds
+        self.entries.move_to_end(key)
+        if(self.maxsize is not None and len(self.entries) > self.maxsize):
+            self.entries.popitem(last=False)
+
+    # Gets the dealer's odds for an upcard and composition.
+    #
+    # PARAM upcard : the point value of the dealer's upcard.
+    # PARAM composition : a sequence of ten card counts.
+    #
+    # RETURNS : a tuple of the probabilities that the dealer
+    #           finishes on each total from the one they stand
+    #           on through 21, or busts.
+    def odds(self, upcard, composition):
+        key = oddsKey(upcard, composition)
+        odds = self.get(key)
+        if(odds is None):
+            odds = tuple(dealerOdds(self.draws[upcard - 1], [composition])[0].tolist())
+            self.put(key, odds)
+        return odds
+
+    # Gets the dealer's odds for many compositions at once.
+    # Compositions missing from the cache are solved
+    # together in a single batch.
+    #
+    # PARAM upcard : the point value of the dealer's upcard.
+    # PARAM compositions : a list of compositions.
+    #
+    # RETURNS : a list holding the odds for each composition.
+    def oddsMany(self, upcard, compositions):
+        results = [None] * len(compositions)
+        keys = [oddsKey(upcard, composition) for composition in compositions]
+        missing = []
+        for i in range(len(keys)):
+            results[i] = self.get(keys[i])
+            if(results[i] is None):
+                missing.append(i)
+        for start in range(0, len(missing), BATCH):
+            batch = missing[start:start + BATCH]
+            odds = dealerOdds(self.draws[upcard - 1], [compositions[i] for i in batch])
+            for i, row in zip(batch, odds.tolist()):
+                results[i] = tuple(row)
+                self.put(keys[i], results[i])
+        return results
+
+    # RETURNS : a dictionary of the cache's hits, misses,
+    #           current size and maximum size.
+    def stats(self):
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "size" : len(self.entries),
+            "maxsize" : self.maxsize,
+        }
+
+    # Empties the cache and resets its statistics.
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+# The cache shared by dealerDistribution.
+CACHE = DealerCache()
+
+# The shared cache for each way the dealer may stand.
+CACHES = {(HOUSE.standOn, HOUSE.hitSoft) : CACHE}
+
+# Gets the shared cache of dealer odds under a set of
+# rules, making it the first time.
+#
+# PARAM rules : The Rules deciding when the dealer stands.
+#
+# RETURNS : A DealerCache.
+def cacheFor(rules):
+    key = (rules.standOn, rules.hitSoft)
+    cache = CACHES.get(key)
+    if(cache is None):
+        cache = CACHES[key] = DealerCache(rules=rules)
+    return cache
+
+# Gets the distribution of the dealer's final total,
+# answering from the shared cache when possible.
+#
+# PARAM upcard : The point value of the dealer's upcard.
+# PARAM composition : The cards left in the shoe, as a
+#                     sequence of ten card counts.
+#
+# RETURNS : A tuple of the probabilities that the dealer
+#           finishes on 18, 19, 20, 21 or busts.
+def dealerDistribution(upcard, composition):
+    return CACHE.odds(upcard, composition)
@@ -0,0 +1,68 @@
+#
+# Abstraction - A hand of Blackjack, scored as it is dealt.
+#               Cards are integers following the blackjack
+#               header conventions.
+#
+# Rep Invariants:
+#  hard == sum of the point values of cards, counting aces as 1
+#  count == len(cards)
+#  aces iff some card in cards is an ace
+
+class HandState():
+    __slots__ = ("cards", "hard", "aces", "count", "pair")
+
+    # HandState data type constructor.
+    #
+    # PARAM cards : an optional iterable of card integers
+    #               the hand starts out holding.
+    def __init__(self, cards=()):
+        self.cards = []
+        self.hard = 0
+        self.aces = False
+        self.count = 0
+        self.pair = False
+        for card in cards:
+            self.add(card)
+
+    # Adds a card to the hand, updating its score.
+    #
+    # PARAM card : the card integer to add.
+    def add(self, card):
+        value = card // 4 + 1
+        if(value > 10):
+            self.hard += 10
+        else:
+            self.hard += value
+        if(value == 1):
+            self.aces = True
+        self.count += 1
+        if(self.count == 2):
+            self.pair = self.cards[0] // 4 == card // 4
+        else:
+            self.pair = False
+        self.cards.append(card)
+
+    # Gets the point value of the hand, counting one
+    # ace as 11 while the total stays at or below 21.
+    #
+    # RETURNS : the point value of the hand.
+    def total(self):
+        if(self.aces and self.hard <= 11):
+            return self.hard + 10
+        return self.hard
+
+    # RETURNS : true iff an ace in this hand is being counted as 11.
+    def isSoft(self):
+        return self.aces and self.hard <= 11
+
+    # RETURNS : true iff this hand is two cards of the same value.
+    def isPair(self):
+        return self.pair
+
+    # RETURNS : true iff this hand is two cards totalling 21.
+    def isBlackjack(self):
+        return self.count == 2 and self.aces and self.hard == 11
+
+    # RETURNS : true iff this hand's total is over 21.
+    def isBust(self):
+        return self.hard > 21
@@ -0,0 +1,55 @@
+#################################################
+#           Batch Hand Evaluation               #
+#################################################
+#
+# Evaluates many hands at once with NumPy. Hands
+# are stored as rows of a 2-D array of card
+# integers following the blackjack header
+# conventions. Hands shorter than the widest hand
+# are padded on the right with a negative number.
+#
+# analytics.py scores the dealer's hands of each chunk
+# of hand history through here, and bench.py times it
+# against scoring one HandState at a time.
+
+import numpy as np
+
+# Point value of every card integer, following
+# header conventions.
+POINTS = np.minimum(np.arange(52) // 4 + 1, 10).astype(np.int16)
+
+# Packs a list of hands of differing lengths into
+# a single padded 2-D array.
+#
+# PARAM hands : A list of lists of card integers.
+# PARAM pad : The value used to fill unused slots.
+#             Must be negative.
+#
+# RETURNS : A 2-D int8 array with one hand per row.
+def padHands(hands, pad=-1):
+    width = 0
+    for hand in hands:
+        if(len(hand) > width):
+            width = len(hand)
+    packed = np.full((len(hands), width), pad, dtype=np.int8)
+    for i, hand in enumerate(hands):
+        packed[i, :len(hand)] = hand
+    return packed
+
+# Evaluates the point value of every hand in a batch,
+# following the same rules as blackjack.evaluateHand:
+# face cards are worth 10, and one ace is counted as 11
+# as long as the hand's total stays at or below 21.
+#
+# PARAM hands : A 2-D array of card integers, one hand
+#               per row, padded with negative numbers.
+#
+# RETURNS : A 1-D array holding the total of each hand.
+def evaluateHands(hands):
+    hands = np.asarray(hands)
+    valid = hands >= 0
+    cards = np.where(valid, hands, 0)
+    points = np.where(valid, POINTS[cards], 0)
+    totals = points.sum(axis=1, dtype=np.int16)
+    aces = (valid & (cards < 4)).any(axis=1)
+    return np.where(aces & (totals <= 11), totals + 10, totals)
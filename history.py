@@ -0,0 +1,218 @@
+#################################################
+#            Blackjack Hand Histories           #
+#################################################
+#
+# Keeps a record of every settled round in an
+# append-only binary log. Records are all the same
+# width, so a log can be read back through mmap one
+# record at a time, without parsing text or loading
+# the whole file.
+#
+# Each record is laid out as RECORD:
+#
+#  table   : uint32, the id of the table
+#  round   : uint32, the round's number at that table
+#  bet     : int64, the bet in cents
+#  outcome : uint8, the index of the round's Outcome
+#  dealer  : uint8, the number of dealer cards
+#  hand1   : uint8, the number of cards in the first hand
+#  hand2   : uint8, the number of cards in the second hand,
+#            0 unless the hand was split
+#  moves   : uint8, the number of moves made
+#  cards   : CARD_SLOTS bytes, the dealer's cards, then the
+#            first hand's, then the second's, following
+#            the blackjack header conventions
+#  moves   : MOVE_SLOTS bytes, the moves made, in order,
+#            coded as in roundstate.MOVE_CODES
+#  natural : uint8, the credit per unit of bet for a
+#            natural under the table's rules, in quarters
+#
+# followed by padding up to a multiple of 8 bytes.
+
+import mmap
+import os
+import struct
+import time
+
+from outcome import OUTCOMES
+from roundstate import MOVE_CODES, MOVES
+
+CARD_SLOTS = 40
+MOVE_SLOTS = 24
+
+RECORD = struct.Struct("<IIqBBBBB" + str(CARD_SLOTS) + "s" + str(MOVE_SLOTS) + "sB2x")
+
+#
+# Abstraction - The writing end of a hand history log. Records
+#               are gathered in memory and appended to the file
+#               every flushEvery records, or once flushInterval
+#               seconds have passed since the last flush.
+#
+# Rep Invariants:
+#  len(buffer) == pending * RECORD.size
+#  pending < flushEvery after every write
+
+class HistoryWriter():
+    __slots__ = ("file", "buffer", "pending", "flushEvery", "flushInterval", "lastFlush")
+
+    # HistoryWriter data type constructor. Records are
+    # added to the end of any log already at path.
+    #
+    # PARAM path : the path of the log.
+    # PARAM flushEvery : the number of records held in
+    #                    memory before they are written.
+    # PARAM flushInterval : the most seconds a record is
+    #                       held before it is written,
+    #                       checked as records come in.
+    def __init__(self, path, flushEvery=1024, flushInterval=1.0):
+        self.file = open(path, "ab")
+        self.buffer = bytearray()
+        self.pending = 0
+        self.flushEvery = flushEvery
+        self.flushInterval = flushInterval
+        self.lastFlush = time.monotonic()
+
+    # Records a settled round.
+    #
+    # PARAM tableId : the id of the table it was played at.
+    # PARAM number : the round's number at that table.
+    # PARAM bet : the bet, in cents.
+    # PARAM state : the RoundState, once it is done. The
+    #               natural's payout is taken from its rules.
+    def write(self, tableId, number, bet, state):
+        hands = state.hands
+        second = []
+        if(len(hands) == 2):
+            second = hands[1].cards
+        cards = state.dealer.cards + hands[0].cards + second
+        if(len(cards) > CARD_SLOTS or len(state.moves) > MOVE_SLOTS):
+            raise ValueError("round is too long for a hand history record")
+        natural = int(state.rules.blackjackPays * 4)
+        if(natural > 255):
+            raise ValueError("a natural pays too much for a hand history record")
+        self.buffer += RECORD.pack(tableId, number, bet, state.outcome.index,
+                                   state.dealer.count, hands[0].count, len(second), len(state.moves),
+                                   bytes(cards), bytes(MOVE_CODES[move] for move in state.moves), natural)
+        self.pending += 1
+        if(self.pending >= self.flushEvery or time.monotonic() - self.lastFlush >= self.flushInterval):
+            self.flush()
+
+    # Writes every record held in memory to the log.
+    def flush(self):
+        if(self.pending > 0):
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.buffer.clear()
+            self.pending = 0
+        self.lastFlush = time.monotonic()
+
+    # Flushes the log and closes it.
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.close()
+
+#
+# Abstraction - The reading end of a hand history log, mapped
+#               into memory. Records are unpacked straight out
+#               of the mapping as they are asked for. A record
+#               cut short at the end of the log, as by a crash
+#               mid-write, is left out.
+#
+# Rep Invariants:
+#  count == the number of whole records in the log
+#  view is None iff count == 0
+
+class HistoryReader():
+    __slots__ = ("file", "map", "view", "count")
+
+    # HistoryReader data type constructor.
+    #
+    # PARAM path : the path of the log.
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.count = os.fstat(self.file.fileno()).st_size // RECORD.size
+        self.map = None
+        self.view = None
+        if(self.count > 0):
+            self.map = mmap.mmap(self.file.fileno(), self.count * RECORD.size, access=mmap.ACCESS_READ)
+            self.view = memoryview(self.map)
+
+    def __len__(self):
+        return self.count
+
+    # Gets one record.
+    #
+    # PARAM index : the position of the record in the log.
+    #
+    # RETURNS : the record as a tuple of the fields of RECORD.
+    def __getitem__(self, index):
+        if(index < 0):
+            index += self.count
+        if(index < 0 or index >= self.count):
+            raise IndexError("record index out of range")
+        return RECORD.unpack_from(self.view, index * RECORD.size)
+
+    # RETURNS : an iterator over every record, in order.
+    def __iter__(self):
+        if(self.view is None):
+            return iter(())
+        return RECORD.iter_unpack(self.view)
+
+    # Unmaps the log and closes it.
+    def close(self):
+        if(self.view is not None):
+            self.view.release()
+            self.map.close()
+            self.view = None
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.close()
+
+# Gets the cards dealt in a recorded round.
+#
+# PARAM record : A record read from a HistoryReader.
+#
+# RETURNS : A list of the dealer's cards, and a list
+#           holding the card list of each hand.
+def recordCards(record):
+    dealer, hand1, hand2, cards = record[4], record[5], record[6], record[8]
+    hands = [list(cards[dealer:dealer + hand1])]
+    if(hand2 > 0):
+        hands.append(list(cards[dealer + hand1:dealer + hand1 + hand2]))
+    return list(cards[:dealer]), hands
+
+# Gets the moves made in a recorded round.
+#
+# PARAM record : A record read from a HistoryReader.
+#
+# RETURNS : A list of action strings, in order.
+def recordMoves(record):
+    return [MOVES[code] for code in record[9][:record[7]]]
+
+# Gets the outcome of a recorded round.
+#
+# PARAM record : A record read from a HistoryReader.
+#
+# RETURNS : The round's Outcome.
+def recordOutcome(record):
+    return OUTCOMES[record[3]]
+
+# Gets the rules' payout for a natural in a recorded round.
+#
+# PARAM record : A record read from a HistoryReader.
+#
+# RETURNS : The credit per unit of bet for a natural, as
+#           in Rules.blackjackPays.
+def recordBlackjackPays(record):
+    return record[10] / 4
@@ -0,0 +1,119 @@
+#
+# Abstraction - A player's money, kept in whole cents so
+#               that long sessions never drift the way float
+#               dollars do. Bets are staked out of the balance
+#               and settled against an Outcome using the table
+#               of credits below, either one at a time or as a
+#               whole batch of (bet, outcome) pairs at once.
+#
+#               Payouts come in quarters of the bet, so a bet
+#               that is not a multiple of four cents may leave
+#               a fraction of a cent; the house keeps it. A
+#               table playing other rules passes its own credits,
+#               from Rules.credits().
+#
+# Rep Invariants:
+#  balance, wagered and rounds are integers
+#  0 <= rounds
+#  len(tally) == len(OUTCOMES)
+#  sum(tally) == rounds
+#  len(credits) == len(OUTCOMES)
+
+from outcome import OUTCOMES
+
+# Amount credited per unit of bet, in quarters, indexed
+# by Outcome.index.
+CREDITS = tuple(outcome.quarters for outcome in OUTCOMES)
+
+# Converts dollars to whole cents.
+#
+# PARAM dollars : An amount of money in dollars.
+#
+# RETURNS : The amount in cents, rounded to the nearest cent.
+def toCents(dollars):
+    return int(round(dollars * 100))
+
+# Formats cents as dollars, without the dollar sign.
+#
+# PARAM cents : An amount of money in cents.
+#
+# RETURNS : A string in the format 12.34.
+def formatCents(cents):
+    sign = ""
+    if(cents < 0):
+        sign = "-"
+        cents = -cents
+    return sign + str(cents // 100) + "." + "{:02d}".format(cents % 100)
+
+# Gets the amount credited back for a bet, after
+# the bet has already been taken out.
+#
+# PARAM bet : The bet, in cents.
+# PARAM outcome : The Outcome of the round.
+# PARAM credits : The credits paid, as in CREDITS.
+#
+# RETURNS : The amount credited, in cents.
+def credit(bet, outcome, credits=CREDITS):
+    return (bet * credits[outcome.index]) >> 2
+
+class Ledger():
+    __slots__ = ("balance", "wagered", "rounds", "tally", "credits")
+
+    # Ledger data type constructor.
+    #
+    # PARAM balance : the money to start with, in cents.
+    # PARAM credits : the credits paid for each outcome,
+    #                 as in CREDITS.
+    def __init__(self, balance=0, credits=CREDITS):
+        self.balance = balance
+        self.credits = credits
+        self.wagered = 0
+        self.rounds = 0
+        self.tally = [0] * len(OUTCOMES)
+
+    # Takes a bet out of the balance.
+    #
+    # PARAM bet : the bet, in cents.
+    def stake(self, bet):
+        if(bet > self.balance):
+            raise ValueError("bet of " + formatCents(bet) + " is more than the balance")
+        self.balance -= bet
+        self.wagered += bet
+
+    # Pays out a bet that has already been staked.
+    #
+    # PARAM bet : the bet, in cents.
+    # PARAM outcome : the Outcome of the round.
+    #
+    # RETURNS : the amount credited, in cents.
+    def settle(self, bet, outcome):
+        amount = (bet * self.credits[outcome.index]) >> 2
+        self.balance += amount
+        self.rounds += 1
+        self.tally[outcome.index] += 1
+        return amount
+
+    # Stakes and pays out a whole batch of rounds at once.
+    # The bets are not checked against the balance, as the
+    # rounds have already been played.
+    #
+    # PARAM pairs : an iterable of (bet, outcome) pairs, with
+    #               bets in cents.
+    #
+    # RETURNS : the net change to the balance, in cents.
+    def settleMany(self, pairs):
+        credits = self.credits
+        tally = self.tally
+        wagered = 0
+        paid = 0
+        rounds = 0
+        for bet, outcome in pairs:
+            index = outcome.index
+            wagered += bet
+            paid += (bet * credits[index]) >> 2
+            tally[index] += 1
+            rounds += 1
+        self.balance += paid - wagered
+        self.wagered += wagered
+        self.rounds += rounds
+        return paid - wagered
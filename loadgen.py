@@ -0,0 +1,388 @@
+#################################################
+#          Blackjack Server Load Generator      #
+#################################################
+#
+# Measures how well the game server (server.py)
+# holds up under many players at once. Thousands of
+# bot players connect over localhost, all from one
+# asyncio event loop, and each plays sessions the way
+# blackjack.playBlackjack is played: bet, then hit,
+# stand, double down, split or surrender as their
+# strategy says, then play again, until they have
+# played the rounds of a session, go broke, or the
+# run is over. A bot whose session ends connects
+# again for a new one.
+#
+# Bots wait a random think time before every message,
+# drawn from an exponential distribution around the
+# mean asked for. Their strategy is a decision policy,
+# as described in simulation.py, or RANDOM, picking
+# any move the server offers, surrender included,
+# with the bot's own seeded random number generator.
+#
+# The time from sending each message to reading its
+# reply is kept in a histogram per kind of message
+# (CONNECT covers opening the connection up to the
+# greeting), along with how many rounds and messages
+# went through per second:
+#
+#      python cli.py loadgen --players 2000 --spawn
+#
+# With --spawn the server is started in a process of
+# its own for the length of the run, playing by the
+# rules given; otherwise one must already be listening. The bots share the machine
+# with the server, so once their own event loop is busy
+# the time it takes to get to each reply is counted too.
+
+import asyncio
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from hand import HandState
+from ledger import formatCents, toCents
+from rules import HOUSE
+from server import raiseConnectionLimit
+
+# Histogram buckets split every doubling of latency
+# into this many steps.
+STEPS = 4
+
+# The shortest latency told apart, in seconds. Anything
+# quicker falls in the first bucket.
+FLOOR = 1e-6
+
+# Enough buckets for latencies of over an hour.
+BUCKETS = 32 * STEPS
+
+# The strategy of bots that pick any move offered at random.
+RANDOM = "random"
+
+# The most connections opened at the same moment, so
+# that ramping up does not overflow the listen queue.
+CONNECTING = 256
+
+#
+# Abstraction - A histogram of latencies, in buckets spaced
+#               evenly on a log scale, STEPS to each doubling,
+#               starting at FLOOR.
+#
+# Rep Invariants:
+#  len(counts) == BUCKETS
+#  count == sum(counts)
+#  total is the sum of every latency added, in seconds
+#  longest is the largest latency added, or 0
+
+class LatencyHistogram():
+    __slots__ = ("counts", "count", "total", "longest")
+
+    # LatencyHistogram data type constructor, holding nothing.
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+
+    # Adds a latency.
+    #
+    # PARAM seconds : the latency, in seconds.
+    def add(self, seconds):
+        index = 0
+        if(seconds > FLOOR):
+            index = min(BUCKETS - 1, int(math.log2(seconds / FLOOR) * STEPS))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if(seconds > self.longest):
+            self.longest = seconds
+
+    # Gets the upper bound of a bucket.
+    #
+    # PARAM index : the index of the bucket.
+    #
+    # RETURNS : the bound, in seconds.
+    def bound(self, index):
+        return FLOOR * 2 ** ((index + 1) / STEPS)
+
+    # Gets a percentile of the latencies added, to within
+    # the width of a bucket.
+    #
+    # PARAM percent : the percentile, from 0 to 100.
+    #
+    # RETURNS : the upper bound of the bucket holding the
+    #           percentile, in seconds, never more than the
+    #           longest latency.
+    def percentile(self, percent):
+        wanted = self.count * percent / 100
+        seen = 0
+        for index in range(BUCKETS):
+            seen += self.counts[index]
+            if(seen >= wanted and seen > 0):
+                return min(self.bound(index), self.longest)
+        return self.longest
+
+    # RETURNS : the mean latency, in seconds.
+    def mean(self):
+        if(self.count == 0):
+            return 0.0
+        return self.total / self.count
+
+    # Draws the histogram in text, one row per bucket
+    # from the first to the last holding anything.
+    #
+    # PARAM width : the length of the longest bar.
+    #
+    # RETURNS : A list of lines.
+    def bars(self, width=40):
+        used = [index for index in range(BUCKETS) if self.counts[index]]
+        if(not(used)):
+            return []
+        most = max(self.counts)
+        lines = []
+        for index in range(used[0], used[-1] + 1):
+            share = self.counts[index] / self.count
+            lines.append("  <{:>9} {:>7.2%} {}".format(formatSeconds(self.bound(index)), share,
+                                                      "#" * round(width * self.counts[index] / most)))
+        return lines
+
+# Formats a latency for a report.
+#
+# PARAM seconds : The latency, in seconds.
+#
+# RETURNS : The latency in the handiest unit.
+def formatSeconds(seconds):
+    if(seconds < 1e-3):
+        return "{:.0f}us".format(seconds * 1e6)
+    if(seconds < 1):
+        return "{:.2f}ms".format(seconds * 1e3)
+    return "{:.2f}s".format(seconds)
+
+#
+# Abstraction - What came of a load run: a LatencyHistogram for
+#               each kind of message sent, and counts of the
+#               sessions, rounds and failures seen.
+#
+# Rep Invariants:
+#  histograms maps each kind of message to its LatencyHistogram
+#  elapsed is the length of the run in seconds, once it is over
+
+class LoadReport():
+    __slots__ = ("players", "histograms", "sessions", "rounds", "errors", "elapsed")
+
+    # LoadReport data type constructor, holding nothing.
+    #
+    # PARAM players : the number of bot players.
+    def __init__(self, players):
+        self.players = players
+        self.histograms = {}
+        self.sessions = 0
+        self.rounds = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    # Adds the latency of a message.
+    #
+    # PARAM kind : the kind of message, such as "BET".
+    # PARAM seconds : the latency, in seconds.
+    def record(self, kind, seconds):
+        histogram = self.histograms.get(kind)
+        if(histogram is None):
+            histogram = self.histograms[kind] = LatencyHistogram()
+        histogram.add(seconds)
+
+    # RETURNS : the number of messages answered.
+    def messages(self):
+        return sum(histogram.count for histogram in self.histograms.values())
+
+    # Describes the run in text.
+    #
+    # PARAM bars : whether to draw each histogram.
+    #
+    # RETURNS : A list of lines.
+    def summary(self, bars=False):
+        elapsed = self.elapsed or 1.0
+        lines = [
+            "Players: {}".format(self.players),
+            "Sessions: {}   Rounds: {}   Errors: {}".format(self.sessions, self.rounds, self.errors),
+            "Throughput: {:.0f} rounds/s, {:.0f} messages/s over {:.1f}s".format(
+                self.rounds / elapsed, self.messages() / elapsed, elapsed),
+            "{:<8}{:>9}{:>10}{:>10}{:>10}{:>10}{:>10}".format("", "count", "mean", "p50", "p90", "p99", "max"),
+        ]
+        for kind in sorted(self.histograms):
+            histogram = self.histograms[kind]
+            lines.append("{:<8}{:>9}{:>10}{:>10}{:>10}{:>10}{:>10}".format(
+                kind, histogram.count, formatSeconds(histogram.mean()),
+                formatSeconds(histogram.percentile(50)), formatSeconds(histogram.percentile(90)),
+                formatSeconds(histogram.percentile(99)), formatSeconds(histogram.longest)))
+        if(bars):
+            for kind in sorted(self.histograms):
+                lines.append("")
+                lines.append(kind + ":")
+                lines += self.histograms[kind].bars()
+        return lines
+
+# Picks the message to send on a turn.
+#
+# PARAM policy : The decision policy, or RANDOM.
+# PARAM words : The words of the TURN line.
+# PARAM rng : The bot's random number generator, which
+#             RANDOM picks with.
+#
+# RETURNS : The command to send, one of those allowed.
+def decide(policy, words, rng):
+    actions = words[5].split(",")
+    if(policy == RANDOM):
+        return rng.choice(actions).upper()
+    cards = [int(card) for card in words[2].split(",")]
+    hand = HandState(cards)
+    upcard = min(int(words[4]) // 4 + 1, 10)
+    move = policy(hand.total(), hand.aces and hand.hard <= 11, upcard, "d" in actions, "sp" in actions)
+    if(move not in actions):
+        move = "h"
+    return move.upper()
+
+# Sends a message and reads lines until its reply.
+#
+# PARAM reader, writer : The connection's streams.
+# PARAM message : The line to send.
+#
+# RETURNS : The lines read, the last being the reply.
+async def exchange(reader, writer, message):
+    writer.write((message + "\n").encode())
+    lines = []
+    while(True):
+        line = await reader.readline()
+        if(not(line)):
+            raise ConnectionError("the server closed the connection")
+        words = line.decode().split()
+        lines.append(words)
+        if(words and words[0] != "SHUFFLE"):
+            return lines
+
+# Plays one bot's sessions until the run is over.
+#
+# PARAM host, port : Where the server listens.
+# PARAM policy : The bot's decision policy, or RANDOM.
+# PARAM think : The mean think time before each message,
+#               in seconds.
+# PARAM bet : The bet placed each round, in cents, or
+#             everything left when that is less.
+# PARAM sessionRounds : The most rounds in a session.
+# PARAM deadline : The time.perf_counter() the run ends at.
+# PARAM report : The LoadReport to add to.
+# PARAM rng : The bot's random number generator.
+# PARAM gate : A semaphore limiting connections opened at once.
+async def runBot(host, port, policy, think, bet, sessionRounds, deadline, report, rng, gate):
+    clock = time.perf_counter
+
+    async def pause():
+        if(think > 0):
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+    await asyncio.sleep(rng.random() * think)
+    while(clock() < deadline):
+        writer = None
+        try:
+            async with gate:
+                start = clock()
+                reader, writer = await asyncio.open_connection(host, port)
+                balance = toCents(float((await reader.readline()).split()[1]))
+                report.record("CONNECT", clock() - start)
+            report.sessions += 1
+            played = 0
+            broke = balance <= 0
+            while(played < sessionRounds and not(broke) and clock() < deadline):
+                await pause()
+                message = "BET " + formatCents(min(bet, balance))
+                while(True):
+                    start = clock()
+                    lines = await exchange(reader, writer, message)
+                    report.record(message.split()[0], clock() - start)
+                    words = lines[-1]
+                    if(words[0] != "TURN"):
+                        break
+                    await pause()
+                    message = decide(policy, words, rng)
+                if(words[0] == "SETTLE"):
+                    played += 1
+                    report.rounds += 1
+                    balance = toCents(float(words[5]))
+                    broke = balance <= 0
+                elif(words[0] == "ERROR"):
+                    report.errors += 1
+                    broke = True
+            if(not(broke)):
+                start = clock()
+                await exchange(reader, writer, "QUIT")
+                report.record("QUIT", clock() - start)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError):
+            report.errors += 1
+            await asyncio.sleep(0.1)
+        finally:
+            if(writer is not None):
+                writer.close()
+
+# Runs bot players against a server.
+#
+# PARAM players : The number of bot players.
+# PARAM host, port : Where the server listens.
+# PARAM policy : The decision policy every bot plays by,
+#                or RANDOM.
+# PARAM duration : How long to run, in seconds.
+# PARAM think : The mean think time before each message,
+#               in seconds.
+# PARAM bet : The bet placed each round, in dollars, or
+#             everything left when that is less.
+# PARAM sessionRounds : The most rounds in a session.
+# PARAM seed : An optional seed for the bots' choices.
+#
+# RETURNS : The LoadReport.
+async def generateLoad(players, host="127.0.0.1", port=8021, policy=RANDOM, duration=10.0, think=0.05,
+                       bet=1.00, sessionRounds=20, seed=None):
+    raiseConnectionLimit()
+    report = LoadReport(players)
+    seeds = random.Random(seed)
+    gate = asyncio.Semaphore(CONNECTING)
+    start = time.perf_counter()
+    deadline = start + duration
+    bots = [runBot(host, port, policy, think, toCents(bet), sessionRounds, deadline, report,
+                   random.Random(seeds.getrandbits(64)), gate) for i in range(players)]
+    await asyncio.gather(*bots)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+# Starts a server in a process of its own and waits
+# for it to listen.
+#
+# PARAM host, port : Where the server is to listen.
+# PARAM wallet : The money each player starts with.
+# PARAM rules : The Rules the server's tables play by.
+# PARAM timeout : The seconds to wait for it to listen.
+#
+# RETURNS : The subprocess.Popen of the server.
+def spawnServer(host="127.0.0.1", port=8021, wallet=5.00, rules=HOUSE, timeout=10.0):
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+    command = [sys.executable, path, "serve", "--host", host, "--port", str(port), "--wallet", str(wallet),
+               "--decks", str(rules.decks), "--stand-on", str(rules.standOn),
+               "--blackjack-pays", repr(rules.blackjackPays)]
+    if(rules.hitSoft):
+        command.append("--hit-soft")
+    if(rules.maxSplits == 0):
+        command.append("--no-split")
+    if(rules.surrender):
+        command.append("--surrender")
+    server = subprocess.Popen(command)
+    waitUntil = time.monotonic() + timeout
+    while(True):
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return server
+        except OSError:
+            if(server.poll() is not None or time.monotonic() > waitUntil):
+                server.kill()
+                raise RuntimeError("the server did not start listening on port " + str(port))
+            time.sleep(0.05)
@@ -0,0 +1,211 @@
+#################################################
+#          Streaming Blackjack Statistics       #
+#################################################
+#
+# Keeps the results of a simulation of any length in
+# constant memory. Rounds flow through a pipeline of
+# generators:
+#
+#      simulation.playRounds  ->  tallyBlocks  ->  accumulate
+#
+# playRounds yields the win code of each round as it is
+# played, tallyBlocks gathers a block of them into counts
+# per win code, and accumulate folds each block into a
+# RunningStats, stopping early once the confidence
+# interval of the player's edge is narrow enough.
+#
+# RunningStats keeps Welford's running mean and sum of
+# squared deviations of the net units won per round,
+# along with the count of each win code. Two of them
+# are merged with Chan's formula, so the stats of
+# chunks played by separate workers add up to exactly
+# those of the whole run. Since a block of rounds can
+# only take the few values the win codes pay, a block
+# is folded in as one merge rather than round by round.
+
+import math
+import statistics
+
+from rules import HOUSE
+
+# The number of rounds tallied between checks of the
+# confidence interval.
+BLOCK = 10000
+
+# Gets the number of standard errors either side of
+# the mean a confidence interval spans.
+#
+# PARAM confidence : The confidence, from 0 to 1.
+#
+# RETURNS : The normal quantile.
+def zScore(confidence):
+    if(confidence <= 0 or confidence >= 1):
+        raise ValueError("confidence must be within (0, 1)")
+    return statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+
+#
+# Abstraction - Running statistics of the net units won per
+#               round over some number of rounds, the player's
+#               edge being their mean.
+#
+# Rep Invariants:
+#  rounds >= 0
+#  m2 >= 0, the sum of squared deviations from mean
+#  sum(counts.values()) <= rounds, equal when every round
+#       was added with its win code
+
+class RunningStats():
+    __slots__ = ("rounds", "mean", "m2", "counts")
+
+    # RunningStats data type constructor, covering no rounds.
+    def __init__(self):
+        self.rounds = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.counts = {}
+
+    # Adds a single round.
+    #
+    # PARAM net : the net units won in the round.
+    # PARAM win : the round's win code, if it is to be counted.
+    def add(self, net, win=None):
+        self.rounds += 1
+        delta = net - self.mean
+        self.mean += delta / self.rounds
+        self.m2 += delta * (net - self.mean)
+        if(win is not None):
+            self.counts[win] = self.counts.get(win, 0) + 1
+
+    # Folds in the statistics of other rounds.
+    #
+    # PARAM rounds : the number of other rounds.
+    # PARAM mean : their mean net units won.
+    # PARAM m2 : their sum of squared deviations from mean.
+    def combine(self, rounds, mean, m2):
+        if(rounds == 0):
+            return
+        total = self.rounds + rounds
+        delta = mean - self.mean
+        self.mean += delta * rounds / total
+        self.m2 += m2 + delta * delta * self.rounds * rounds / total
+        self.rounds = total
+
+    # Adds a block of rounds tallied by win code.
+    #
+    # PARAM counts : a dictionary mapping win codes to the
+    #                number of rounds that ended in them.
+    # PARAM rules : the Rules the rounds were paid by.
+    #
+    # RETURNS : this RunningStats, for convenience.
+    def addCounts(self, counts, rules=HOUSE):
+        payouts = rules.payouts()
+        rounds = sum(counts.values())
+        if(rounds == 0):
+            return self
+        mean = sum(counts[win] * (payouts[win] - 1.0) for win in counts) / rounds
+        m2 = sum(counts[win] * (payouts[win] - 1.0 - mean) ** 2 for win in counts)
+        self.combine(rounds, mean, m2)
+        for win in counts:
+            self.counts[win] = self.counts.get(win, 0) + counts[win]
+        return self
+
+    # Folds in another RunningStats.
+    #
+    # PARAM other : the RunningStats of other rounds.
+    #
+    # RETURNS : this RunningStats, for convenience.
+    def merge(self, other):
+        self.combine(other.rounds, other.mean, other.m2)
+        for win in other.counts:
+            self.counts[win] = self.counts.get(win, 0) + other.counts[win]
+        return self
+
+    # RETURNS : the sample variance of the net units won per round.
+    def variance(self):
+        if(self.rounds < 2):
+            return 0.0
+        return self.m2 / (self.rounds - 1)
+
+    # RETURNS : the standard error of the player's edge.
+    def standardError(self):
+        if(self.rounds < 2):
+            return math.inf
+        return math.sqrt(self.variance() / self.rounds)
+
+    # RETURNS : the net units won over every round.
+    def net(self):
+        return self.mean * self.rounds
+
+    # Gets a confidence interval of the house edge.
+    #
+    # PARAM confidence : the confidence, from 0 to 1.
+    #
+    # RETURNS : a tuple of the low and high ends of the
+    #           interval, in units per round.
+    def houseEdge(self, confidence=0.95):
+        spread = zScore(confidence) * self.standardError()
+        return (-self.mean - spread, -self.mean + spread)
+
+    # PARAM confidence : the confidence, from 0 to 1.
+    #
+    # RETURNS : the width of the confidence interval of
+    #           the edge, in units per round.
+    def width(self, confidence=0.95):
+        return 2 * zScore(confidence) * self.standardError()
+
+    # Describes the statistics in text.
+    #
+    # PARAM confidence : the confidence of the interval.
+    #
+    # RETURNS : A list of lines.
+    def summary(self, confidence=0.95):
+        low, high = self.houseEdge(confidence)
+        return [
+            "Rounds: " + str(self.rounds),
+            "Net units: {:.2f}".format(self.net()),
+            "Player edge: {:.4%}".format(self.mean),
+            "House edge: {:.4%} ({:.0%} interval {:.4%} to {:.4%})".format(-self.mean, confidence, low, high),
+            "Standard deviation per round: {:.4f} units".format(math.sqrt(self.variance())),
+        ]
+
+# Gathers a stream of win codes into blocks.
+#
+# PARAM results : An iterable of win codes.
+# PARAM size : The number of rounds in each block.
+#
+# YIELDS : Dictionaries mapping win codes to the number
+#          of rounds of the block that ended in them. The
+#          last block may be short.
+def tallyBlocks(results, size=BLOCK):
+    counts = {}
+    held = 0
+    for win in results:
+        counts[win] = counts.get(win, 0) + 1
+        held += 1
+        if(held == size):
+            yield counts
+            counts = {}
+            held = 0
+    if(held):
+        yield counts
+
+# Folds blocks of tallies into running statistics.
+#
+# PARAM blocks : An iterable of tallies, as from tallyBlocks.
+# PARAM rules : The Rules the rounds were paid by.
+# PARAM width : An optional width of the confidence interval
+#               of the edge, in units per round, at which to
+#               stop reading blocks.
+# PARAM confidence : The confidence of that interval.
+# PARAM stats : The RunningStats to fold into. A new one is
+#               made when not given.
+#
+# RETURNS : The RunningStats.
+def accumulate(blocks, rules=HOUSE, width=None, confidence=0.95, stats=None):
+    if(stats is None):
+        stats = RunningStats()
+    for counts in blocks:
+        stats.addCounts(counts, rules)
+        if(width is not None and stats.width(confidence) <= width):
+            break
+    return stats
@@ -0,0 +1,99 @@
+#
+# Abstraction - The result of a finished round of Blackjack:
+#               how each of the player's hands fared, whether
+#               the bet was doubled, and whether the player had
+#               blackjack. Every win condition in the blackjack
+#               header has exactly one Outcome, shared by
+#               everything that holds it.
+#
+#               The win conditions do not record which split
+#               hand did what, so split results are listed
+#               best first.
+#
+# Rep Invariants:
+#  code is a win condition following the blackjack header
+#  OUTCOMES[index] is this outcome
+#  1 <= len(hands) <= 2, each one of WIN, PUSH, LOSE, BLACKJACK
+#       or SURRENDER
+#  split == (len(hands) == 2)
+#  doubled implies not split
+#  blackjack == (BLACKJACK in hands)
+#  quarters == 4 * the amount credited per unit of bet,
+#              after the bet has been taken out
+#
+# Outcomes are shared, so they must never be modified.
+
+WIN = "win"
+PUSH = "push"
+LOSE = "lose"
+BLACKJACK = "blackjack"
+SURRENDER = "surrender"
+
+class Outcome():
+    __slots__ = ("code", "index", "hands", "doubled", "split", "blackjack", "quarters")
+
+    # Looks up the outcome of a win condition.
+    #
+    # PARAM code : a win condition following the
+    #              blackjack header conventions.
+    #
+    # RETURNS : the shared instance of that outcome.
+    def __new__(cls, code):
+        if(code not in BY_CODE):
+            raise ValueError("unknown win condition: " + str(code))
+        return BY_CODE[code]
+
+    # Outcomes are rebuilt from their code when unpickled
+    # or copied, so the shared instance is always used.
+    def __reduce__(self):
+        return (Outcome, (self.code,))
+
+    def __repr__(self):
+        return "Outcome(" + str(self.code) + ")"
+
+# Builds one of the shared outcomes.
+#
+# PARAM index : the position of the outcome in OUTCOMES.
+# PARAM code : the win condition, following the
+#              blackjack header conventions.
+# PARAM hands : a tuple of the result of each hand.
+# PARAM doubled : TRUE iff the bet was doubled down.
+# PARAM quarters : the amount credited per unit of bet, in
+#                  quarters, after the bet has been taken out.
+#
+# RETURNS : the new outcome.
+def makeOutcome(index, code, hands, doubled, quarters):
+    outcome = object.__new__(Outcome)
+    outcome.index = index
+    outcome.code = code
+    outcome.hands = hands
+    outcome.doubled = doubled
+    outcome.split = len(hands) == 2
+    outcome.blackjack = BLACKJACK in hands
+    outcome.quarters = quarters
+    return outcome
+
+# Every outcome, in the order of the header.
+OUTCOMES = tuple(makeOutcome(index, *row) for index, row in enumerate([
+    (0.0,  (LOSE,),                 False, 0),
+    (1.0,  (PUSH,),                 False, 4),
+    (1.5,  (BLACKJACK,),            False, 6),
+    (2.0,  (WIN,),                  False, 8),
+    (3.0,  (WIN, PUSH),             False, 6),
+    (3.25, (PUSH, LOSE),            False, 2),
+    (3.5,  (PUSH, PUSH),            False, 4),
+    (3.75, (WIN, LOSE),             False, 4),
+    (3.8,  (LOSE, LOSE),            False, 0),
+    (3.9,  (WIN, WIN),              False, 8),
+    (4.0,  (BLACKJACK, BLACKJACK),  False, 6),
+    (4.5,  (BLACKJACK, LOSE),       False, 3),
+    (4.75, (BLACKJACK, PUSH),       False, 5),
+    (5.0,  (BLACKJACK, WIN),        False, 7),
+    (6.0,  (WIN,),                  True,  12),
+    (6.5,  (LOSE,),                 True,  -4),
+    (6.75, (PUSH,),                 True,  0),
+    (7.0,  (SURRENDER,),            False, 2),
+]))
+
+# Every outcome, keyed by its win condition.
+BY_CODE = {outcome.code : outcome for outcome in OUTCOMES}
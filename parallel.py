@@ -0,0 +1,169 @@
+#################################################
+#          Parallel Blackjack Simulation        #
+#################################################
+#
+# Spreads a simulation over several processes.
+# The rounds are cut into fixed size chunks, and
+# every chunk plays from its own random number
+# generator, seeded from the run's seed and the
+# chunk's index. Since the chunks do not depend on
+# how many workers there are, a given seed always
+# produces the same tallies.
+#
+# runStreaming plays the chunks through the pipeline
+# of onlinestats.py and merges their RunningStats in
+# chunk order, so it can stop once the confidence
+# interval of the edge is narrow enough. Only a few
+# chunks are queued at a time, so a run of any length
+# takes constant memory.
+
+import hashlib
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import onlinestats
+import simulation
+from rules import HOUSE
+
+# Derives the seed of one chunk of a run.
+#
+# PARAM seed : The seed of the whole run.
+# PARAM index : The index of the chunk.
+#
+# RETURNS : An integer seed for the chunk's generator.
+def chunkSeed(seed, index):
+    digest = hashlib.sha256((str(seed) + ":" + str(index)).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+# Adds the tallies of one simulation into another.
+#
+# PARAM total : A dictionary mapping win states to counts,
+#               updated in place.
+# PARAM counts : A dictionary mapping win states to counts.
+#
+# RETURNS : total, for convenience.
+def mergeCounts(total, counts):
+    for win in counts:
+        total[win] = total.get(win, 0) + counts[win]
+    return total
+
+# Plays one chunk of a run. Takes a single tuple
+# so it can be handed to a process pool's map.
+#
+# PARAM job : A tuple of (rounds, policy, seed, canDouble,
+#             decks, penetration, rules, generator, seats).
+#
+# RETURNS : A dictionary mapping win states to counts.
+def runChunk(job):
+    rounds, policy, seed, canDouble, decks, penetration, rules, generator, seats = job
+    return simulation.simulate(rounds, policy, seed, canDouble, decks, penetration, rules, generator, seats)
+
+# Plays one chunk of a run through the streaming
+# pipeline.
+#
+# PARAM job : A tuple as taken by runChunk.
+#
+# RETURNS : The chunk's RunningStats.
+def streamChunk(job):
+    rules = job[6]
+    return onlinestats.accumulate(onlinestats.tallyBlocks(simulation.playRounds(*job)), rules)
+
+# Lists the chunks of a run.
+#
+# PARAM rounds : The number of rounds to play, or None for
+#                an endless run.
+# PARAM chunkSize : The number of rounds in each chunk.
+# PARAM seed, policy, canDouble, decks, penetration,
+#       rules, generator, seats : As passed to runParallel.
+#
+# YIELDS : A job tuple for each chunk, as taken by runChunk.
+def chunkJobs(rounds, chunkSize, seed, policy, canDouble, decks, penetration, rules, generator, seats):
+    for index in itertools.count():
+        if(rounds is not None and index * chunkSize >= rounds):
+            return
+        size = chunkSize
+        if(rounds is not None):
+            size = min(chunkSize, rounds - index * chunkSize)
+        yield (size, policy, chunkSeed(seed, index), canDouble, decks, penetration, rules, generator, seats)
+
+# Plays a simulation across several processes.
+#
+# PARAM rounds : The number of rounds to play.
+# PARAM policy : The decision policy for the player. Must be
+#                a module level function so it can be sent
+#                to the worker processes.
+# PARAM seed : The seed of the run.
+# PARAM workers : The number of processes to use. Defaults
+#                 to one per core.
+# PARAM chunkSize : The number of rounds in each chunk.
+# PARAM canDouble : Whether the player may double down.
+# PARAM decks : The number of decks in each chunk's shoe.
+# PARAM penetration : The fraction of the shoe dealt
+#                     before it is reshuffled.
+# PARAM rules : The Rules played by.
+# PARAM generator : The random number generator shuffled
+#                   with, one of simulation.GENERATORS.
+# PARAM seats : The number of seats at each chunk's table.
+#
+# RETURNS : A dictionary mapping each win state to the
+#           number of hands that ended in it.
+def runParallel(rounds, policy=simulation.basicPolicy, seed=0, workers=None,
+                chunkSize=100000, canDouble=True, decks=1, penetration=0.75, rules=HOUSE, generator="mt",
+                seats=1):
+    if(workers is None):
+        workers = os.cpu_count() or 1
+    jobs = list(chunkJobs(rounds, chunkSize, seed, policy, canDouble, decks, penetration, rules, generator, seats))
+
+    total = {}
+    if(workers <= 1 or len(jobs) <= 1):
+        for job in jobs:
+            mergeCounts(total, runChunk(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for counts in pool.map(runChunk, jobs):
+                mergeCounts(total, counts)
+    return total
+
+# Plays a simulation across several processes, keeping
+# only running statistics.
+#
+# PARAM rounds : The most rounds to play, or None to play
+#                until the interval is narrow enough.
+# PARAM width : An optional width of the confidence interval
+#               of the edge, in units per round, at which to
+#               stop. Checked after each chunk.
+# PARAM confidence : The confidence of that interval.
+# PARAM policy, seed, workers, chunkSize, canDouble, decks,
+#       penetration, rules, generator, seats : As passed to
+#       runParallel. Each seat's hand is a round of the stats.
+#
+# RETURNS : An onlinestats.RunningStats.
+def runStreaming(rounds=None, width=None, confidence=0.95, policy=simulation.basicPolicy, seed=0, workers=None,
+                 chunkSize=100000, canDouble=True, decks=1, penetration=0.75, rules=HOUSE, generator="mt",
+                 seats=1):
+    if(rounds is None and width is None):
+        raise ValueError("a run needs a number of rounds or an interval width to stop at")
+    if(workers is None):
+        workers = os.cpu_count() or 1
+    jobs = chunkJobs(rounds, chunkSize, seed, policy, canDouble, decks, penetration, rules, generator, seats)
+
+    stats = onlinestats.RunningStats()
+    if(workers <= 1):
+        for job in jobs:
+            stats.merge(streamChunk(job))
+            if(width is not None and stats.width(confidence) <= width):
+                break
+        return stats
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque(pool.submit(streamChunk, job) for job in itertools.islice(jobs, 2 * workers))
+        while(pending):
+            stats.merge(pending.popleft().result())
+            if(width is not None and stats.width(confidence) <= width):
+                for future in pending:
+                    future.cancel()
+                break
+            for job in itertools.islice(jobs, 1):
+                pending.append(pool.submit(streamChunk, job))
+    return stats
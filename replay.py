@@ -0,0 +1,591 @@
+#################################################
+#          Blackjack Session Replay             #
+#################################################
+#
+# Replays recorded console sessions of
+# blackjack.playBlackjack, to check that the game
+# still behaves exactly as it did when they were
+# recorded, that the Table engine the server plays
+# by agrees with it, and where it parts from the
+# game it replaced, kept frozen in baseline.py.
+#
+# A session is everything needed to play it again:
+# the seed of the shoe, the starting wallet, the
+# rules, and every answer typed, in order. Along with
+# them it keeps what came of the session, the bet,
+# win condition and balance in cents of every round,
+# and a SHA-256 digest of the transcript of everything
+# printed. Sessions are kept one per line in a JSON
+# lines corpus:
+#
+#      {"seed": 7, "wallet": 5.0, "rules": {...},
+#       "answers": ["1", "h", "s", "y", ...],
+#       "rounds": [[100, 2.0, 600], ...],
+#       "transcript": "9f86d0..."}
+#
+# Checking a session plays it three times more:
+#
+#  - through playBlackjack, answering from the script,
+#    which must give the same rounds and the same
+#    transcript, byte for byte
+#  - through a Table, reading the same answers the way
+#    the console does, which must give the same rounds
+#  - through the baseline game, answering from the
+#    script and dealt the same cards from the same
+#    shoe, which must give the same bets, win
+#    conditions and balances, use the same answers and
+#    cards, round for round, until the sessions part
+#    by one of the changes in BASELINE_CHANGES
+#
+# Once the two games part, their answers no longer
+# line up, so the rest of the session is not compared.
+# A change is only allowed to explain the round it
+# shows itself in; anything else that differs is a
+# failure. Only sessions played by the house rules,
+# with any number of decks, can be compared with the
+# baseline game, which had no others.
+#
+# A session ends where its answers run out, just as
+# the console game ends at the end of its input.
+#
+# Sessions are recorded by a bot that answers each
+# question at random from the choices it offers, and
+# now and then types a move that is not offered,
+# which the game reads as a hit.
+
+import hashlib
+import json
+import os
+import random
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import baseline
+from blackjack import playBlackjack, readAction
+from console import ScriptedConsole
+from ledger import CREDITS, toCents
+from rules import FIELDS, HOUSE, Rules
+from shoe import Shoe
+from table import Table
+
+# The bets the bot places, in dollars, when it has the
+# money for them.
+BOT_BETS = ["0.25", "0.50", "1", "1.00", "2.50"]
+
+# Moves the bot types that are never offered.
+BOT_JUNK = ["x", "", "hit me", "D", "sp"]
+
+# The ways the game today deliberately plays differently
+# from the baseline game, and the request that made each.
+BASELINE_CHANGES = {
+    "split-non-pair" : "user-012: sp typed without a pair is a hit, where the baseline split anyway",
+    "double-without-funds" : "user-012: d typed without the money to double is a hit, where the baseline doubled",
+    "split-answer-case" : "user-012: a split hand's first answer is read in any case, where the baseline hit on S",
+    "split-hand-2-bust" : "user-012: hand 2 stops once it busts, where the baseline tested hand 1",
+    "whole-cents" : "user-011: money is kept in whole cents, where the baseline kept float dollars",
+}
+
+# Tallies for sessions that did not part from the baseline game.
+MATCHED = "matched"
+SKIPPED = "not house rules"
+
+#
+# Abstraction - A ScriptedConsole that also keeps every question
+#               and answer, and every line printed, in order, as
+#               events: ("input", prompt, answer) or ("print", line).
+#
+# Rep Invariants:
+#  events holds one "input" event per answer given
+
+class TracingConsole(ScriptedConsole):
+    __slots__ = ("events",)
+
+    # TracingConsole data type constructor.
+    #
+    # PARAM answers : a list of answers, in the order the
+    #                 questions are asked.
+    def __init__(self, answers):
+        ScriptedConsole.__init__(self, answers)
+        self.events = []
+
+    # Asks a question, answering from the script.
+    def input(self, prompt=""):
+        answer = ScriptedConsole.input(self, prompt)
+        self.events.append(("input", prompt, answer))
+        return answer
+
+    # Prints a line into the transcript.
+    def print(self, *values, sep=" ", end="\n"):
+        ScriptedConsole.print(self, *values, sep=sep, end=end)
+        self.events.append(("print", sep.join(str(value) for value in values) + end))
+
+#
+# Abstraction - A Shoe that keeps every card it deals, until
+#               they are taken out of log.
+
+class LoggedShoe(Shoe):
+    __slots__ = ("log",)
+
+    # LoggedShoe data type constructor.
+    def __init__(self, decks=1, penetration=0.75, rng=None):
+        self.log = []
+        Shoe.__init__(self, decks, penetration, rng)
+
+    # Deals the next card, keeping it in the log.
+    def deal(self):
+        card = Shoe.deal(self)
+        self.log.append(card)
+        return card
+
+#
+# Abstraction - The record list handed to a game's playBlackjack.
+#               Each round added is kept along with the number of
+#               answers given, the cards dealt in the round, and
+#               the number of console events, up to its settlement.
+#
+# Rep Invariants:
+#  every entry is (bet, win, balance, answers, cards, events)
+
+class RoundLog(list):
+    __slots__ = ("console", "shoe")
+
+    # RoundLog data type constructor.
+    #
+    # PARAM console : the TracingConsole the game plays at.
+    # PARAM shoe : the LoggedShoe the game deals from.
+    def __init__(self, console, shoe):
+        list.__init__(self)
+        self.console = console
+        self.shoe = shoe
+
+    # Adds a settled round.
+    #
+    # PARAM entry : the game's tuple of (bet, win, balance).
+    def append(self, entry):
+        list.append(self, tuple(entry) + (self.console.position, tuple(self.shoe.log), len(self.console.events)))
+        self.shoe.log.clear()
+
+#
+# Abstraction - A TracingConsole whose answers are made up as
+#               each question is asked, by a bot picking at random
+#               from what the question offers. Every answer given
+#               is kept in answers, so the session can be replayed.
+#
+# Rep Invariants:
+#  position == len(answers)
+#  played counts the times the bot was asked to play again
+
+class BotConsole(TracingConsole):
+    __slots__ = ("rng", "rounds", "played")
+
+    # BotConsole data type constructor.
+    #
+    # PARAM seed : the seed of the bot's choices.
+    # PARAM rounds : the most rounds the bot plays.
+    def __init__(self, seed, rounds=50):
+        TracingConsole.__init__(self, [])
+        self.rng = random.Random(seed)
+        self.rounds = rounds
+        self.played = 0
+
+    # Answers a question as the bot would.
+    #
+    # PARAM prompt : the question.
+    #
+    # RETURNS : the answer.
+    def input(self, prompt=""):
+        rng = self.rng
+        if(prompt.startswith("You don't have enough")):
+            answer = "0.01"
+        elif("bet" in prompt):
+            answer = rng.choice(BOT_BETS)
+        elif("play again" in prompt):
+            self.played += 1
+            if(self.played >= self.rounds or rng.random() < 0.02):
+                answer = rng.choice(["n", "N"])
+            else:
+                answer = rng.choice(["y", "Y", ""])
+        elif(rng.random() < 0.03):
+            answer = rng.choice(BOT_JUNK)
+        else:
+            answer = rng.choice(re.findall(r"\((\w+)\)", prompt))
+            if(rng.random() < 0.1):
+                answer = answer.upper()
+        self.answers.append(answer)
+        return TracingConsole.input(self, prompt)
+
+# Gets the rules a session was played by.
+#
+# PARAM session : The session.
+#
+# RETURNS : The Rules.
+def sessionRules(session):
+    return Rules(**session["rules"])
+
+# Gets the digest of a transcript.
+#
+# PARAM text : The transcript.
+#
+# RETURNS : The hexadecimal SHA-256 digest.
+def digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+# Makes the shoe a session is dealt from.
+#
+# PARAM session : The session.
+#
+# RETURNS : A LoggedShoe, shuffled by the session's seed.
+def sessionShoe(session):
+    return LoggedShoe(sessionRules(session).decks, 0.75, random.Random(session["seed"]))
+
+# Plays a session through the console game, answering
+# from a console.
+#
+# PARAM session : The session, of which only the seed,
+#                 wallet and rules are used.
+# PARAM console : The TracingConsole to answer from.
+#
+# RETURNS : The RoundLog of every round played, with
+#           each win as an Outcome and money in cents.
+def playLogged(session, console):
+    record = RoundLog(console, sessionShoe(session))
+    try:
+        playBlackjack(session["wallet"], rules=sessionRules(session), console=console,
+                      record=record, shoe=record.shoe)
+    except EOFError:
+        pass
+    return record
+
+# Plays a session through the console game, answering
+# from a console.
+#
+# PARAM session : The session, of which only the seed,
+#                 wallet and rules are used.
+# PARAM console : The TracingConsole to answer from.
+#
+# RETURNS : A list of the [bet, win condition, balance] of
+#           every round played.
+def playConsole(session, console):
+    return [[entry[0], entry[1].code, entry[2]] for entry in playLogged(session, console)]
+
+# Makes the deal function the baseline game draws its
+# cards with, dealing from a shoe. The shoe is shuffled
+# before a round whenever the cut card has come out,
+# just as playBlackjack shuffles it today, and the
+# cards of earlier rounds are marked as discards.
+#
+# PARAM shoe : The Shoe to deal from.
+#
+# RETURNS : A function in the form of baseline.dealCard.
+def shoeDeal(shoe):
+    def deal(dealtCards):
+        if(not(dealtCards)):
+            if(shoe.needsShuffle()):
+                shoe.shuffle()
+            shoe.startRound()
+        return shoe.deal()
+    return deal
+
+# Plays a session through the baseline game, dealt
+# the same cards as the game today.
+#
+# PARAM session : The session.
+#
+# RETURNS : A tuple of the RoundLog of every round played,
+#           with each win as a win condition and the wallet
+#           in dollars, the list of console events, and
+#           what the game raised, if it stopped with an
+#           error other than running out of answers.
+def playBaseline(session):
+    console = TracingConsole(session["answers"])
+    record = RoundLog(console, sessionShoe(session))
+    error = None
+    try:
+        baseline.playBlackjack(session["wallet"], console, shoeDeal(record.shoe), record)
+    except EOFError:
+        pass
+    except Exception as raised:
+        error = raised
+    return record, console.events, error
+
+# Finds the change that explains the baseline game
+# playing a round differently from the game today.
+#
+# PARAM events : The baseline game's console events from
+#                the end of the last round that matched to
+#                the end of this one.
+# PARAM wallet : The baseline wallet going into the round,
+#                in dollars.
+# PARAM balance : The balance today going into the round,
+#                 in cents.
+#
+# RETURNS : The name of the change in BASELINE_CHANGES, or
+#           None when none of them explains the round.
+def explainRound(events, wallet, balance):
+    inputs = [event for event in events if(event[0] == "input")]
+    moves = [event for event in inputs if("(s)tand" in event[1])]
+    if(moves):
+        prompt, answer = moves[0][1], moves[0][2].lower()
+        if(answer == "sp" and "(sp)" not in prompt):
+            return "split-non-pair"
+        if(answer == "d" and "(d)" not in prompt):
+            return "double-without-funds"
+
+    label = None
+    for event in inputs:
+        if(event[1].startswith("Hand ") and event[1][:6] != label):
+            label = event[1][:6]
+            if(event[2] != "s" and event[2].lower() == "s"):
+                return "split-answer-case"
+
+    secondHand = False
+    for i in range(len(events)):
+        if(events[i][0] == "input" and events[i][1].startswith("Hand 2:")):
+            secondHand = True
+        total = None
+        if(events[i][0] == "print"):
+            total = re.match(r"Your new total is (\d+)", events[i][1])
+        if(secondHand and total is not None):
+            bust = i + 1 < len(events) and events[i + 1] == ("print", "Bust!\n")
+            if(bust != (int(total.group(1)) > 21)):
+                return "split-hand-2-bust"
+
+    # The bets and whether to double are decided on money,
+    # which the two games may hold differently.
+    if(balance <= 0 and wallet > 0):
+        return "whole-cents"
+    for event in inputs:
+        if("$" in event[1]):
+            try:
+                amount = float(event[2])
+            except ValueError:
+                continue
+            bet = toCents(amount)
+            if((amount > wallet) != (bet > balance)):
+                return "whole-cents"
+            if(bet <= balance):
+                if((wallet - amount >= amount) != (balance - bet >= bet)):
+                    return "whole-cents"
+                break
+    return None
+
+# Compares a session played by the game today with the
+# baseline game, round by round.
+#
+# PARAM session : The session.
+#
+# RETURNS : A tuple of a list of what differed without
+#           explanation, empty when nothing did, and the
+#           name of the change in BASELINE_CHANGES the two
+#           games parted by, MATCHED when they never
+#           parted, or SKIPPED when the session was not
+#           played by the house rules.
+def compareBaseline(session):
+    rules = dict(session["rules"])
+    rules["decks"] = HOUSE.decks
+    if(Rules(**rules) != HOUSE):
+        return [], SKIPPED
+    today = playLogged(session, TracingConsole(session["answers"]))
+    before, events, error = playBaseline(session)
+
+    # The baseline wallet is in dollars and never rounded,
+    # so it may hold fractions of a cent more than the
+    # ledger, by the amount each credit was rounded down.
+    wallet = session["wallet"]
+    balance = toCents(wallet)
+    drift = 0.0
+    start = 0
+    for i in range(max(len(today), len(before))):
+        same = i < len(today) and i < len(before)
+        if(same):
+            bet, outcome, money, answers, cards, end = today[i]
+            oldBet, oldWin, oldWallet, oldAnswers, oldCards, oldEnd = before[i]
+            same = (toCents(oldBet) == bet and oldWin == outcome.code and oldAnswers == answers and
+                    oldCards == cards)
+        if(same):
+            drift += (bet * CREDITS[outcome.index] % 4) / 4
+            same = abs(oldWallet * 100 - money - drift) < 1e-6
+        if(not(same)):
+            if(i < len(before)):
+                roundEvents = events[start:before[i][5]]
+            else:
+                roundEvents = events[start:]
+            change = explainRound(roundEvents, wallet, balance)
+            if(change is not None):
+                return [], change
+            problem = "baseline game differs at round " + str(i + 1)
+            if(i >= len(before) and error is not None):
+                problem += ", raising " + repr(error)
+            return [problem], None
+        wallet, balance = oldWallet, money
+        start = oldEnd
+    return [], MATCHED
+
+# Records a session, played by the bot.
+#
+# PARAM seed : The seed of the shoe, and of the bot.
+# PARAM wallet : The money the session starts with.
+# PARAM rules : The Rules played by.
+# PARAM rounds : The most rounds played.
+#
+# RETURNS : The session.
+def recordSession(seed, wallet=5.00, rules=HOUSE, rounds=50):
+    session = {"seed" : seed, "wallet" : wallet, "rules" : {name : getattr(rules, name) for name in FIELDS}}
+    bot = BotConsole(seed, rounds)
+    session["rounds"] = playConsole(session, bot)
+    session["answers"] = bot.answers
+    session["transcript"] = digest(bot.transcript())
+    return session
+
+# Replays a session through the console game.
+#
+# PARAM session : The session.
+#
+# RETURNS : A tuple of the rounds played, as from
+#           playConsole, and the transcript's digest.
+def replayConsole(session):
+    console = TracingConsole(session["answers"])
+    rounds = playConsole(session, console)
+    return rounds, digest(console.transcript())
+
+# Replays a session on a Table, reading the answers
+# the way the console game reads them.
+#
+# PARAM session : The session.
+#
+# RETURNS : A list of the [bet, win condition, balance] of
+#           every round played.
+def replayTable(session):
+    rules = sessionRules(session)
+    table = Table(toCents(session["wallet"]), rules.decks, 0.75, random.Random(session["seed"]), rules=rules)
+    ledger = table.ledger
+    answers = iter(session["answers"])
+    rounds = []
+    try:
+        while(ledger.balance > 0):
+            bet = toCents(float(next(answers)))
+            while(bet > ledger.balance):
+                bet = toCents(float(next(answers)))
+            table.start(bet)
+            while(table.inPlay()):
+                table.act(readAction(table.round, next(answers)))
+            rounds.append([bet, table.round.outcome.code, ledger.balance])
+            if(ledger.balance > 0 and next(answers).lower() == "n"):
+                break
+    except StopIteration:
+        pass
+    return rounds
+
+# Checks a session against every replay.
+#
+# PARAM session : The session.
+#
+# RETURNS : A tuple of a list of what did not match, empty
+#           when everything did, and how the session fared
+#           against the baseline game, as from
+#           compareBaseline, or None if that could not be
+#           told.
+def checkSession(session):
+    problems = []
+    try:
+        rounds, transcript = replayConsole(session)
+        if(rounds != session["rounds"]):
+            problems.append("console rounds differ from the recording")
+        if(transcript != session["transcript"]):
+            problems.append("console transcript differs from the recording")
+    except Exception as error:
+        problems.append("console raised " + repr(error))
+    try:
+        if(replayTable(session) != session["rounds"]):
+            problems.append("table rounds differ from the recording")
+    except Exception as error:
+        problems.append("table raised " + repr(error))
+    parted = None
+    try:
+        found, parted = compareBaseline(session)
+        problems += found
+    except Exception as error:
+        problems.append("baseline comparison raised " + repr(error))
+    return problems, parted
+
+# Checks a batch of sessions. Takes a single list so
+# it can be handed to a process pool's map.
+#
+# PARAM sessions : A list of sessions.
+#
+# RETURNS : A tuple of a list of (seed, problems) for every
+#           session that did not match, and a dictionary
+#           counting the sessions by how they fared against
+#           the baseline game.
+def checkBatch(sessions):
+    failures = []
+    tally = {}
+    for session in sessions:
+        problems, parted = checkSession(session)
+        if(problems):
+            failures.append((session["seed"], problems))
+        if(parted is not None):
+            tally[parted] = tally.get(parted, 0) + 1
+    return failures, tally
+
+# Writes sessions to a corpus.
+#
+# PARAM path : The path of the corpus.
+# PARAM sessions : An iterable of sessions.
+def writeCorpus(path, sessions):
+    with open(path, "w") as file:
+        for session in sessions:
+            file.write(json.dumps(session, separators=(",", ":")) + "\n")
+
+# Reads the sessions of a corpus.
+#
+# PARAM path : The path of the corpus.
+#
+# YIELDS : Each session, in order.
+def readCorpus(path):
+    with open(path) as file:
+        for line in file:
+            if(line.strip()):
+                yield json.loads(line)
+
+# Checks every session of a corpus, across several
+# processes.
+#
+# PARAM path : The path of the corpus.
+# PARAM workers : The number of processes to use. Defaults
+#                 to one per core.
+# PARAM batch : The number of sessions sent to a process
+#               at a time.
+#
+# RETURNS : A tuple of the number of sessions checked, a
+#           list of (seed, problems) for every session that
+#           did not match, and a dictionary counting the
+#           sessions by how they fared against the baseline
+#           game: MATCHED, SKIPPED, or the name of the change
+#           in BASELINE_CHANGES the games parted by.
+def checkCorpus(path, workers=None, batch=64):
+    if(workers is None):
+        workers = os.cpu_count() or 1
+    batches = []
+    current = []
+    for session in readCorpus(path):
+        current.append(session)
+        if(len(current) == batch):
+            batches.append(current)
+            current = []
+    if(current):
+        batches.append(current)
+
+    checked = sum(len(sessions) for sessions in batches)
+    failures = []
+    tally = {}
+    if(workers <= 1 or len(batches) <= 1):
+        results = [checkBatch(sessions) for sessions in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(checkBatch, batches))
+    for found, counts in results:
+        failures += found
+        for name in counts:
+            tally[name] = tally.get(name, 0) + counts[name]
+    return checked, failures, tally
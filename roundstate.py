@@ -0,0 +1,426 @@
+#
+# Abstraction - One round of Blackjack at a table, played one
+#               step at a time. The cards are dealt when the
+#               round is created, and the round then waits for
+#               the player's next action on the hand in play.
+#               Nothing here ever asks for input or prints, so
+#               whoever holds the round can set it aside between
+#               actions and any number of rounds can be in play
+#               at once.
+#
+#               The rules are those of blackjack.playRound: the
+#               dealer draws to 18 even once the player is bust,
+#               ties go to the player, a natural is paid at once,
+#               and split hands are played one after the other.
+#               A Rules object changes when the dealer stands,
+#               whether splitting is allowed, and whether the
+#               player may surrender instead of their first move.
+#
+# Rep Invariants:
+#  len(dealer.cards) >= 2
+#  1 <= len(hands) <= 2
+#  len(blackjacks) == len(hands)
+#  phase == PLAYER iff outcome is None
+#  phase == PLAYER implies 0 <= current < len(hands) and
+#                  hands[current] is neither bust nor a blackjack
+#  doubled implies len(hands) == 1
+#  outcome.code == 7.0 iff the player surrendered, in which
+#                 case the dealer drew nothing
+#  moves lists every action taken, in order
+
+from hand import HandState
+from outcome import Outcome
+from rules import HOUSE
+
+PLAYER = "player"
+DEALER = "dealer"
+DONE = "done"
+
+# The most seats a table has.
+MAX_SEATS = 7
+
+HIT = "h"
+STAND = "s"
+DOUBLE = "d"
+SPLIT = "sp"
+SURRENDER = "su"
+
+# A one byte code for each action, as kept in
+# snapshots and hand histories.
+MOVE_CODES = {HIT : 1, STAND : 2, DOUBLE : 3, SPLIT : 4, SURRENDER : 5}
+MOVES = {code : action for action, code in MOVE_CODES.items()}
+
+# Draws cards for the dealer until the rules say
+# to stand.
+#
+# PARAM dealer : The dealer's HandState.
+# PARAM shoe : The Shoe to deal from.
+# PARAM rules : The Rules played by.
+def drawDealer(dealer, shoe, rules):
+    hits = rules.drawTable
+    while(hits[(dealer.hard << 1) | dealer.aces]):
+        dealer.add(shoe.deal())
+
+# Determines the win state of a single (unsplit) hand
+# once the dealer has finished drawing. Ties go to the
+# player, as they always have in this game.
+#
+# PARAM player : The point total of the player's hand.
+# PARAM dealer : The point total of the dealer's hand.
+# PARAM doubled : A boolean that reads TRUE iff the
+#                 player doubled down on this hand.
+#
+# RETURNS : A float representing the win state
+#           of the hand, following header conventions.
+def settleSingle(player, dealer, doubled):
+    if(player <= 21 and (dealer > 21 or player >= dealer)):
+        if(doubled):
+            return 6.0
+        return 2.0
+    if(doubled):
+        return 6.5
+    return 0.0
+
+# Determines the win state of a pair of split hands
+# once the dealer has finished drawing.
+#
+# PARAM total1 : The point total of the first hand.
+# PARAM total2 : The point total of the second hand.
+# PARAM dealer : The point total of the dealer's hand.
+# PARAM blackjack1 : A boolean that reads TRUE iff the
+#                    first hand was dealt 21.
+# PARAM blackjack2 : A boolean that reads TRUE iff the
+#                    second hand was dealt 21.
+#
+# RETURNS : A float representing the win state
+#           of the split, following header conventions.
+def settleSplit(total1, total2, dealer, blackjack1, blackjack2):
+    if(blackjack1 and blackjack2):
+        return 4.0
+    if(blackjack1 or blackjack2):
+        if(blackjack1):
+            other = total2
+        else:
+            other = total1
+        if(dealer > 21):
+            return 5.0
+        if(other <= 21):
+            if(other > dealer):
+                return 5.0
+            elif(other == dealer):
+                return 4.75
+        return 4.5
+
+    if(dealer <= 21):
+        if(total1 <= 21 and total2 <= 21):
+            if(total1 == dealer and total2 == dealer):
+                return 3.5
+            elif((total1 == dealer and total2 < dealer) or (total2 == dealer and total1 < dealer)):
+                return 3.25
+            elif((total1 == dealer and total2 > dealer) or (total2 == dealer and total1 > dealer)):
+                return 3.0
+            elif((total1 > dealer and total2 < dealer) or (total2 > dealer and total1 < dealer)):
+                return 3.75
+            elif(total1 > dealer and total2 > dealer):
+                return 3.9
+        elif(total1 <= 21 or total2 <= 21):
+            # The live hand is compared using the busted
+            # hand's total, so this always reads as a win.
+            if(total1 <= 21):
+                other = total2
+            else:
+                other = total1
+            if(other > dealer):
+                return 3.75
+            elif(other == dealer):
+                return 3.25
+    else:
+        if(total1 <= 21 and total2 <= 21):
+            return 3.9
+        elif(total1 <= 21 or total2 <= 21):
+            return 3.75
+    return 3.8
+
+class RoundState():
+    __slots__ = ("shoe", "canDouble", "rules", "hands", "blackjacks", "dealer",
+                 "current", "doubled", "moves", "phase", "outcome")
+
+    # RoundState data type constructor. Deals the opening
+    # cards, and settles the round at once on a natural.
+    #
+    # PARAM shoe : the Shoe to deal from.
+    # PARAM canDouble : whether the player has enough money
+    #                   left to double down.
+    # PARAM rules : the Rules played by.
+    def __init__(self, shoe, canDouble=True, rules=HOUSE):
+        self.shoe = shoe
+        self.canDouble = canDouble
+        self.rules = rules
+        shoe.startRound()
+        player = HandState()
+        self.dealer = HandState()
+        for i in range(2):
+            player.add(shoe.deal())
+            self.dealer.add(shoe.deal())
+        self.hands = [player]
+        self.blackjacks = [player.isBlackjack()]
+        self.current = 0
+        self.doubled = False
+        self.moves = []
+        self.phase = PLAYER
+        self.outcome = None
+        if(self.blackjacks[0]):
+            self.phase = DONE
+            self.outcome = Outcome(1.5)
+
+    # RETURNS : true iff the round has been settled.
+    def isDone(self):
+        return self.phase == DONE
+
+    # RETURNS : the HandState the player is acting on.
+    def hand(self):
+        return self.hands[self.current]
+
+    # RETURNS : the dealer's visible card integer.
+    def upcard(self):
+        return self.dealer.cards[1]
+
+    # Lists the actions the player may take next.
+    #
+    # RETURNS : a list of action strings, empty once
+    #           the round is done.
+    def actions(self):
+        if(self.phase == DONE):
+            return []
+        if(len(self.hands) == 1 and self.hands[0].count == 2):
+            actions = [HIT, STAND]
+            if(self.canDouble):
+                actions.append(DOUBLE)
+            if(self.hands[0].isPair() and self.rules.maxSplits > 0):
+                actions.append(SPLIT)
+            if(self.rules.surrender):
+                actions.append(SURRENDER)
+            return actions
+        return [HIT, STAND]
+
+    # Takes the player's next action, moving the round
+    # on to the next hand, or through the dealer's draw
+    # to settlement, once the hand in play is finished.
+    #
+    # PARAM action : one of the strings from actions().
+    def act(self, action):
+        if(action not in self.actions()):
+            raise ValueError("action " + repr(action) + " is not allowed now")
+        self.moves.append(action)
+        hand = self.hands[self.current]
+        if(action == HIT):
+            hand.add(self.shoe.deal())
+            if(hand.isBust()):
+                self.advance()
+        elif(action == STAND):
+            self.advance()
+        elif(action == DOUBLE):
+            self.doubled = True
+            hand.add(self.shoe.deal())
+            self.advance()
+        elif(action == SURRENDER):
+            self.phase = DONE
+            self.outcome = Outcome(7.0)
+        else:
+            first = HandState(hand.cards[:1])
+            second = HandState(hand.cards[1:])
+            first.add(self.shoe.deal())
+            second.add(self.shoe.deal())
+            self.hands = [first, second]
+            self.blackjacks = [first.isBlackjack(), second.isBlackjack()]
+            if(self.blackjacks[0]):
+                self.advance()
+
+    # Moves on to the next hand that needs playing,
+    # finishing the round after the last one.
+    def advance(self):
+        self.current += 1
+        while(self.current < len(self.hands) and self.blackjacks[self.current]):
+            self.current += 1
+        if(self.current == len(self.hands)):
+            self.finish()
+
+    # Plays the dealer's hand and settles the round.
+    def finish(self):
+        if(not(all(self.blackjacks))):
+            drawDealer(self.dealer, self.shoe, self.rules)
+        self.settle()
+
+    # Settles the round against the dealer's hand as it stands.
+    def settle(self):
+        dealer = self.dealer
+        if(len(self.hands) == 1):
+            win = settleSingle(self.hands[0].total(), dealer.total(), self.doubled)
+        else:
+            win = settleSplit(self.hands[0].total(), self.hands[1].total(), dealer.total(),
+                              self.blackjacks[0], self.blackjacks[1])
+        self.current = len(self.hands) - 1
+        self.phase = DONE
+        self.outcome = Outcome(win)
+
+#
+# Abstraction - One seat's part in a round at a table of several
+#               seats. It plays just as a RoundState, except that
+#               its cards are dealt by the TableRound, the dealer's
+#               hand is shared with every other seat, and once its
+#               hands are finished it waits in the DEALER phase for
+#               the TableRound to play the dealer and settle it.
+#
+# Rep Invariants:
+#  those of RoundState, except that phase may be DEALER, in which
+#       case outcome is None and the seat takes no actions
+
+class SeatState(RoundState):
+    __slots__ = ()
+
+    # SeatState data type constructor. Settles the seat at
+    # once on a natural.
+    #
+    # PARAM shoe : the Shoe the table deals from.
+    # PARAM canDouble : whether the seat has enough money
+    #                   left to double down.
+    # PARAM rules : the Rules played by.
+    # PARAM cards : the seat's two opening card integers.
+    # PARAM dealer : the dealer's HandState, shared by the table.
+    def __init__(self, shoe, canDouble, rules, cards, dealer):
+        self.shoe = shoe
+        self.canDouble = canDouble
+        self.rules = rules
+        player = HandState(cards)
+        self.dealer = dealer
+        self.hands = [player]
+        self.blackjacks = [player.isBlackjack()]
+        self.current = 0
+        self.doubled = False
+        self.moves = []
+        self.phase = PLAYER
+        self.outcome = None
+        if(self.blackjacks[0]):
+            self.phase = DONE
+            self.outcome = Outcome(1.5)
+
+    # Lists the actions the seat may take next.
+    #
+    # RETURNS : a list of action strings, empty once
+    #           the seat's hands are finished.
+    def actions(self):
+        if(self.phase == DEALER):
+            return []
+        return RoundState.actions(self)
+
+    # Waits for the dealer, unless a pair of split naturals
+    # has already settled the seat.
+    def finish(self):
+        if(all(self.blackjacks)):
+            self.settle()
+        else:
+            self.current = len(self.hands) - 1
+            self.phase = DEALER
+
+#
+# Abstraction - One round at a table of up to MAX_SEATS seats,
+#               all dealt from the same shoe. Cards go out one to
+#               each seat in turn, then one to the dealer, then a
+#               second round the same way. Seats then play one after
+#               the other, and once the last is finished the dealer
+#               draws once for the whole table, unless no seat is
+#               left waiting on them, and every waiting seat is
+#               settled against the same dealer's hand.
+#
+#               With one seat, the cards and results are exactly
+#               those of a RoundState.
+#
+# Rep Invariants:
+#  1 <= len(seats) <= MAX_SEATS
+#  every seat shares dealer
+#  phase == PLAYER iff seats[current].phase == PLAYER
+#  phase == DONE iff every seat is DONE
+
+class TableRound():
+    __slots__ = ("shoe", "rules", "seats", "dealer", "current", "phase")
+
+    # TableRound data type constructor. Deals the opening
+    # cards, and settles every natural at once.
+    #
+    # PARAM shoe : the Shoe to deal from.
+    # PARAM canDoubles : a list with an entry for each seat,
+    #                    reading TRUE iff that seat has enough
+    #                    money left to double down.
+    # PARAM rules : the Rules played by.
+    def __init__(self, shoe, canDoubles, rules=HOUSE):
+        if(len(canDoubles) < 1 or len(canDoubles) > MAX_SEATS):
+            raise ValueError("a table seats from 1 to " + str(MAX_SEATS) + " players")
+        self.shoe = shoe
+        self.rules = rules
+        shoe.startRound()
+        firsts = [shoe.deal() for seat in canDoubles]
+        hole = shoe.deal()
+        seconds = [shoe.deal() for seat in canDoubles]
+        self.dealer = HandState([hole, shoe.deal()])
+        self.seats = [SeatState(shoe, canDoubles[i], rules, (firsts[i], seconds[i]), self.dealer)
+                      for i in range(len(canDoubles))]
+        self.current = 0
+        self.phase = PLAYER
+        self.advance()
+
+    # RETURNS : true iff every seat has been settled.
+    def isDone(self):
+        return self.phase == DONE
+
+    # RETURNS : the SeatState of the seat acting next.
+    def seat(self):
+        return self.seats[self.current]
+
+    # RETURNS : the dealer's visible card integer.
+    def upcard(self):
+        return self.dealer.cards[1]
+
+    # Lists the actions the seat in play may take next.
+    #
+    # RETURNS : a list of action strings, empty once
+    #           the round is done.
+    def actions(self):
+        if(self.phase == DONE):
+            return []
+        return self.seats[self.current].actions()
+
+    # Takes the next action of the seat in play, moving
+    # on to the next seat once it is finished.
+    #
+    # PARAM action : one of the strings from actions().
+    def act(self, action):
+        if(self.phase == DONE):
+            raise ValueError("action " + repr(action) + " is not allowed now")
+        seat = self.seats[self.current]
+        seat.act(action)
+        if(seat.phase != PLAYER):
+            self.advance()
+
+    # Moves on to the next seat that needs playing,
+    # finishing the round after the last one.
+    def advance(self):
+        while(self.current < len(self.seats) and self.seats[self.current].phase != PLAYER):
+            self.current += 1
+        if(self.current == len(self.seats)):
+            self.finish()
+
+    # Plays the dealer's hand once for the whole table
+    # and settles every seat waiting on it.
+    def finish(self):
+        waiting = [seat for seat in self.seats if seat.phase == DEALER]
+        if(waiting):
+            drawDealer(self.dealer, self.shoe, self.rules)
+        for seat in waiting:
+            seat.settle()
+        self.current = len(self.seats) - 1
+        self.phase = DONE
+
+    # RETURNS : a list of the Outcome of each seat, None
+    #           for seats not yet settled.
+    def outcomes(self):
+        return [seat.outcome for seat in self.seats]
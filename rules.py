@@ -0,0 +1,143 @@
+#
+# Abstraction - The rules a table plays by. HOUSE is the game as
+#               it has always been played here: the dealer draws
+#               to 18 and stands on a soft 18, one deck, a single
+#               split with no doubling afterwards, no surrender,
+#               and a natural credited at 1.5 times the bet.
+#
+#               A rule set is named by key(), a hash of its fields,
+#               so that anything worked out for it once can be
+#               stored under that name and found again.
+#
+#               Split hands are paid together by the split win
+#               conditions in the blackjack header, which only
+#               describe two undoubled hands. Doubling after a
+#               split and resplitting cannot be paid, so they are
+#               refused rather than played wrongly.
+#
+# Rep Invariants:
+#  12 <= standOn <= 21
+#  decks >= 1
+#  not(doubleAfterSplit)
+#  maxSplits is 0 or 1
+#  blackjackPays >= 0 and 2 * blackjackPays is a whole number
+#  drawTable[(hard << 1) | aces] reads TRUE iff the dealer
+#       draws to a hand of that hard total and ace flag
+#
+# Rules are shared, so they must never be modified.
+
+import hashlib
+
+from outcome import BLACKJACK, LOSE, OUTCOMES, PUSH, SURRENDER, WIN
+
+# Credit per unit of bet, in quarters, for each result of
+# a single hand, other than a natural.
+HAND_QUARTERS = {WIN : 8, PUSH : 4, LOSE : 0, SURRENDER : 2}
+
+# The field names of a rule set, in the order they are hashed.
+FIELDS = ("standOn", "hitSoft", "decks", "doubleAfterSplit", "maxSplits", "surrender", "blackjackPays")
+
+class Rules():
+    __slots__ = FIELDS + ("drawTable",)
+
+    # Rules data type constructor.
+    #
+    # PARAM standOn : the lowest total the dealer stands on.
+    # PARAM hitSoft : whether the dealer draws to a soft
+    #                 hand totalling exactly standOn.
+    # PARAM decks : the number of decks in the shoe.
+    # PARAM doubleAfterSplit : whether split hands may be
+    #                          doubled down.
+    # PARAM maxSplits : the number of times a hand may be
+    #                   split; 0 turns splitting off.
+    # PARAM surrender : whether the player may give up half
+    #                   their bet in place of their first move.
+    # PARAM blackjackPays : the credit per unit of bet for a
+    #                       natural, after the bet has been
+    #                       taken out, as in the header.
+    def __init__(self, standOn=18, hitSoft=False, decks=1, doubleAfterSplit=False, maxSplits=1,
+                 surrender=False, blackjackPays=1.5):
+        if(standOn < 12 or standOn > 21):
+            raise ValueError("the dealer must stand on a total from 12 to 21")
+        if(decks < 1):
+            raise ValueError("a shoe needs at least one deck")
+        if(doubleAfterSplit):
+            raise ValueError("doubling after a split is not supported by the split win conditions")
+        if(maxSplits not in (0, 1)):
+            raise ValueError("resplitting is not supported by the split win conditions")
+        if(blackjackPays < 0 or blackjackPays * 2 != int(blackjackPays * 2)):
+            raise ValueError("a natural must pay a whole multiple of half the bet")
+        self.standOn = standOn
+        self.hitSoft = bool(hitSoft)
+        self.decks = decks
+        self.doubleAfterSplit = bool(doubleAfterSplit)
+        self.maxSplits = maxSplits
+        self.surrender = bool(surrender)
+        self.blackjackPays = float(blackjackPays)
+        self.drawTable = tuple(self.dealerHits(index >> 1, bool(index & 1)) for index in range(64))
+
+    # Decides whether the dealer draws to a hand.
+    #
+    # PARAM hard : the hand's total, counting aces as 1.
+    # PARAM aces : TRUE iff the hand holds an ace.
+    #
+    # RETURNS : TRUE iff the dealer draws another card.
+    def dealerHits(self, hard, aces):
+        if(aces and hard <= 11):
+            return hard + 10 < self.standOn or (self.hitSoft and hard + 10 == self.standOn)
+        return hard < self.standOn
+
+    # RETURNS : a short hash naming this rule set, the same
+    #           for every equal rule set in every process.
+    def key(self):
+        text = ";".join(name + "=" + repr(getattr(self, name)) for name in FIELDS)
+        return hashlib.sha256(text.encode("ascii")).hexdigest()[:16]
+
+    # Gets the amount credited for each outcome under these
+    # rules. A natural is credited blackjackPays, and a pair
+    # of split hands the average of what each hand earns.
+    #
+    # RETURNS : a tuple of credits per unit of bet, in quarters,
+    #           indexed by Outcome.index, as in ledger.CREDITS.
+    def credits(self):
+        natural = int(self.blackjackPays * 4)
+        credits = []
+        for outcome in OUTCOMES:
+            if(outcome.blackjack):
+                quarters = [natural if hand == BLACKJACK else HAND_QUARTERS[hand] for hand in outcome.hands]
+                credits.append(sum(quarters) // len(quarters))
+            else:
+                credits.append(outcome.quarters)
+        return tuple(credits)
+
+    # RETURNS : a dictionary mapping each win condition to
+    #           its credit per unit of bet, as in
+    #           blackjack.PAYOUTS.
+    def payouts(self):
+        credits = self.credits()
+        return {outcome.code : credits[outcome.index] / 4 for outcome in OUTCOMES}
+
+    # Describes the rule set in text.
+    #
+    # RETURNS : A list of lines.
+    def summary(self):
+        lines = ["Dealer stands on " + str(self.standOn)]
+        if(self.hitSoft):
+            lines[0] += ", hitting a soft " + str(self.standOn)
+        lines.append("Decks: " + str(self.decks))
+        lines.append("Splits: " + str(self.maxSplits))
+        lines.append("Surrender: " + ("yes" if self.surrender else "no"))
+        lines.append("A natural credits {:g} times the bet".format(self.blackjackPays))
+        return lines
+
+    def __eq__(self, other):
+        return isinstance(other, Rules) and all(getattr(self, name) == getattr(other, name) for name in FIELDS)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in FIELDS))
+
+    def __repr__(self):
+        return "Rules(" + ", ".join(name + "=" + repr(getattr(self, name)) for name in FIELDS) + ")"
+
+# The rules of the game as played by blackjack.playRound.
+HOUSE = Rules()
@@ -0,0 +1,272 @@
+#################################################
+#             Blackjack Game Server             #
+#################################################
+#
+# Hosts one Table per connection on a plain TCP
+# socket, all from a single asyncio event loop.
+# Tables left idle are packed away with snapshot.py
+# until the player comes back, and every settled
+# round can be kept in a hand history (history.py):
+#
+#      python cli.py serve [--port 8021]
+#
+# The protocol is one line of text per message.
+# Cards are card integers following the blackjack
+# header conventions, and money is in dollars.
+#
+# The player sends:
+#  BET <amount>   : places a bet and deals a round.
+#  H, S, D, SP or SU
+#                 : hits, stands, doubles down, splits or
+#                   surrenders, where the rules allow it.
+#  BALANCE        : asks for the balance.
+#  QUIT           : leaves the table.
+#
+# The server sends:
+#  BALANCE <amount>
+#  SHUFFLE
+#      : the shoe was shuffled before this round.
+#  TURN <hand> <cards> <total> <upcard> <actions>
+#      : the player is to act on hand 0 or 1, holding
+#        the comma separated cards; actions lists the
+#        moves allowed, comma separated.
+#  SETTLE <win> <hands> <dealer> <credit> <balance>
+#      : the round is over. win follows the blackjack
+#        header conventions, hands holds the cards of
+#        each hand separated by "/", and credit is what
+#        the bet paid back.
+#  ERROR <message>
+#  BYE
+#      : the player is broke or has left, and the
+#        connection is closed.
+
+import asyncio
+import itertools
+import time
+
+from history import HistoryWriter
+from ledger import formatCents, toCents
+from rules import HOUSE
+from snapshot import restore, snapshot
+from table import Table
+
+COMMANDS = {"H" : "h", "S" : "s", "D" : "d", "SP" : "sp", "SU" : "su"}
+
+# Formats a list of card integers for the protocol.
+#
+# PARAM cards : A list of card integers.
+#
+# RETURNS : The cards, comma separated.
+def formatCards(cards):
+    return ",".join(map(str, cards))
+
+# Describes where the table's round stands: whose
+# turn it is, or how it was settled.
+#
+# PARAM table : The Table.
+#
+# RETURNS : A line of the protocol.
+def describe(table):
+    state = table.round
+    if(state.isDone()):
+        return " ".join(["SETTLE", str(state.outcome.code),
+                         "/".join(formatCards(hand.cards) for hand in state.hands),
+                         formatCards(state.dealer.cards),
+                         formatCents(table.credit), formatCents(table.ledger.balance)])
+    hand = state.hand()
+    return " ".join(["TURN", str(state.current), formatCards(hand.cards), str(hand.total()),
+                     str(state.upcard()), ",".join(state.actions())])
+
+# Handles one line sent by the player.
+#
+# PARAM table : The player's Table.
+# PARAM line : The line sent, without its newline.
+#
+# RETURNS : The reply lines, and TRUE iff the connection
+#           should be closed afterwards.
+def handleLine(table, line):
+    words = line.split()
+    if(not(words)):
+        return ["ERROR empty command"], False
+    command = words[0].upper()
+    try:
+        if(command in COMMANDS and len(words) == 1):
+            table.act(COMMANDS[command])
+            replies = [describe(table)]
+        elif(command == "BET" and len(words) == 2):
+            replies = []
+            if(table.start(toCents(float(words[1])))):
+                replies.append("SHUFFLE")
+            replies.append(describe(table))
+        elif(command == "BALANCE" and len(words) == 1):
+            return ["BALANCE " + formatCents(table.ledger.balance)], False
+        elif(command == "QUIT"):
+            return ["BYE"], True
+        else:
+            return ["ERROR unknown command " + words[0]], False
+    except (ValueError, OverflowError) as error:
+        return ["ERROR " + str(error)], False
+    if(table.isBroke()):
+        replies.append("BYE")
+        return replies, True
+    return replies, False
+
+# Lines longer than this are refused, and the
+# connection closed.
+MAX_LINE = 1024
+
+#
+# Abstraction - One connected player's Table. Lines are handled
+#               as soon as they arrive, straight from the event
+#               loop's callbacks, and every reply to a batch of
+#               lines goes out in a single write. A table left
+#               idle is packed into a snapshot until the player
+#               next sends something.
+#
+# Rep Invariants:
+#  exactly one of table and frozen is None
+#  buffer holds the unfinished last line sent, with no newline
+#  len(buffer) <= MAX_LINE
+#  self in connections while connected
+
+class TableProtocol(asyncio.Protocol):
+    __slots__ = ("table", "frozen", "history", "rules", "buffer", "transport", "lastActive", "connections")
+
+    # TableProtocol data type constructor.
+    #
+    # PARAM balance : the money the player starts with, in cents.
+    # PARAM decks : the number of decks in the table's shoe.
+    # PARAM connections : the set of every connected TableProtocol.
+    # PARAM tableId : the id of the table in the hand history.
+    # PARAM history : an optional HistoryWriter for settled rounds.
+    # PARAM rules : the Rules the table plays by.
+    def __init__(self, balance, decks, connections, tableId=0, history=None, rules=HOUSE):
+        self.table = Table(balance, decks, tableId=tableId, history=history, rules=rules)
+        self.frozen = None
+        self.history = history
+        self.rules = rules
+        self.buffer = b""
+        self.transport = None
+        self.lastActive = time.monotonic()
+        self.connections = connections
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.connections.add(self)
+        transport.write(("BALANCE " + formatCents(self.table.ledger.balance) + "\n").encode())
+
+    def connection_lost(self, error):
+        self.connections.discard(self)
+
+    def data_received(self, data):
+        lines = (self.buffer + data).split(b"\n")
+        self.buffer = lines.pop()
+        self.lastActive = time.monotonic()
+        table = self.table
+        if(table is None):
+            table = self.table = restore(self.frozen, None, self.history, self.rules)
+            self.frozen = None
+        replies = []
+        closing = len(self.buffer) > MAX_LINE
+        for line in lines:
+            if(closing):
+                break
+            if(len(line) > MAX_LINE):
+                replies.append("ERROR line too long")
+                closing = True
+            else:
+                more, closing = handleLine(table, line.decode("ascii", "replace").strip())
+                replies.extend(more)
+        if(replies):
+            self.transport.write(("\n".join(replies) + "\n").encode())
+        if(closing):
+            self.transport.close()
+
+    # A player that stops reading their replies is not
+    # read from either, until they catch up.
+    def pause_writing(self):
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    # Packs the table away into a snapshot.
+    def suspend(self):
+        if(self.table is not None):
+            self.frozen = snapshot(self.table)
+            self.table = None
+
+# Suspends the tables of every player that has been
+# idle for too long, checking every so often.
+#
+# PARAM connections : The set of every connected TableProtocol.
+# PARAM idle : The seconds a table may sit idle before
+#              it is suspended.
+async def suspendIdle(connections, idle):
+    while(True):
+        await asyncio.sleep(idle / 2)
+        cutoff = time.monotonic() - idle
+        for connection in connections:
+            if(connection.lastActive < cutoff):
+                connection.suspend()
+
+# Flushes the hand history every so often, so that
+# rounds are written out even when play is slow.
+#
+# PARAM history : The HistoryWriter.
+async def flushHistory(history):
+    while(True):
+        await asyncio.sleep(history.flushInterval)
+        history.flush()
+
+# Lets this process hold as many connections as the
+# system allows it to, rather than the usual default.
+def raiseConnectionLimit():
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if(soft < hard):
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+# Runs the server until it is stopped.
+#
+# PARAM host : The address to listen on.
+# PARAM port : The port to listen on.
+# PARAM wallet : The money each player starts with, in dollars.
+# PARAM decks : The number of decks in each table's shoe.
+#               Defaults to the decks of the rules.
+# PARAM idle : The seconds a table may sit idle before
+#              it is packed into a snapshot.
+# PARAM historyPath : An optional path of a hand history
+#                     log every settled round is added to.
+# PARAM rules : The Rules every table plays by.
+async def serve(host="127.0.0.1", port=8021, wallet=5.00, decks=None, idle=30.0, historyPath=None, rules=HOUSE):
+    raiseConnectionLimit()
+    balance = toCents(wallet)
+    connections = set()
+    tableIds = itertools.count()
+    history = None
+    tasks = []
+    if(historyPath is not None):
+        history = HistoryWriter(historyPath)
+        tasks.append(asyncio.ensure_future(flushHistory(history)))
+
+    def connected():
+        return TableProtocol(balance, decks, connections, next(tableIds), history, rules)
+
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(connected, host, port, backlog=4096)
+    tasks.append(asyncio.ensure_future(suspendIdle(connections, idle)))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        for task in tasks:
+            task.cancel()
+        if(history is not None):
+            history.close()
@@ -0,0 +1,103 @@
+#
+# Abstraction - A dealing shoe holding one or more shuffled
+#               decks of cards. Cards are integers following
+#               the blackjack header conventions (0 to 51).
+#               Cards are dealt in order from a pre-shuffled
+#               list, and the shoe is due for a reshuffle once
+#               the cut card has been reached. The cards dealt
+#               before roundStart are discards, and the cards from
+#               roundStart up to position are in play.
+#
+# Rep Invariants:
+#  1 <= decks
+#  len(cards) == 52 * decks
+#  0 <= roundStart <= position <= len(cards)
+#  0 < cutCard <= len(cards)
+
+import random
+
+class Shoe():
+    __slots__ = ("decks", "cards", "position", "roundStart", "cutCard", "rng")
+
+    # Shoe data type constructor. The shoe is shuffled
+    # and ready to deal once constructed.
+    #
+    # PARAM decks : the number of 52 card decks in the shoe.
+    # PARAM penetration : the fraction of the shoe dealt
+    #                     before the cut card is reached.
+    #                     0 < penetration <= 1.
+    # PARAM rng : the random number generator used to
+    #             shuffle. Defaults to the random module.
+    def __init__(self, decks=1, penetration=0.75, rng=None):
+        if(decks < 1):
+            raise ValueError("a shoe needs at least one deck")
+        if(penetration <= 0 or penetration > 1):
+            raise ValueError("penetration must be within (0, 1]")
+        if(rng is None):
+            rng = random
+        self.decks = decks
+        self.cards = list(range(52)) * decks
+        self.cutCard = max(1, int(len(self.cards) * penetration))
+        self.rng = rng
+        self.shuffle()
+
+    # Gathers every card back into the shoe and shuffles it.
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+        self.position = 0
+        self.roundStart = 0
+
+    # Marks the start of a new round, making every card
+    # dealt so far a discard.
+    def startRound(self):
+        self.roundStart = self.position
+
+    # Shuffles the discards and puts them back in the shoe
+    # to be dealt, leaving the cards in play out of it.
+    def reshuffleDiscards(self):
+        if(self.roundStart == 0):
+            raise ValueError("the shoe ran out of cards with no discards to reshuffle")
+        discards = self.cards[:self.roundStart]
+        self.rng.shuffle(discards)
+        inPlay = self.cards[self.roundStart:self.position]
+        self.cards = inPlay + discards + self.cards[self.position:]
+        self.position = len(inPlay)
+        self.roundStart = 0
+
+    # Deals the next card from the shoe. Should the shoe
+    # run out of cards mid-round, the discards are
+    # reshuffled first, so no card in play is dealt twice.
+    #
+    # RETURNS : an integer representing a card
+    #           following header conventions.
+    def deal(self):
+        if(self.position == len(self.cards)):
+            self.reshuffleDiscards()
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+
+    # RETURNS : true iff the cut card has been reached,
+    #           and the shoe should be shuffled before
+    #           the next round.
+    def needsShuffle(self):
+        return self.position >= self.cutCard
+
+    # RETURNS : the number of cards dealt since the last shuffle.
+    def dealt(self):
+        return self.position
+
+    # RETURNS : the number of cards left in the shoe.
+    def remaining(self):
+        return len(self.cards) - self.position
+
+    # Gets how many cards of each point value are left,
+    # in the form used by the dealer and solver modules.
+    #
+    # RETURNS : a tuple of ten counts, Aces first, then
+    #           2 through 9, then all ten point cards.
+    def composition(self):
+        counts = [0] * 10
+        for card in self.cards[self.position:]:
+            counts[min(card // 4, 9)] += 1
+        return tuple(counts)
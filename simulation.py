@@ -0,0 +1,409 @@
+#################################################
+#            Blackjack Simulation               #
+#################################################
+#
+# Plays rounds of Blackjack without any input()
+# or print() calls, following the same rules as
+# blackjack.playRound: the dealer hits below 18,
+# the player may double down on their first two
+# cards, split a pair, and win states follow the
+# conventions outlined in the blackjack header.
+#
+# Decisions are made by a policy, which is any
+# function of the form:
+#
+#      policy(total, soft, upcard, canDouble, canSplit)
+#
+# where total is the player's current point total,
+# soft reads TRUE iff an ace is being counted as 11,
+# upcard is the point value of the dealer's visible
+# card (1 for an Ace), and canDouble/canSplit say
+# which moves are available. A policy returns one of
+# the same strings accepted by playRound:
+# "h", "s", "d" or "sp", or "su" to surrender its
+# first move where the rules allow it.
+# A move that is not available is taken as a hit,
+# just as the interactive game takes it.
+#
+# The house rules are played unless a Rules object
+# from rules.py is given.
+#
+# Shoes are shuffled by the random module's Mersenne
+# Twister unless another generator is named from
+# GENERATORS. The others draw from NumPy in batches,
+# through batchrng.py, and are much cheaper per shuffle.
+
+import random
+
+import blackjack
+import counting
+import roundstate
+from outcome import OUTCOMES
+from rules import HOUSE
+from shoe import Shoe
+
+# Point value of every card integer, following
+# header conventions.
+POINTS = [min(int(card / 4) + 1, 10) for card in range(52)]
+
+# The random number generators a simulation can shuffle
+# with, by name. Every one but "mt" needs NumPy.
+GENERATORS = ("mt", "pcg64", "philox")
+
+# Builds a seeded random number generator.
+#
+# PARAM seed : An optional seed, for reproducible runs.
+# PARAM generator : The name of the generator, one of
+#                   GENERATORS.
+#
+# RETURNS : An object with the methods of random.Random
+#           a Shoe uses.
+def makeRandom(seed=None, generator="mt"):
+    if(generator == "mt"):
+        return random.Random(seed)
+    if(generator not in GENERATORS):
+        raise ValueError("unknown random number generator: " + str(generator))
+    import batchrng
+    return batchrng.BatchRandom(seed, generator)
+
+# A policy that plays the player's hand the same
+# way the dealer plays theirs.
+def mimicDealerPolicy(total, soft, upcard, canDouble, canSplit):
+    if(total < 18):
+        return "h"
+    return "s"
+
+# A simple fixed strategy: split aces and eights,
+# double on 10 or 11 against a weak upcard, and
+# otherwise hit until reaching a total the dealer
+# must beat.
+def basicPolicy(total, soft, upcard, canDouble, canSplit):
+    if(canSplit and (soft or total == 16)):
+        return "sp"
+    if(canDouble and not(soft) and (total == 11 or (total == 10 and upcard != 1 and upcard < 10))):
+        return "d"
+    if(soft):
+        if(total < 18):
+            return "h"
+        return "s"
+    if(total < 12):
+        return "h"
+    if(total < 17 and (upcard == 1 or upcard >= 7)):
+        return "h"
+    return "s"
+
+# Hits a hand until the policy stands or the hand busts.
+#
+# PARAM total : The hard point total of the hand.
+# PARAM aces : A boolean that reads TRUE iff the hand holds an ace.
+# PARAM upcard : The point value of the dealer's visible card.
+# PARAM policy : The decision policy.
+# PARAM draw : A function returning the next card integer.
+#
+# RETURNS : The final point total of the hand.
+def playHand(total, aces, upcard, policy, draw):
+    while(True):
+        soft = aces and total <= 11
+        if(soft):
+            if(policy(total + 10, True, upcard, False, False) == "s"):
+                return total + 10
+        elif(policy(total, False, upcard, False, False) == "s"):
+            return total
+        card = draw()
+        total += POINTS[card]
+        if(card < 4):
+            aces = True
+        if(total > 21):
+            return total
+
+# Draws cards for the dealer until the rules say
+# to stand.
+#
+# PARAM total : The hard point total of the dealer's hand.
+# PARAM aces : A boolean that reads TRUE iff the hand holds an ace.
+# PARAM draw : A function returning the next card integer.
+# PARAM hits : The Rules.drawTable of the rules played.
+#
+# RETURNS : The final point total of the dealer's hand.
+def playDealer(total, aces, draw, hits=HOUSE.drawTable):
+    while(hits[(total << 1) | aces]):
+        card = draw()
+        total += POINTS[card]
+        if(card < 4):
+            aces = True
+    if(aces and total <= 11):
+        return total + 10
+    return total
+
+# Plays one seat's hand, up to the point where it
+# waits on the dealer.
+#
+# PARAM player1 : The seat's first card integer.
+# PARAM player2 : The seat's second card integer.
+# PARAM upcard : The point value of the dealer's visible card.
+# PARAM policy : The decision policy for the seat.
+# PARAM canDouble : Whether the seat has sufficient
+#                   money to double down on their bet.
+# PARAM draw : A function returning the next card integer.
+# PARAM rules : The Rules played by.
+#
+# RETURNS : The win state as a float when the seat is settled
+#           without the dealer, or else a tuple to settle once
+#           the dealer is done: (total, doubled) for a single
+#           hand, or (total1, total2, blackjack1, blackjack2)
+#           for a pair of split hands.
+def playSeat(player1, player2, upcard, policy, canDouble, draw, rules=HOUSE):
+    total = POINTS[player1] + POINTS[player2]
+    aces = player1 < 4 or player2 < 4
+    soft = aces and total <= 11
+    if(soft and total == 11):
+        return 1.5
+
+    canSplit = int(player1 / 4) == int(player2 / 4) and rules.maxSplits > 0
+    if(soft):
+        action = policy(total + 10, True, upcard, canDouble, canSplit)
+    else:
+        action = policy(total, False, upcard, canDouble, canSplit)
+    if(action == "su" and rules.surrender):
+        return 7.0
+    if((action == "sp" and not(canSplit)) or (action == "d" and not(canDouble))):
+        action = "h"
+
+    if(action == "sp"):
+        card = draw()
+        total1 = POINTS[player1] + POINTS[card]
+        aces1 = player1 < 4 or card < 4
+        card = draw()
+        total2 = POINTS[player2] + POINTS[card]
+        aces2 = player2 < 4 or card < 4
+
+        blackjack1 = aces1 and total1 == 11
+        if(blackjack1):
+            total1 = 21
+        else:
+            total1 = playHand(total1, aces1, upcard, policy, draw)
+        blackjack2 = aces2 and total2 == 11
+        if(blackjack2):
+            total2 = 21
+        else:
+            total2 = playHand(total2, aces2, upcard, policy, draw)
+
+        if(blackjack1 and blackjack2):
+            return 4.0
+        return (total1, total2, blackjack1, blackjack2)
+
+    if(action == "d"):
+        card = draw()
+        total += POINTS[card]
+        if(card < 4 or aces):
+            if(total <= 11):
+                total += 10
+        return (total, True)
+
+    if(action != "s"):
+        card = draw()
+        total += POINTS[card]
+        if(card < 4):
+            aces = True
+        if(total <= 21):
+            total = playHand(total, aces, upcard, policy, draw)
+    elif(soft):
+        total += 10
+    return (total, False)
+
+# Settles a seat left waiting on the dealer.
+#
+# PARAM hands : The tuple returned by playSeat.
+# PARAM dealerTotal : The final point total of the dealer's hand.
+#
+# RETURNS : A float representing the win state
+#           of the seat, following header conventions.
+def settleSeat(hands, dealerTotal):
+    if(len(hands) == 2):
+        return roundstate.settleSingle(hands[0], dealerTotal, hands[1])
+    return roundstate.settleSplit(hands[0], hands[1], dealerTotal, hands[2], hands[3])
+
+# Plays a round of Blackjack without any user interaction.
+#
+# PARAM policy : The decision policy for the player.
+# PARAM canDouble : Whether the player has sufficient
+#                   money to double down on their bet.
+# PARAM draw : A function returning the next card integer.
+# PARAM rules : The Rules played by.
+#
+# RETURNS : A float representing the win state
+#           of the round, following header conventions.
+def playHeadlessRound(policy, canDouble, draw, rules=HOUSE):
+    player1 = draw()
+    dealer1 = draw()
+    player2 = draw()
+    dealer2 = draw()
+
+    upcard = POINTS[dealer2]
+    hands = playSeat(player1, player2, upcard, policy, canDouble, draw, rules)
+    if(hands.__class__ is float):
+        return hands
+    dealerTotal = playDealer(POINTS[dealer1] + upcard, dealer1 < 4 or dealer2 < 4, draw, rules.drawTable)
+    return settleSeat(hands, dealerTotal)
+
+# Plays a round at a table of several seats without
+# any user interaction, dealt and played in the order
+# of roundstate.TableRound. The dealer draws once for
+# every seat, so each seat past the first costs little
+# more than playing its own hand.
+#
+# PARAM policies : A list of the decision policy of each seat.
+# PARAM canDoubles : A list reading TRUE for each seat with
+#                    sufficient money to double down.
+# PARAM draw : A function returning the next card integer.
+# PARAM rules : The Rules played by.
+#
+# RETURNS : A list of the win state of each seat, following
+#           header conventions.
+def playHeadlessTable(policies, canDoubles, draw, rules=HOUSE):
+    firsts = [draw() for policy in policies]
+    dealer1 = draw()
+    seconds = [draw() for policy in policies]
+    dealer2 = draw()
+
+    upcard = POINTS[dealer2]
+    results = [playSeat(firsts[i], seconds[i], upcard, policies[i], canDoubles[i], draw, rules)
+               for i in range(len(policies))]
+    waiting = [i for i in range(len(results)) if results[i].__class__ is not float]
+    if(waiting):
+        dealerTotal = playDealer(POINTS[dealer1] + upcard, dealer1 < 4 or dealer2 < 4, draw, rules.drawTable)
+        for i in waiting:
+            results[i] = settleSeat(results[i], dealerTotal)
+    return results
+
+# Plays many rounds of Blackjack back to back from
+# a single shoe, and tallies the results.
+#
+# PARAM rounds : The number of rounds to play.
+# PARAM policy : The decision policy for the player.
+# PARAM seed : An optional seed for the random number
+#              generator, for reproducible runs.
+# PARAM canDouble : Whether the player may double down.
+# PARAM decks : The number of decks in the shoe.
+# PARAM penetration : The fraction of the shoe dealt
+#                     before it is reshuffled.
+# PARAM rules : The Rules played by.
+# PARAM generator : The random number generator shuffled
+#                   with, one of GENERATORS.
+# PARAM seats : The number of seats at the table, every
+#               one played by the policy.
+#
+# RETURNS : A dictionary mapping each win state to the
+#           number of hands that ended in it, one hand per
+#           seat per round.
+def simulate(rounds, policy=basicPolicy, seed=None, canDouble=True, decks=1, penetration=0.75, rules=HOUSE,
+             generator="mt", seats=1):
+    shoe = Shoe(decks, penetration, makeRandom(seed, generator))
+    draw = shoe.deal
+    counts = dict.fromkeys(blackjack.PAYOUTS, 0)
+    if(seats == 1):
+        play = playHeadlessRound
+        for i in range(rounds):
+            if(shoe.needsShuffle()):
+                shoe.shuffle()
+            shoe.startRound()
+            counts[play(policy, canDouble, draw, rules)] += 1
+        return counts
+    policies = [policy] * seats
+    canDoubles = [canDouble] * seats
+    play = playHeadlessTable
+    for i in range(rounds):
+        if(shoe.needsShuffle()):
+            shoe.shuffle()
+        shoe.startRound()
+        for win in play(policies, canDoubles, draw, rules):
+            counts[win] += 1
+    return counts
+
+# Plays rounds back to back from a single shoe as
+# they are asked for, keeping none of them. Feeds
+# the pipeline of onlinestats.py.
+#
+# PARAM rounds : The number of rounds to play, or None
+#                to play for as long as rounds are asked for.
+# PARAM policy, seed, canDouble, decks, penetration,
+#       rules, generator, seats : As passed to simulate.
+#
+# YIELDS : The win state of each round, or at a table of
+#          several seats, of each seat in turn.
+def playRounds(rounds=None, policy=basicPolicy, seed=None, canDouble=True, decks=1, penetration=0.75,
+               rules=HOUSE, generator="mt", seats=1):
+    shoe = Shoe(decks, penetration, makeRandom(seed, generator))
+    draw = shoe.deal
+    policies = [policy] * seats
+    canDoubles = [canDouble] * seats
+    played = 0
+    while(rounds is None or played < rounds):
+        if(shoe.needsShuffle()):
+            shoe.shuffle()
+        shoe.startRound()
+        if(seats == 1):
+            yield playHeadlessRound(policy, canDouble, draw, rules)
+        else:
+            yield from playHeadlessTable(policies, canDoubles, draw, rules)
+        played += 1
+
+# Plays many rounds back to back from a single shoe
+# while counting cards, sizing each bet from the true
+# count before the round is dealt.
+#
+# PARAM rounds : The number of rounds to play.
+# PARAM policy : The decision policy for the player.
+# PARAM betting : The bet sizing policy, as described in
+#                 counting.py.
+# PARAM tags : The tag table of the counting system.
+# PARAM seed : An optional seed for the random number
+#              generator, for reproducible runs.
+# PARAM canDouble : Whether the player may double down.
+# PARAM decks : The number of decks in the shoe.
+# PARAM penetration : The fraction of the shoe dealt
+#                     before it is reshuffled.
+# PARAM rules : The Rules played by.
+# PARAM generator : The random number generator shuffled
+#                   with, one of GENERATORS.
+#
+# RETURNS : A dictionary mapping each win state to the
+#           number of rounds that ended in it, the total
+#           units wagered, and the net units won.
+def simulateCounting(rounds, policy=basicPolicy, betting=counting.rampBetting, tags=counting.HI_LO,
+                     seed=None, canDouble=True, decks=1, penetration=0.75, rules=HOUSE, generator="mt"):
+    shoe = counting.CountingShoe(decks, penetration, makeRandom(seed, generator), tags)
+    counter = shoe.counter
+    draw = shoe.deal
+    counts = dict.fromkeys(blackjack.PAYOUTS, 0)
+    credits = rules.credits()
+    quarters = {outcome.code : credits[outcome.index] - 4 for outcome in OUTCOMES}
+    play = playHeadlessRound
+    wagered = 0
+    net = 0
+    for i in range(rounds):
+        if(shoe.needsShuffle()):
+            shoe.shuffle()
+        shoe.startRound()
+        bet = betting(counter.trueCount())
+        win = play(policy, canDouble, draw, rules)
+        counts[win] += 1
+        wagered += bet
+        net += bet * quarters[win]
+    return counts, wagered, net / 4
+
+# Gets the net number of bet units won or lost
+# over a set of tallied results.
+#
+# PARAM counts : A dictionary mapping win states
+#                to the number of rounds that
+#                ended in them.
+# PARAM rules : The Rules the rounds were paid by.
+#
+# RETURNS : The net units won, negative when lost.
+def netUnits(counts, rules=HOUSE):
+    payouts = rules.payouts()
+    net = 0.0
+    for win in counts:
+        net += counts[win] * (payouts[win] - 1.0)
+    return net
@@ -0,0 +1,166 @@
+#################################################
+#          Blackjack Table Snapshots            #
+#################################################
+#
+# Packs a Table, along with any round in play, into
+# a few bytes so that an idle table can be set aside
+# and brought back on the player's next action. Every
+# card takes a single byte.
+#
+# A snapshot is laid out as:
+#
+#  HEADER : version, table id, decks, shoe position,
+#           cut card, phase, flags, hand in play, outcome
+#           index, balance, wagered, bet, credit and rounds
+#  TALLY  : the Ledger's count of each outcome
+#  shoe   : the cards in the shoe, in order
+#  round  : the dealer's cards, then the number of
+#           hands and the cards of each, then the moves
+#           made, each list led by its length. Left out
+#           when no round has been dealt.
+#
+# The shoe's random number generator, the table's
+# hand history and its Rules are not kept; a restored
+# table uses the ones it is given.
+
+import random
+import struct
+
+from hand import HandState
+from ledger import Ledger
+from outcome import OUTCOMES
+from roundstate import DONE, MOVE_CODES, MOVES, PLAYER, RoundState
+from rules import HOUSE
+from shoe import Shoe
+from table import Table
+
+VERSION = 3
+
+HEADER = struct.Struct("<BIHHHBBBBqqqqI")
+TALLY = struct.Struct("<" + str(len(OUTCOMES)) + "I")
+
+# Phases of the round, as stored in a snapshot.
+NO_ROUND = 0
+PHASES = {PLAYER : 1, DONE : 2}
+
+# Flags of the round, as stored in a snapshot.
+CAN_DOUBLE = 1
+DOUBLED = 2
+BLACKJACK = 4
+NO_OUTCOME = 255
+
+# Packs a table into a snapshot.
+#
+# PARAM table : The Table to pack.
+#
+# RETURNS : The snapshot, as bytes.
+def snapshot(table):
+    shoe = table.shoe
+    ledger = table.ledger
+    state = table.round
+    phase = NO_ROUND
+    flags = 0
+    current = 0
+    outcome = NO_OUTCOME
+    cards = b""
+    if(state is not None):
+        phase = PHASES[state.phase]
+        if(state.canDouble):
+            flags |= CAN_DOUBLE
+        if(state.doubled):
+            flags |= DOUBLED
+        for i in range(len(state.blackjacks)):
+            if(state.blackjacks[i]):
+                flags |= BLACKJACK << i
+        current = state.current
+        if(state.outcome is not None):
+            outcome = state.outcome.index
+        parts = [bytes((state.dealer.count,)), bytes(state.dealer.cards), bytes((len(state.hands),))]
+        for hand in state.hands:
+            parts.append(bytes((hand.count,)))
+            parts.append(bytes(hand.cards))
+        parts.append(bytes((len(state.moves),)))
+        parts.append(bytes(MOVE_CODES[move] for move in state.moves))
+        cards = b"".join(parts)
+    return b"".join([
+        HEADER.pack(VERSION, table.tableId, shoe.decks, shoe.position, shoe.cutCard, phase, flags, current, outcome,
+                    ledger.balance, ledger.wagered, table.bet, table.credit, ledger.rounds),
+        TALLY.pack(*ledger.tally),
+        bytes(shoe.cards),
+        cards,
+    ])
+
+# Unpacks a table from a snapshot.
+#
+# PARAM data : A snapshot from snapshot().
+# PARAM rng : The random number generator the shoe
+#             shuffles with. Defaults to the random module.
+# PARAM history : An optional HistoryWriter the table
+#                 writes its settled rounds to.
+# PARAM rules : The Rules the table was playing by.
+#
+# RETURNS : A Table in the same state as the one packed.
+def restore(data, rng=None, history=None, rules=HOUSE):
+    (version, tableId, decks, position, cutCard, phase, flags, current, outcome,
+     balance, wagered, bet, credit, rounds) = HEADER.unpack_from(data)
+    if(version != VERSION):
+        raise ValueError("unknown snapshot version " + str(version))
+    offset = HEADER.size
+
+    ledger = Ledger(balance, rules.credits())
+    ledger.wagered = wagered
+    ledger.rounds = rounds
+    ledger.tally = list(TALLY.unpack_from(data, offset))
+    offset += TALLY.size
+
+    shoe = object.__new__(Shoe)
+    if(rng is None):
+        rng = random
+    shoe.decks = decks
+    shoe.cards = list(data[offset:offset + 52 * decks])
+    shoe.position = position
+    shoe.roundStart = position
+    shoe.cutCard = cutCard
+    shoe.rng = rng
+    offset += 52 * decks
+
+    table = object.__new__(Table)
+    table.shoe = shoe
+    table.ledger = ledger
+    table.rules = rules
+    table.bet = bet
+    table.credit = credit
+    table.tableId = tableId
+    table.history = history
+    table.round = None
+    if(phase == NO_ROUND):
+        return table
+
+    state = object.__new__(RoundState)
+    state.shoe = shoe
+    state.canDouble = bool(flags & CAN_DOUBLE)
+    state.rules = rules
+    state.doubled = bool(flags & DOUBLED)
+    state.current = current
+    state.phase = DONE
+    state.outcome = None
+    if(phase == PHASES[PLAYER]):
+        state.phase = PLAYER
+    if(outcome != NO_OUTCOME):
+        state.outcome = OUTCOMES[outcome]
+    count = data[offset]
+    state.dealer = HandState(data[offset + 1:offset + 1 + count])
+    offset += 1 + count
+    state.hands = []
+    for i in range(data[offset]):
+        offset += 1
+        count = data[offset]
+        state.hands.append(HandState(data[offset + 1:offset + 1 + count]))
+        offset += count
+    offset += 1
+    count = data[offset]
+    state.moves = [MOVES[code] for code in data[offset + 1:offset + 1 + count]]
+    state.blackjacks = [bool(flags & (BLACKJACK << i)) for i in range(len(state.hands))]
+    shoe.roundStart -= state.dealer.count + sum(hand.count for hand in state.hands)
+    table.round = state
+    return table
@@ -0,0 +1,403 @@
+#################################################
+#           Blackjack Strategy Solver           #
+#################################################
+#
+# Computes the expected value of hitting, standing,
+# doubling down and splitting under the rules played
+# by blackjack.playRound: the dealer draws until
+# reaching 18, ties go to the player, a natural pays
+# the blackjack rate no matter what the dealer holds,
+# and split hands are paid together using the split
+# win states. A Rules object from rules.py changes
+# when the dealer stands, what a natural pays, and
+# whether splitting and surrender are offered.
+#
+# Expected values are in units of the original bet,
+# net of the bet itself. The shoe is described by a
+# composition: ten counts holding how many cards of
+# each point value (Ace first, then 2 through 10) are
+# left. Hitting, standing and doubling are solved
+# exactly, with every card drawn removed from the
+# composition. Results are memoized on the hand's
+# state and the composition it was reached from, so
+# each hand is only ever solved once. The dealer's
+# odds come from the dealer module, in batches covering
+# every composition the player could stand on.
+#
+# Split hands depend on each other through the split
+# win states, which makes an exact solution far too
+# large to search. Instead each split hand is played
+# with the best single hand choice between hitting and
+# standing, and both hands and the dealer draw from the
+# composition left once the pair and upcard are out.
+
+import numpy as np
+
+import roundstate
+from dealer import FIELD, cacheFor, fullComposition, handTotal, packComposition
+from rules import HOUSE
+
+# Amount a packed composition drops by when a card of
+# each point value is taken out, indexed by point value.
+SHIFTS = [0] + [1 << (FIELD * i) for i in range(10)]
+
+# Gets the value of standing on each total against a
+# dealer with the given odds.
+#
+# PARAM odds : The probabilities that the dealer finishes
+#              on each total from the one they stand on
+#              through 21, or busts, as from the dealer
+#              module.
+#
+# RETURNS : A list holding the expected value of standing
+#           on each total from 0 to 21.
+def standValues(odds):
+    win = odds[-1]
+    values = [2.0 * win - 1.0] * (23 - len(odds))
+    for i in range(len(odds) - 1):
+        win += odds[i]
+        values.append(2.0 * win - 1.0)
+    return values
+
+# Lists every set of cards a player can hold without
+# going over 21, counting aces as 1.
+#
+# RETURNS : A list of tuples of ten card counts.
+def playerHolds():
+    holds = []
+    stack = [((0,) * 10, 0, 1)]
+    while(stack):
+        drawn, hard, lowest = stack.pop()
+        holds.append(drawn)
+        for point in range(lowest, min(11, 22 - hard)):
+            newDrawn = drawn[:point - 1] + (drawn[point - 1] + 1,) + drawn[point:]
+            stack.append((newDrawn, hard + point, point))
+    return holds
+
+# Every set of cards a player can stand on, with its packed form.
+PLAYER_HOLDS = np.array(playerHolds(), dtype=np.int64)
+PACKED_HOLDS = [packComposition(hold) for hold in PLAYER_HOLDS.tolist()]
+
+#
+# Abstraction - A solver working through the hands that
+#               can be dealt from one shoe. The cards left
+#               in the shoe are tracked as the solver
+#               removes and restores cards while searching.
+#
+# Rep Invariants:
+#  left == sum(counts)
+#  key == packComposition(counts)
+#  payouts == rules.payouts()
+
+class Solver():
+
+    # Solver constructor.
+    #
+    # PARAM composition : The cards in the shoe before
+    #                     anything is dealt.
+    # PARAM cache : The DealerCache holding the dealer's odds.
+    #               Defaults to the cache the dealer module
+    #               shares for the rules.
+    # PARAM rules : The Rules played by.
+    def __init__(self, composition, cache=None, rules=HOUSE):
+        if(cache is None):
+            cache = cacheFor(rules)
+        self.rules = rules
+        self.payouts = rules.payouts()
+        self.counts = list(composition)
+        self.left = sum(composition)
+        self.key = packComposition(composition)
+        self.cache = cache
+        self.standMemo = {}
+        self.hitMemo = {}
+
+    # Takes a card out of the shoe.
+    #
+    # PARAM point : The point value of the card, 1 to 10.
+    def remove(self, point):
+        self.counts[point - 1] -= 1
+        self.left -= 1
+        self.key -= SHIFTS[point]
+
+    # Puts a card taken out with remove back into the shoe.
+    #
+    # PARAM point : The point value of the card, 1 to 10.
+    def restore(self, point):
+        self.counts[point - 1] += 1
+        self.left += 1
+        self.key += SHIFTS[point]
+
+    # Works out the dealer's odds and the value of standing
+    # for every composition the player could stand on from
+    # here, in one batch. Without this, each is worked out
+    # on its own the first time it is needed.
+    #
+    # PARAM upcard : The point value of the dealer's upcard.
+    def prepare(self, upcard):
+        fits = np.flatnonzero((PLAYER_HOLDS <= self.counts).all(axis=1))
+        counts = (np.asarray(self.counts, dtype=np.int64) - PLAYER_HOLDS[fits]).tolist()
+        odds = self.cache.oddsMany(upcard, counts)
+        for i in range(len(fits)):
+            key = ((self.key - PACKED_HOLDS[fits[i]]) << 4) | upcard
+            self.standMemo[key] = standValues(odds[i])
+
+    # Gets the distribution of the dealer's final total
+    # when drawing from the cards left in the shoe.
+    #
+    # PARAM upcard : The point value of the dealer's upcard.
+    #
+    # RETURNS : A tuple of the probabilities that the dealer
+    #           finishes on each total from the one they stand
+    #           on through 21, or busts.
+    def dealer(self, upcard):
+        return self.cache.odds(upcard, self.counts)
+
+    # Gets the expected value of standing.
+    #
+    # PARAM total : The player's point total, at most 21.
+    # PARAM upcard : The point value of the dealer's upcard.
+    #
+    # RETURNS : The expected value of standing.
+    def stand(self, total, upcard):
+        key = (self.key << 4) | upcard
+        values = self.standMemo.get(key)
+        if(values is None):
+            values = standValues(self.dealer(upcard))
+            self.standMemo[key] = values
+        return values[total]
+
+    # Gets the expected value of hitting and then
+    # playing on with the best of hitting or standing.
+    #
+    # PARAM hard : The player's total, counting aces as 1.
+    # PARAM aces : True iff the player holds an ace.
+    # PARAM upcard : The point value of the dealer's upcard.
+    #
+    # RETURNS : The expected value of hitting.
+    def hit(self, hard, aces, upcard):
+        key = (self.key << 10) | (upcard << 6) | (hard << 1) | int(aces)
+        result = self.hitMemo.get(key)
+        if(result is not None):
+            return result
+
+        counts = self.counts
+        left = self.left
+        result = 0.0
+        for point in range(1, 11):
+            count = counts[point - 1]
+            if(count == 0):
+                continue
+            newHard = hard + point
+            if(newHard > 21):
+                result -= count / left
+                continue
+            newAces = aces or point == 1
+            self.remove(point)
+            best = self.stand(handTotal(newHard, newAces), upcard)
+            if(newHard < 21):
+                best = max(best, self.hit(newHard, newAces, upcard))
+            self.restore(point)
+            result += count / left * best
+        self.hitMemo[key] = result
+        return result
+
+    # Gets the expected value of doubling down.
+    #
+    # PARAM hard : The player's total, counting aces as 1.
+    # PARAM aces : True iff the player holds an ace.
+    # PARAM upcard : The point value of the dealer's upcard.
+    #
+    # RETURNS : The expected value of doubling down.
+    def double(self, hard, aces, upcard):
+        counts = self.counts
+        left = self.left
+        result = 0.0
+        for point in range(1, 11):
+            count = counts[point - 1]
+            if(count == 0):
+                continue
+            newHard = hard + point
+            if(newHard > 21):
+                result -= 2.0 * count / left
+            else:
+                self.remove(point)
+                result += 2.0 * count / left * self.stand(handTotal(newHard, aces or point == 1), upcard)
+                self.restore(point)
+        return result
+
+    # Gets the distribution of final totals of a split hand
+    # played with the best single hand choice between hitting
+    # and standing, drawing from the current composition.
+    #
+    # PARAM hard : The hand's total, counting aces as 1.
+    # PARAM aces : True iff the hand holds an ace.
+    # PARAM upcard : The point value of the dealer's upcard.
+    # PARAM memo : A dictionary of distributions already found
+    #              for this composition, keyed by (hard, aces).
+    #
+    # RETURNS : A dictionary mapping final totals (22 for a
+    #           bust) to probabilities.
+    def splitFinals(self, hard, aces, upcard, memo):
+        total = handTotal(hard, aces)
+        if(total > 21):
+            return {22 : 1.0}
+        if(total == 21 or self.stand(total, upcard) >= self.hit(hard, aces, upcard)):
+            return {total : 1.0}
+        finals = memo.get((hard, aces))
+        if(finals is not None):
+            return finals
+
+        counts = self.counts
+        left = self.left
+        finals = {}
+        for point in range(1, 11):
+            count = counts[point - 1]
+            if(count == 0):
+                continue
+            after = self.splitFinals(hard + point, aces or point == 1, upcard, memo)
+            for final in after:
+                finals[final] = finals.get(final, 0.0) + count / left * after[final]
+        memo[(hard, aces)] = finals
+        return finals
+
+    # Gets the expected value of splitting a pair.
+    #
+    # PARAM point : The point value of the paired cards.
+    # PARAM upcard : The point value of the dealer's upcard.
+    #
+    # RETURNS : The expected value of splitting.
+    def split(self, point, upcard):
+        counts = self.counts
+        left = self.left
+        finals = {}
+        memo = {}
+        blackjacks = 0.0
+        for second in range(1, 11):
+            count = counts[second - 1]
+            if(count == 0):
+                continue
+            if(handTotal(point + second, point == 1 or second == 1) == 21):
+                blackjacks += count / left
+                continue
+            after = self.splitFinals(point + second, point == 1 or second == 1, upcard, memo)
+            for final in after:
+                finals[final] = finals.get(final, 0.0) + count / left * after[final]
+
+        hands = [((total, False), finals[total]) for total in finals]
+        if(blackjacks > 0.0):
+            hands.append(((21, True), blackjacks))
+        odds = self.dealer(upcard)
+        first = 23 - len(odds)
+        payouts = self.payouts
+        result = 0.0
+        for (total1, blackjack1), chance1 in hands:
+            for (total2, blackjack2), chance2 in hands:
+                if(blackjack1 and blackjack2):
+                    value = payouts[4.0] - 1.0
+                else:
+                    value = 0.0
+                    for i in range(len(odds)):
+                        win = roundstate.settleSplit(total1, total2, first + i, blackjack1, blackjack2)
+                        value += odds[i] * (payouts[win] - 1.0)
+                result += chance1 * chance2 * value
+        return result
+
+    # Gets the expected value of every move open to a two
+    # card hand, with those two cards and the dealer's upcard
+    # already taken out of the shoe.
+    #
+    # PARAM card1 : The point value of the first card.
+    # PARAM card2 : The point value of the second card.
+    # PARAM upcard : The point value of the dealer's upcard.
+    #
+    # RETURNS : A dictionary mapping each move ("h", "s",
+    #           "d", for pairs "sp", and "su" where the rules
+    #           allow it) to its expected value.
+    def evaluate(self, card1, card2, upcard):
+        hard = card1 + card2
+        aces = card1 == 1 or card2 == 1
+        values = {
+            "h" : self.hit(hard, aces, upcard),
+            "s" : self.stand(handTotal(hard, aces), upcard),
+            "d" : self.double(hard, aces, upcard),
+        }
+        if(card1 == card2 and self.rules.maxSplits > 0):
+            values["sp"] = self.split(card1, upcard)
+        if(self.rules.surrender):
+            values["su"] = self.payouts[7.0] - 1.0
+        return values
+
+# Solves a full strategy chart. Each row is averaged
+# over every two card hand that makes it, weighted by
+# how likely that hand is to be dealt.
+#
+# PARAM decks : The number of decks in the shoe.
+#               Defaults to the decks of the rules.
+# PARAM rules : The Rules played by.
+#
+# RETURNS : A dictionary mapping keys of the form
+#           ("hard", total, upcard), ("soft", total, upcard)
+#           and ("pair", point, upcard) to dictionaries of
+#           the expected value of each move.
+def solve(decks=None, rules=HOUSE):
+    if(decks is None):
+        decks = rules.decks
+    solver = Solver(fullComposition(decks), rules=rules)
+    counts = solver.counts
+    chart = {}
+    weights = {}
+    for upcard in range(1, 11):
+        solver.remove(upcard)
+        solver.prepare(upcard)
+        for card1 in range(1, 11):
+            for card2 in range(card1, 11):
+                if(card1 == 1 and card2 == 10):
+                    continue
+                weight = counts[card1 - 1]
+                solver.remove(card1)
+                weight *= counts[card2 - 1]
+                if(weight == 0):
+                    solver.restore(card1)
+                    continue
+                if(card1 != card2):
+                    weight *= 2
+                solver.remove(card2)
+                values = solver.evaluate(card1, card2, upcard)
+                solver.restore(card2)
+                solver.restore(card1)
+
+                if("sp" in values):
+                    chart[("pair", card1, upcard)] = values
+                    values = dict(values)
+                    del values["sp"]
+                if(card1 == 1):
+                    key = ("soft", card2 + 11, upcard)
+                else:
+                    key = ("hard", card1 + card2, upcard)
+                row = chart.setdefault(key, dict.fromkeys(values, 0.0))
+                for move in values:
+                    row[move] += weight * values[move]
+                weights[key] = weights.get(key, 0) + weight
+        solver.restore(upcard)
+    for key in weights:
+        for move in chart[key]:
+            chart[key][move] /= weights[key]
+    return chart
+
+# Gets the best move from a row of a strategy chart.
+#
+# PARAM values : A dictionary mapping moves to expected values.
+# PARAM canDouble : Whether doubling down is allowed.
+# PARAM canSplit : Whether splitting is allowed.
+#
+# RETURNS : The move with the highest expected value.
+def bestMove(values, canDouble=True, canSplit=True):
+    best = None
+    for move in values:
+        if(move == "d" and not(canDouble)):
+            continue
+        if(move == "sp" and not(canSplit)):
+            continue
+        if(best is None or values[move] > values[best]):
+            best = move
+    return best
@@ -0,0 +1,256 @@
+#################################################
+#          Compiled Blackjack Strategies        #
+#################################################
+#
+# Turns a strategy chart into a decision policy, as
+# described in simulation.py, that answers straight
+# out of a table. Every state the policy can be asked
+# about is worked out once, when the chart is
+# compiled, into a table indexed as:
+#
+#      moves[total][soft][upcard][canDouble][canSplit]
+#
+# so a decision costs five tuple indexes, with no
+# dictionaries, no arithmetic and no branching. That
+# makes a chart or a solved strategy as cheap to play
+# as a policy written out as branches, such as
+# simulation.basicPolicy, though no cheaper: the call
+# into the policy costs more than the lookup, and the
+# partial application below adds a little to it. A
+# single index into a flat table was measured slower
+# still, since Python does sums on the booleans passed
+# in far more slowly than on ints.
+# Pairs are told apart by canSplit: a pair of aces is
+# asked about as a soft 12, and any other pair as the
+# hard total of its two cards.
+#
+# Charts come from solver.solve, from the tables of
+# tablecache.py, or from a CSV file laid out as:
+#
+#      kind,total,2,3,4,5,6,7,8,9,10,A
+#      hard,16,s,s,s,s,s,h,h,h,h,h
+#      soft,18,s,ds,ds,ds,ds,s,s,h,h,h
+#      pair,8,sp,sp,sp,sp,sp,sp,sp,sp,sp,sp
+#
+# where kind is hard, soft or pair, total is the hand's
+# total or, for a pair, the point value of its cards
+# (A for aces), and each cell is the move against that
+# upcard: h, s, d (double, or else hit), ds (double, or
+# else stand) or sp. Hands left out of a CSV chart hit
+# below 17 and stand on 17 or more.
+#
+# Compiled policies choose between hitting, standing,
+# doubling down and splitting, the decisions playRound
+# asks for. A chart of expected values also gives
+# surrender a value when the rules offer it, and then
+# its policy surrenders where that is best. A policy
+# is not told when surrender is offered, so it only
+# surrenders when it may double down, which is only
+# ever on a hand's first move.
+
+import csv
+import functools
+
+from roundstate import DOUBLE, HIT, SPLIT, STAND, SURRENDER
+
+# Upcards in the order of a CSV chart's columns.
+CSV_UPCARDS = [2, 3, 4, 5, 6, 7, 8, 9, 10, 1]
+
+# Moves a compiled policy may choose.
+CHOICES = (HIT, STAND, DOUBLE, SPLIT)
+
+# Double down where allowed, or else stand, as written
+# in a CSV chart.
+DOUBLE_STAND = "ds"
+
+# Looks up the move for a state in a compiled table.
+# Compiled policies are this function with the table
+# bound in front of the policy's own arguments.
+#
+# PARAM moves : A compiled table from compileTable.
+# PARAM total, soft, upcard, canDouble, canSplit :
+#       As passed to any policy.
+#
+# RETURNS : The move.
+def decide(moves, total, soft, upcard, canDouble, canSplit):
+    return moves[total][soft][upcard][canDouble][canSplit]
+
+# Works out the move for every state a policy can be
+# asked about. Upcard 0 cannot come up, and is a hit.
+#
+# PARAM choose : A function choose(total, soft, upcard,
+#                canDouble, canSplit) giving the move for a
+#                state, never DOUBLE unless canDouble nor
+#                SPLIT unless canSplit. Any policy will do.
+#
+# RETURNS : Nested tuples of moves, indexed as in the header
+#           for totals 0 to 21 and upcards 0 to 10.
+def compileTable(choose):
+    moves = []
+    for total in range(22):
+        byTotal = []
+        for soft in (False, True):
+            bySoft = [((HIT, HIT), (HIT, HIT))]
+            for upcard in range(1, 11):
+                byUpcard = []
+                for canDouble in (False, True):
+                    byUpcard.append((choose(total, soft, upcard, canDouble, False),
+                                     choose(total, soft, upcard, canDouble, True)))
+                bySoft.append(tuple(byUpcard))
+            byTotal.append(tuple(bySoft))
+        moves.append(tuple(byTotal))
+    return tuple(moves)
+
+# Compiles a decision policy. The policy is a partial
+# application of decide rather than a closure, so it
+# can be pickled and sent to worker processes.
+#
+# PARAM choose : A function giving the move for a state,
+#                as taken by compileTable.
+#
+# RETURNS : The policy. Its table is policy.args[0].
+def compilePolicy(choose):
+    return functools.partial(decide, compileTable(choose))
+
+# Gets the point value of the cards of a pair from the
+# state a policy is asked about.
+#
+# PARAM total : The pair's point total.
+# PARAM soft : TRUE iff an ace is counted as 11.
+#
+# RETURNS : The point value, 1 for aces.
+def pairPoint(total, soft):
+    if(soft):
+        return 1
+    return total // 2
+
+# Compiles a chart of expected values.
+#
+# PARAM chart : A dictionary mapping keys of the form
+#               ("hard", total, upcard), ("soft", total, upcard)
+#               and ("pair", point, upcard) to dictionaries of
+#               the expected value of each move, as returned by
+#               solver.solve.
+#
+# RETURNS : The compiled policy, making the move of highest
+#           expected value among those allowed, surrender
+#           included where the chart values it.
+def compileChart(chart):
+    def choose(total, soft, upcard, canDouble, canSplit):
+        values = None
+        if(canSplit):
+            values = chart.get(("pair", pairPoint(total, soft), upcard))
+        if(values is None):
+            values = chart.get(("soft" if soft else "hard", total, upcard))
+        if(values is None):
+            if(total >= 21):
+                return STAND
+            return HIT
+        best = None
+        for move in CHOICES:
+            if(move not in values or (move == DOUBLE and not(canDouble)) or (move == SPLIT and not(canSplit))):
+                continue
+            if(best is None or values[move] > values[best]):
+                best = move
+        if(canDouble and SURRENDER in values and values[SURRENDER] > values[best]):
+            return SURRENDER
+        return best
+    return compilePolicy(choose)
+
+# Compiles the expected values worked out for a rule set.
+#
+# PARAM tables : A tablecache.RuleTables.
+#
+# RETURNS : The compiled policy.
+def compileTables(tables):
+    return compileChart(tables.chart())
+
+# Reads a CSV chart.
+#
+# PARAM path : The path of the chart.
+#
+# RETURNS : A dictionary mapping keys of the form
+#           (kind, total, upcard) to the cell written there.
+def readCells(path):
+    cells = {}
+    with open(path, newline="") as file:
+        rows = csv.reader(file)
+        next(rows)
+        for row in rows:
+            if(not(row) or not(row[0].strip())):
+                continue
+            kind = row[0].strip().lower()
+            if(kind not in ("hard", "soft", "pair")):
+                raise ValueError("unknown kind of hand in chart: " + row[0])
+            total = row[1].strip().upper()
+            if(total == "A"):
+                total = 1
+            else:
+                total = int(total)
+            for upcard, cell in zip(CSV_UPCARDS, row[2:]):
+                cell = cell.strip().lower()
+                if(cell not in CHOICES and cell != DOUBLE_STAND):
+                    raise ValueError("unknown move in chart: " + cell)
+                cells[(kind, total, upcard)] = cell
+    return cells
+
+# Compiles a chart of moves, as read by readCells.
+#
+# PARAM cells : A dictionary mapping keys of the form
+#               (kind, total, upcard) to cells.
+#
+# RETURNS : The compiled policy.
+def compileCells(cells):
+    def choose(total, soft, upcard, canDouble, canSplit):
+        cell = None
+        if(canSplit):
+            cell = cells.get(("pair", pairPoint(total, soft), upcard))
+        if(cell is None):
+            cell = cells.get(("soft" if soft else "hard", total, upcard))
+        if(cell is None):
+            if(total >= 17):
+                return STAND
+            return HIT
+        if(cell == DOUBLE_STAND):
+            if(canDouble):
+                return DOUBLE
+            return STAND
+        if(cell == DOUBLE and not(canDouble)):
+            return HIT
+        if(cell == SPLIT and not(canSplit)):
+            return HIT
+        return cell
+    return compilePolicy(choose)
+
+# Reads and compiles a CSV chart.
+#
+# PARAM path : The path of the chart.
+#
+# RETURNS : The compiled policy.
+def readChart(path):
+    return compileCells(readCells(path))
+
+# Writes the best move of every row of a chart of
+# expected values as a CSV chart. Where doubling down
+# is best, the cell falls back to whichever of hitting
+# or standing is worth more.
+#
+# PARAM chart : A chart of expected values, as taken
+#               by compileChart.
+# PARAM path : The path to write to.
+def writeChart(chart, path):
+    with open(path, "w", newline="") as file:
+        rows = csv.writer(file)
+        rows.writerow(["kind", "total"] + [("A" if upcard == 1 else str(upcard)) for upcard in CSV_UPCARDS])
+        for kind in ("hard", "soft", "pair"):
+            for total in range(22):
+                if((kind, total, 2) not in chart):
+                    continue
+                row = [kind, "A" if kind == "pair" and total == 1 else str(total)]
+                for upcard in CSV_UPCARDS:
+                    values = chart[(kind, total, upcard)]
+                    best = max((move for move in CHOICES if move in values), key=values.get)
+                    if(best == DOUBLE and values[STAND] > values[HIT]):
+                        best = DOUBLE_STAND
+                    row.append(best)
+                rows.writerow(row)
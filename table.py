@@ -0,0 +1,97 @@
+#
+# Abstraction - A single Blackjack table: a shoe kept between
+#               rounds, the player's Ledger, and the round in
+#               play. This is the betting loop of
+#               blackjack.playBlackjack without the console, so
+#               it can be driven by anything that passes it bets
+#               and actions, such as the game server.
+#
+# Rep Invariants:
+#  round is None iff no bet has been placed yet
+#  round is not None implies bet > 0
+#  round.isDone() iff the round's bet has been settled,
+#                 in which case credit is what it paid
+#  every settled round has been written to history, if given
+#  ledger pays by rules.credits()
+
+from ledger import Ledger
+from roundstate import RoundState
+from rules import HOUSE
+from shoe import Shoe
+
+class Table():
+    __slots__ = ("shoe", "ledger", "rules", "round", "bet", "credit", "tableId", "history")
+
+    # Table data type constructor.
+    #
+    # PARAM balance : the player's money to start with, in cents.
+    # PARAM decks : the number of decks in the shoe.
+    #               Defaults to the decks of the rules.
+    # PARAM penetration : the fraction of the shoe dealt
+    #                     before it is reshuffled.
+    # PARAM rng : the random number generator used to
+    #             shuffle. Defaults to the random module.
+    # PARAM tableId : a number identifying the table in
+    #                 its hand history.
+    # PARAM history : an optional HistoryWriter every
+    #                 settled round is written to.
+    # PARAM rules : the Rules the table plays by.
+    def __init__(self, balance=500, decks=None, penetration=0.75, rng=None, tableId=0, history=None, rules=HOUSE):
+        if(decks is None):
+            decks = rules.decks
+        self.shoe = Shoe(decks, penetration, rng)
+        self.ledger = Ledger(balance, rules.credits())
+        self.rules = rules
+        self.round = None
+        self.bet = 0
+        self.credit = 0
+        self.tableId = tableId
+        self.history = history
+
+    # RETURNS : true iff a round is waiting on the player.
+    def inPlay(self):
+        return self.round is not None and not(self.round.isDone())
+
+    # RETURNS : true iff the player has no money left and
+    #           no round in play.
+    def isBroke(self):
+        return self.ledger.balance <= 0 and not(self.inPlay())
+
+    # Takes a bet and deals a new round, shuffling the
+    # shoe first if the cut card has come out. A natural
+    # is settled at once.
+    #
+    # PARAM bet : the bet, in cents.
+    #
+    # RETURNS : true iff the shoe was shuffled first.
+    def start(self, bet):
+        if(self.inPlay()):
+            raise ValueError("a round is already in play")
+        if(bet <= 0):
+            raise ValueError("a bet must be more than nothing")
+        self.ledger.stake(bet)
+        shuffled = self.shoe.needsShuffle()
+        if(shuffled):
+            self.shoe.shuffle()
+        self.bet = bet
+        self.round = RoundState(self.shoe, self.ledger.balance >= bet, self.rules)
+        self.settleIfDone()
+        return shuffled
+
+    # Takes the player's next action in the round in play,
+    # settling the bet once the round is done.
+    #
+    # PARAM action : one of the strings from round.actions().
+    def act(self, action):
+        if(not(self.inPlay())):
+            raise ValueError("no round is in play")
+        self.round.act(action)
+        self.settleIfDone()
+
+    # Pays out the bet if the round has just finished,
+    # and writes the round to the hand history.
+    def settleIfDone(self):
+        if(self.round.isDone()):
+            self.credit = self.ledger.settle(self.bet, self.round.outcome)
+            if(self.history is not None):
+                self.history.write(self.tableId, self.ledger.rounds, self.bet, self.round)
@@ -0,0 +1,240 @@
+#################################################
+#          Blackjack Rule Set Table Cache       #
+#################################################
+#
+# Keeps the tables worked out for a rule set on disk,
+# so that switching rule sets costs opening a few
+# files rather than solving the game again. For each
+# Rules object (see rules.py) the tables are:
+#
+#  dealer   : the odds of each way the dealer can finish
+#             against every upcard, dealt from a full shoe,
+#             indexed [upcard - 1, final], as laid out by
+#             the dealer module
+#  ev       : the expected value of every move for every
+#             starting hand against every upcard, from
+#             solver.solve, indexed [kind, total, upcard - 1,
+#             move], NaN where the move or hand is not offered
+#  strategy : the best of those moves, coded as in
+#             roundstate.MOVE_CODES, 0 where there is no hand,
+#             indexed [kind, total, upcard - 1]
+#
+# Kinds follow KINDS and moves follow MOVE_ORDER. A
+# pair is indexed by the point value of its cards, the
+# other kinds by their total.
+#
+# Each table is saved as a .npy file in a directory
+# named by the rule set's key under the cache directory,
+# and is read back memory mapped and read-only, so only
+# the parts looked at are ever loaded. The cache
+# directory is $BLACKJACK_CACHE, or ~/.cache/blackjack.
+
+import os
+
+import numpy as np
+
+import solver
+from dealer import cacheFor, fullComposition
+from roundstate import DOUBLE, HIT, MOVE_CODES, MOVES, SPLIT, STAND, SURRENDER
+from rules import HOUSE
+
+# Bumped whenever the layout of the tables changes, so
+# that tables saved in an older layout are never read.
+FORMAT = 1
+
+KINDS = ("hard", "soft", "pair")
+MOVE_ORDER = (HIT, STAND, DOUBLE, SPLIT, SURRENDER)
+NAMES = ("dealer", "ev", "strategy")
+
+# Tables already loaded by this process, keyed by their
+# directory.
+LOADED = {}
+
+#
+# Abstraction - The tables worked out for one rule set, as
+#               described in the header. They may be mapped
+#               straight from files, so are never modified.
+#
+# Rep Invariants:
+#  dealer.shape == (10, 23 - rules.standOn)
+#  ev.shape == (len(KINDS), 22, 10, len(MOVE_ORDER))
+#  strategy.shape == (len(KINDS), 22, 10)
+#  strategy[i] is the code of the move of highest ev[i], or 0
+#       when every ev[i] is NaN
+
+class RuleTables():
+    __slots__ = ("rules", "dealer", "ev", "strategy")
+
+    # RuleTables data type constructor.
+    #
+    # PARAM rules : the Rules the tables were worked out for.
+    # PARAM dealer : the dealer table.
+    # PARAM ev : the expected value table.
+    # PARAM strategy : the strategy table.
+    def __init__(self, rules, dealer, ev, strategy):
+        self.rules = rules
+        self.dealer = dealer
+        self.ev = ev
+        self.strategy = strategy
+
+    # Gets the expected value of each move for a hand.
+    #
+    # PARAM kind : "hard", "soft" or "pair".
+    # PARAM total : the hand's total, or for a pair the
+    #               point value of its cards.
+    # PARAM upcard : the point value of the dealer's upcard.
+    #
+    # RETURNS : a dictionary mapping each move offered to its
+    #           expected value, as in a row of solver.solve.
+    def row(self, kind, total, upcard):
+        values = self.ev[KINDS.index(kind), total, upcard - 1]
+        return {MOVE_ORDER[i] : float(values[i]) for i in range(len(MOVE_ORDER)) if not(np.isnan(values[i]))}
+
+    # Gets the expected values as a chart.
+    #
+    # RETURNS : a dictionary laid out as returned by
+    #           solver.solve, holding every hand that can
+    #           be dealt.
+    def chart(self):
+        chart = {}
+        for kind in KINDS:
+            for total in range(22):
+                for upcard in range(1, 11):
+                    values = self.row(kind, total, upcard)
+                    if(values):
+                        chart[(kind, total, upcard)] = values
+        return chart
+
+    # Gets the best move for a hand.
+    #
+    # PARAM kind : "hard", "soft" or "pair".
+    # PARAM total : the hand's total, or for a pair the
+    #               point value of its cards.
+    # PARAM upcard : the point value of the dealer's upcard.
+    #
+    # RETURNS : the action string, or None when the hand
+    #           cannot be dealt.
+    def move(self, kind, total, upcard):
+        return MOVES.get(int(self.strategy[KINDS.index(kind), total, upcard - 1]))
+
+    # Describes the strategy table in text, one row per
+    # hand that can be dealt and one column per upcard.
+    #
+    # RETURNS : A list of lines.
+    def summary(self):
+        upcards = list(range(2, 11)) + [1]
+        lines = ["        " + "".join("{:>4}".format("A" if upcard == 1 else upcard) for upcard in upcards)]
+        for kind in range(len(KINDS)):
+            for total in range(22):
+                codes = [int(self.strategy[kind, total, upcard - 1]) for upcard in upcards]
+                if(any(codes)):
+                    lines.append("{:<5}{:>3}".format(KINDS[kind], total) +
+                                 "".join("{:>4}".format(MOVES.get(code, "-")) for code in codes))
+        return lines
+
+# Gets the dealer's odds against every upcard, dealt
+# from a full shoe.
+#
+# PARAM rules : The Rules played by.
+#
+# RETURNS : The dealer table.
+def dealerTable(rules):
+    cache = cacheFor(rules)
+    rows = []
+    for upcard in range(1, 11):
+        composition = list(fullComposition(rules.decks))
+        composition[upcard - 1] -= 1
+        rows.append(cache.odds(upcard, composition))
+    return np.array(rows)
+
+# Lays a strategy chart out as tables.
+#
+# PARAM chart : A chart from solver.solve.
+#
+# RETURNS : A tuple of the expected value and
+#           strategy tables.
+def chartTables(chart):
+    ev = np.full((len(KINDS), 22, 10, len(MOVE_ORDER)), np.nan)
+    strategy = np.zeros((len(KINDS), 22, 10), dtype=np.uint8)
+    for (kind, total, upcard), values in chart.items():
+        index = (KINDS.index(kind), total, upcard - 1)
+        for move in values:
+            ev[index + (MOVE_ORDER.index(move),)] = values[move]
+        strategy[index] = MOVE_CODES[solver.bestMove(values)]
+    return ev, strategy
+
+# Works out the tables for a rule set. This solves
+# the game, and can take some time.
+#
+# PARAM rules : The Rules played by.
+#
+# RETURNS : The RuleTables.
+def buildTables(rules):
+    ev, strategy = chartTables(solver.solve(rules=rules))
+    return RuleTables(rules, dealerTable(rules), ev, strategy)
+
+# Gets the directory a rule set's tables are kept in.
+#
+# PARAM rules : The Rules.
+# PARAM directory : The cache directory. Defaults to
+#                   $BLACKJACK_CACHE, or ~/.cache/blackjack.
+#
+# RETURNS : The path of the directory.
+def tablePath(rules, directory=None):
+    if(directory is None):
+        directory = os.environ.get("BLACKJACK_CACHE") or os.path.join(os.path.expanduser("~"), ".cache", "blackjack")
+    return os.path.join(directory, "v" + str(FORMAT), rules.key())
+
+# Saves a rule set's tables. Each file is written in
+# full under a temporary name before taking its place,
+# so a reader never sees half a table.
+#
+# PARAM tables : The RuleTables.
+# PARAM path : The directory to save them in.
+def saveTables(tables, path):
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "rules.txt"), "w") as file:
+        file.write(repr(tables.rules) + "\n")
+    for name in NAMES:
+        final = os.path.join(path, name + ".npy")
+        temporary = final + "." + str(os.getpid()) + ".tmp"
+        with open(temporary, "wb") as file:
+            np.save(file, getattr(tables, name))
+        os.replace(temporary, final)
+
+# Loads a rule set's tables, memory mapped.
+#
+# PARAM rules : The Rules.
+# PARAM path : The directory they were saved in.
+#
+# RETURNS : The RuleTables, or None when any table
+#           has not been saved.
+def loadTables(rules, path):
+    arrays = []
+    for name in NAMES:
+        file = os.path.join(path, name + ".npy")
+        if(not(os.path.exists(file))):
+            return None
+        arrays.append(np.load(file, mmap_mode="r"))
+    return RuleTables(rules, *arrays)
+
+# Gets the tables for a rule set, from this process
+# if already loaded, or else from the cache directory,
+# working them out and saving them only if they have
+# never been saved.
+#
+# PARAM rules : The Rules played by.
+# PARAM directory : The cache directory. Defaults to
+#                   $BLACKJACK_CACHE, or ~/.cache/blackjack.
+#
+# RETURNS : The RuleTables.
+def tablesFor(rules=HOUSE, directory=None):
+    path = tablePath(rules, directory)
+    tables = LOADED.get(path)
+    if(tables is None):
+        tables = loadTables(rules, path)
+        if(tables is None):
+            saveTables(buildTables(rules), path)
+            tables = loadTables(rules, path)
+        LOADED[path] = tables
+    return tables
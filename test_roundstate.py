@@ -0,0 +1,43 @@
+#################################################
+#           Blackjack Round Tests               #
+#################################################
+#
+# Run with pytest from the repository root.
+
+import random
+
+from roundstate import MAX_SEATS, TableRound
+from shoe import Shoe
+
+# Plays every seat of a table round, splitting whenever
+# allowed and hitting to a hard 15, so that rounds run
+# long and often past the end of a single deck.
+#
+# PARAM table : the TableRound to play out.
+def playOut(table):
+    while(not(table.isDone())):
+        actions = table.actions()
+        if("sp" in actions):
+            table.act("sp")
+        elif(table.seat().hand().hard < 15):
+            table.act("h")
+        else:
+            table.act("s")
+
+# RETURNS : every card dealt in a finished table round.
+def roundCards(table):
+    cards = list(table.dealer.cards)
+    for seat in table.seats:
+        for hand in seat.hands:
+            cards += hand.cards
+    return cards
+
+def testFullTableNeverDealsACardTwiceInARound():
+    shoe = Shoe(1, 0.75, random.Random(23))
+    for i in range(5000):
+        if(shoe.needsShuffle()):
+            shoe.shuffle()
+        table = TableRound(shoe, [True] * MAX_SEATS)
+        playOut(table)
+        cards = roundCards(table)
+        assert len(set(cards)) == len(cards)
@@ -0,0 +1,36 @@
+#################################################
+#         Blackjack Simulation Tests            #
+#################################################
+#
+# Run with pytest from the repository root.
+
+import simulation
+
+# A policy that always asks to split.
+def alwaysSplit(total, soft, upcard, canDouble, canSplit):
+    return "sp"
+
+# A policy that splits when it may, and otherwise hits.
+def splitOrHit(total, soft, upcard, canDouble, canSplit):
+    if(canSplit):
+        return "sp"
+    return "h"
+
+# A policy that always asks to double down.
+def alwaysDouble(total, soft, upcard, canDouble, canSplit):
+    return "d"
+
+# A policy that always hits.
+def alwaysHit(total, soft, upcard, canDouble, canSplit):
+    return "h"
+
+def testSplitWithoutAPairIsAHit():
+    for seats in (1, 3):
+        assert (simulation.simulate(20000, alwaysSplit, seed=1, seats=seats)
+                == simulation.simulate(20000, splitOrHit, seed=1, seats=seats))
+
+def testDoubleWithoutTheMoneyIsAHit():
+    for seats in (1, 3):
+        played = simulation.simulate(20000, alwaysDouble, seed=2, canDouble=False, seats=seats)
+        assert played == simulation.simulate(20000, alwaysHit, seed=2, canDouble=False, seats=seats)
+        assert played[6.0] == 0 and played[6.5] == 0 and played[6.75] == 0